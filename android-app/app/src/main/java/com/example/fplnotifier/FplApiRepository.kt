@@ -11,15 +11,20 @@ import java.net.URL
 import java.time.Instant
 import java.time.OffsetDateTime
 
-private const val API_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
+/**
+ * Public FPL endpoint. A `python -m fpl_notifier serve` instance exposes the same
+ * shape at `http://<host>:<port>/api/bootstrap-static/` and can be used instead.
+ */
+const val DEFAULT_API_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
 
 typealias JsonFetcher = suspend (String) -> String
 
 class FplApiRepository(
+    private val apiUrl: String = DEFAULT_API_URL,
     private val fetcher: JsonFetcher = { url -> defaultFetch(url) }
 ) {
     suspend fun getUpcomingDeadlines(now: Instant = Instant.now()): List<GameweekDeadline> {
-        val payload = fetcher(API_URL)
+        val payload = fetcher(apiUrl)
         val root = JSONObject(payload)
         val events = root.optJSONArray("events") ?: JSONArray()
         val upcoming = mutableListOf<GameweekDeadline>()
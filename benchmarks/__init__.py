@@ -0,0 +1,4 @@
+"""Performance benchmarks for the FPL deadline notifier.
+
+Run from the repository root, for example ``PYTHONPATH=src python -m benchmarks.bench_parse``.
+"""
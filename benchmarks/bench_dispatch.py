@@ -0,0 +1,87 @@
+"""End-to-end fan-out time of the sharded dispatcher by shard count.
+
+Every subscriber's reminder is due as soon as the deadlines are broadcast.
+Notifications are fully rendered by ``PushoverNotifier`` but handed to an
+opener that does not touch the network, so the measurement is the CPU-bound
+part that a single process cannot spread across cores.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.bench_dispatch [--subscribers 20000] [--shards 1 2 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import time
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.dispatcher import ShardedDispatcher
+from fpl_notifier.notifier import PushoverNotifier
+from fpl_notifier.scheduler import Subscriber
+
+
+class _Response:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def read(self) -> bytes:
+        return b'{"status":1}'
+
+    def getcode(self) -> int:
+        return 200
+
+
+class _NullOpener:
+    def open(self, request, timeout=None):
+        return _Response()
+
+
+def _notifier_factory(subscriber: Subscriber) -> PushoverNotifier:
+    return PushoverNotifier("token", subscriber.subscriber_id, opener=_NullOpener(), timezone=subscriber.timezone)
+
+
+def _fan_out(subscribers: list[Subscriber], shards: int) -> tuple[float, list]:
+    gameweek = GameweekDeadline(1, "Gameweek 1", datetime.now(timezone.utc) + timedelta(minutes=30))
+    with ShardedDispatcher(
+        subscribers, notifier_factory=_notifier_factory, shards=shards, fetcher=lambda *, now: [gameweek]
+    ) as dispatcher:
+        start = time.perf_counter()
+        dispatcher.refresh()
+        while sum(stats.delivered for stats in dispatcher.stats()) < len(subscribers):
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        return elapsed, dispatcher.stats()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=20_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=None)
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    cores = os.cpu_count() or 1
+    shard_counts = args.shards or sorted({1, 2, 4, cores})
+    subscribers = [Subscriber(f"user-{n}") for n in range(args.subscribers)]
+
+    print(f"{cores} CPU(s), {args.subscribers} subscribers")
+    print(f"{'shards':>6} {'seconds':>8} {'msg/s':>9} {'speed-up':>9}  per-shard msg/s")
+    baseline = None
+    for shards in shard_counts:
+        elapsed, stats = _fan_out(subscribers, shards)
+        baseline = baseline or elapsed
+        per_shard = " ".join(f"{s.throughput:.0f}" for s in stats)
+        print(
+            f"{shards:>6} {elapsed:>8.2f} {args.subscribers / elapsed:>9.0f} {baseline / elapsed:>8.2f}x  {per_shard}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Failover time of the leader lease between replica processes.
+
+Starts several replica processes contending for one
+:class:`~fpl_notifier.lease.SQLiteLease`, then repeatedly kills whichever
+holds it and measures how long it takes another replica to take over,
+both from the kill and from the killed leader's last renewal (what
+``fpl_lease_failover_seconds`` reports).
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.bench_failover [--replicas 3] [--rounds 5] [--ttl 1.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPLICA = """
+import sys, time
+from datetime import timedelta
+from fpl_notifier.lease import SQLiteLease
+
+path, holder, ttl = sys.argv[1], sys.argv[2], float(sys.argv[3])
+lease = SQLiteLease(path, holder=holder, ttl=timedelta(seconds=ttl))
+while True:
+    if lease.acquire():
+        print(holder, lease.token, time.time(), lease.last_failover, flush=True)
+    time.sleep(lease.renew_interval.total_seconds())
+"""
+
+
+def _spawn(path: str, name: str, ttl: float, log) -> subprocess.Popen:
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    return subprocess.Popen([sys.executable, "-c", REPLICA, path, name, str(ttl)], env=env, stdout=log)
+
+
+def _last_line(path: str) -> list[str]:
+    with open(path) as handle:
+        lines = handle.read().splitlines()
+    return lines[-1].split() if lines else []
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--ttl", type=float, default=1.0, help="Lease duration in seconds")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "lease.sqlite3")
+        log_path = os.path.join(directory, "leaders.log")
+        replicas = {}
+        since_kill = []
+        since_renewal = []
+        with open(log_path, "w") as log:
+            try:
+                for index in range(args.replicas + args.rounds):
+                    if len(replicas) < args.replicas:
+                        name = f"replica-{index}"
+                        replicas[name] = _spawn(path, name, args.ttl, log)
+                    if index < args.replicas - 1:
+                        continue
+                    while not _last_line(log_path):
+                        time.sleep(0.01)
+                    leader, token = _last_line(log_path)[:2]
+                    replicas.pop(leader).kill()
+                    killed_at = time.time()
+                    while _last_line(log_path)[1] == token:
+                        time.sleep(0.01)
+                    _, _, taken_at, gap = _last_line(log_path)
+                    since_kill.append(float(taken_at) - killed_at)
+                    since_renewal.append(float(gap))
+                    if len(since_kill) == args.rounds:
+                        break
+            finally:
+                for process in replicas.values():
+                    process.kill()
+                    process.wait()
+
+    print(f"lease ttl {args.ttl:.2f}s, {args.replicas} replicas, {len(since_kill)} failovers")
+    for label, samples in (("since kill", since_kill), ("since last renewal", since_renewal)):
+        print(f"{label:>20}: median {statistics.median(samples):.3f}s  max {max(samples):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
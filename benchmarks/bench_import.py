@@ -0,0 +1,81 @@
+"""Cold-start cost of the notifier's entry points.
+
+Each target is imported in a fresh interpreter, so nothing is cached in
+``sys.modules``. Reports the median wall time over several runs minus the
+cost of starting a bare interpreter, and the slowest modules (cumulative
+microseconds from ``-X importtime``) pulled in by the median run.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.bench_import [--runs 15] [--top 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TARGETS = {
+    "package": "import fpl_notifier",
+    "cli": "import fpl_notifier.__main__",
+    # What ``--once`` loads before it steps the service.
+    "once": (
+        "import fpl_notifier.__main__, fpl_notifier.service, fpl_notifier.notifier, "
+        "fpl_notifier.store, zoneinfo"
+    ),
+    "aio": "import fpl_notifier.aio",
+    "server": "import fpl_notifier.server",
+}
+
+
+def _run(code: str) -> tuple[float, str]:
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    return time.perf_counter() - start, result.stderr
+
+
+def _slowest(importtime: str, top: int, exclude: set[str]) -> list[tuple[int, str]]:
+    rows = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Only top-level imports; nested ones are already in their parent's total.
+        if not name.startswith("  ") and name.strip() not in exclude:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def _median_run(code: str, runs: int) -> tuple[float, str]:
+    samples = sorted((_run(code) for _ in range(runs)), key=lambda sample: sample[0])
+    return samples[len(samples) // 2]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=sorted(TARGETS), default=None)
+    args = parser.parse_args(argv)
+
+    baseline, startup = _median_run("pass", args.runs)
+    startup_modules = {module for _, module in _slowest(startup, len(startup), set())}
+    print(f"bare interpreter: {baseline * 1000:.1f} ms (subtracted below)")
+    for name in args.only or TARGETS:
+        elapsed, importtime = _median_run(TARGETS[name], args.runs)
+        print(f"{name:>8}: {(elapsed - baseline) * 1000:7.1f} ms")
+        for cumulative, module in _slowest(importtime, args.top, startup_modules):
+            print(f"{'':>10}{cumulative / 1000:7.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare ``json.load`` with the events-only streaming parser.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.bench_parse [--scale 1 4] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+from fpl_notifier.streaming import load_events_payload
+
+from .synthetic import make_bootstrap_bytes
+
+
+def _measure(parse: Callable[[io.BytesIO], dict], data: bytes, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(io.BytesIO(data))
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(io.BytesIO(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, nargs="+", default=[1.0, 4.0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'payload':<22} {'parser':<10} {'best ms':>9} {'peak KiB':>10}")
+    for scale in args.scale:
+        for events_last in (False, True):
+            data = make_bootstrap_bytes(scale=scale, events_last=events_last)
+            label = f"{len(data) / 1e6:.1f}MB{' events-last' if events_last else ''}"
+            for name, parse in (("json.load", json.load), ("events", load_events_payload)):
+                best, peak = _measure(parse, data, args.repeat)
+                print(f"{label:<22} {name:<10} {best * 1000:>9.2f} {peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Notification throughput: per-message urllib vs pooled and bulk sends.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.bench_pushover [--messages 500] [--latency 0.005]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import logging
+import time
+from urllib import request
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.notifier import PushoverNotifier
+from fpl_notifier.transport import HTTPConnectionPool
+
+from .stubs import pushover_stub
+
+GAMEWEEK = GameweekDeadline(event_id=1, name="Gameweek 1", deadline=datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc))
+LEAD = timedelta(hours=2)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005, help="Stub server latency per request (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    recipients = [f"user{n}" for n in range(args.messages)]
+    with pushover_stub(latency=args.latency) as url:
+        modes = {
+            "urllib per message": lambda: _serial(
+                PushoverNotifier("token", "user", opener=request.build_opener(), api_url=url), recipients
+            ),
+            "pooled serial": lambda: _serial(
+                PushoverNotifier("token", "user", transport=HTTPConnectionPool(), api_url=url), recipients
+            ),
+            f"send_many x{args.workers}": lambda: PushoverNotifier(
+                "token", "user", transport=HTTPConnectionPool(), api_url=url
+            ).send_many(GAMEWEEK, LEAD, recipients, max_workers=args.workers),
+        }
+        print(f"{'mode':<22} {'seconds':>8} {'msg/s':>8}")
+        for name, run in modes.items():
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<22} {elapsed:>8.2f} {args.messages / elapsed:>8.0f}")
+
+
+def _serial(notifier: PushoverNotifier, recipients: list[str]) -> None:
+    for recipient in recipients:
+        notifier.user_key = recipient
+        notifier.send(GAMEWEEK, LEAD)
+
+
+if __name__ == "__main__":
+    main()
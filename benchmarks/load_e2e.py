@@ -0,0 +1,94 @@
+"""End-to-end fetch and send load test against local FPL and Pushover stand-ins.
+
+Drives the real HTTP paths: ``fetch_gameweek_deadlines`` (plain and
+revalidating with ``CachedFetch``) against an :class:`FPLStandIn`, and
+``PushoverNotifier.send`` from several threads against a
+:class:`PushoverStandIn`. Reports throughput, p50/p95/p99 latency and
+failures per phase.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.load_e2e [--fetches 200] [--messages 2000] [--workers 16]
+        [--payload-bytes 1500000] [--latency 0.005] [--error-rate 0.0] [--rate-limit N]
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import logging
+import time
+from typing import Callable, List, Tuple
+
+from fpl_notifier.deadlines import CachedFetch, fetch_gameweek_deadlines
+from fpl_notifier.notifier import PushoverNotifier
+from fpl_notifier.standins import FPLStandIn, PushoverStandIn
+from fpl_notifier.transport import HTTPConnectionPool
+
+from .suite import _percentile
+
+LEAD = timedelta(hours=2)
+
+
+def _timed(operation: Callable[[], object]) -> Tuple[float, bool]:
+    started = time.perf_counter()
+    try:
+        operation()
+    except Exception:
+        return time.perf_counter() - started, False
+    return time.perf_counter() - started, True
+
+
+def _run(operations: List[Callable[[], object]], workers: int) -> Tuple[float, List[float], int]:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_timed, operations))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for latency, _ in results)
+    return elapsed, latencies, sum(not ok for _, ok in results)
+
+
+def _report(name: str, count: int, elapsed: float, latencies: List[float], failures: int) -> None:
+    p50, p95, p99 = (_percentile(latencies, fraction) * 1e3 for fraction in (0.50, 0.95, 0.99))
+    print(f"{name:<24} {count / elapsed:>8.0f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {failures:>8}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fetches", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--payload-bytes", type=int, default=1_500_000, help="Size of bootstrap-static")
+    parser.add_argument("--latency", type=float, default=0.005, help="Stand-in latency per request (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Pushover messages accepted per minute")
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+
+    options = {"latency": args.latency, "error_rate": args.error_rate, "seed": 0}
+    with FPLStandIn(size=args.payload_bytes, **options) as fpl, PushoverStandIn(
+        rate_limit=args.rate_limit, **options
+    ) as pushover:
+        gameweek = fetch_gameweek_deadlines(api_url=fpl.url)[0]
+        cached = CachedFetch(None)
+        notifier = PushoverNotifier("token", "user", transport=HTTPConnectionPool(), api_url=pushover.url)
+        phases = {
+            "fetch (full body)": [lambda: fetch_gameweek_deadlines(api_url=fpl.url)] * args.fetches,
+            "fetch (revalidated)": [lambda: fetch_gameweek_deadlines(fetch_json=cached, api_url=fpl.url)]
+            * args.fetches,
+            f"send x{args.workers}": [lambda: notifier.send(gameweek, LEAD)] * args.messages,
+        }
+        print(f"payload {len(fpl.payload):,} bytes, latency {args.latency * 1e3:.1f} ms, errors {args.error_rate:.0%}")
+        print(f"{'phase':<24} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>8}")
+        for name, operations in phases.items():
+            workers = args.workers if name.startswith("send") else 1
+            _report(name, len(operations), *_run(operations, workers))
+        print(
+            f"stand-ins: fpl {fpl.requests} requests ({fpl.not_modified} not modified), "
+            f"pushover {len(pushover.messages)} accepted, {pushover.rate_limited} rate limited"
+        )
+
+
+if __name__ == "__main__":
+    main()
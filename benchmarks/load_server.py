@@ -0,0 +1,88 @@
+"""Load test for the ``serve`` deadline cache.
+
+Many clients hit the server over keep-alive connections, half of them
+revalidating with ``If-None-Match``. Reports requests/sec and how many times
+upstream was fetched.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.load_server [--clients 32] [--requests 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta
+import http.client
+import logging
+import threading
+import time
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.server import DeadlineCache, DeadlineServer
+
+from .synthetic import SEASON_START
+
+
+def _deadlines(*, now: datetime) -> list[GameweekDeadline]:
+    return [
+        GameweekDeadline(event_id=n, name=f"Gameweek {n}", deadline=SEASON_START + timedelta(days=7 * n))
+        for n in range(1, 39)
+    ]
+
+
+def _client(address, requests: int, conditional: bool, path: str, counts: list[int]) -> None:
+    conn = http.client.HTTPConnection(*address, timeout=10)
+    headers = {"Accept-Encoding": "gzip"}
+    etag = None
+    ok = 0
+    for _ in range(requests):
+        if conditional and etag:
+            headers["If-None-Match"] = etag
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        etag = response.getheader("ETag")
+        ok += response.status in (200, 304)
+    conn.close()
+    counts.append(ok)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client")
+    parser.add_argument("--path", default="/deadlines")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    now = SEASON_START - timedelta(days=1)
+    cache = DeadlineCache(fetcher=_deadlines, clock=lambda: now)
+    server = DeadlineServer(("127.0.0.1", 0), cache)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        counts: list[int] = []
+        threads = [
+            threading.Thread(
+                target=_client,
+                args=(server.server_address[:2], args.requests, n % 2 == 0, args.path, counts),
+            )
+            for n in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    total = sum(counts)
+    print(f"{args.clients} clients, {total} successful requests in {elapsed:.2f}s")
+    print(f"{total / elapsed:.0f} requests/sec, {cache.upstream_fetches} upstream fetch(es)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Replay a season against each poll policy and count upstream requests.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.simulate_polling [--seed 7] [--postponements 4] [--outages 6]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import timedelta
+import random
+from typing import Callable, Dict, Optional
+
+from fpl_notifier.polling import AdaptivePollPolicy, FixedPollPolicy, PollPolicy
+from fpl_notifier.simulation import Season, simulate_service
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--postponements", type=int, default=4)
+    parser.add_argument("--outages", type=int, default=6, help="Number of API outages of up to 12 hours")
+    args = parser.parse_args(argv)
+
+    season = Season.synthetic(seed=args.seed, postponements=args.postponements, outages=args.outages)
+    policies: Dict[str, Callable[[], Optional[PollPolicy]]] = {
+        "fixed 30m": lambda: FixedPollPolicy(timedelta(minutes=30)),
+        "fixed 6h": lambda: FixedPollPolicy(timedelta(hours=6)),
+        "adaptive": lambda: AdaptivePollPolicy(rng=random.Random(args.seed)),
+    }
+    print(f"{'policy':<12} {'requests':>9} {'on time':>8} {'early':>6} {'late':>5} {'missed':>7}")
+    for name, factory in policies.items():
+        result = simulate_service(season, poll_policy=factory())
+        print(
+            f"{name:<12} {result.upstream_requests:>9} {result.on_time:>8} {result.early:>6}"
+            f" {result.late:>5} {result.missed:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Replay a full season with many subscribers on a virtual clock.
+
+Runs both the single-user service and the multi-subscriber scheduler over a
+synthetic season (or the events of a recorded ``bootstrap-static`` payload)
+with postponements and API outages, and reports missed, late and duplicate
+reminders, upstream requests and CPU time per simulated day.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.simulate_season [--subscribers 5000] [--recorded bootstrap.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import timedelta
+import json
+
+from fpl_notifier.scheduler import Subscriber
+from fpl_notifier.simulation import Season, SimulationReport, simulate_service, simulate_subscribers
+
+LEAD_CHOICES = (
+    (timedelta(hours=2),),
+    (timedelta(hours=24), timedelta(hours=2)),
+    (timedelta(hours=1), timedelta(minutes=15)),
+)
+
+
+def _row(name: str, report: SimulationReport) -> str:
+    return (
+        f"{name:<12} {report.expected:>8} {report.on_time:>8} {report.late:>5} {report.early:>6}"
+        f" {report.missed:>7} {report.duplicates:>5} {report.upstream_requests:>9}"
+        f" {report.cpu_per_day * 1000:>10.2f}"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--subscribers", type=int, default=5_000)
+    parser.add_argument("--postponements", type=int, default=4)
+    parser.add_argument("--outages", type=int, default=6)
+    parser.add_argument("--recorded", default=None, help="bootstrap-static JSON file to replay instead")
+    parser.add_argument("--poll-minutes", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    if args.recorded:
+        with open(args.recorded, "r", encoding="utf-8") as handle:
+            season = Season.from_events(json.load(handle)["events"])
+    else:
+        season = Season.synthetic(seed=args.seed, postponements=args.postponements, outages=args.outages)
+    poll_interval = timedelta(minutes=args.poll_minutes)
+    subscribers = [
+        Subscriber(f"user-{n}", LEAD_CHOICES[n % len(LEAD_CHOICES)]) for n in range(args.subscribers)
+    ]
+
+    print(f"{len(season.deadlines)} gameweeks, {len(season.postponements)} postponed, {len(season.outages)} outages")
+    print(
+        f"{'loop':<12} {'expected':>8} {'on time':>8} {'late':>5} {'early':>6} {'missed':>7} {'dupes':>5}"
+        f" {'requests':>9} {'cpu ms/day':>10}"
+    )
+    print(_row("service", simulate_service(season, lead_time=LEAD_CHOICES[1], poll_interval=poll_interval)))
+    print(_row("scheduler", simulate_subscribers(season, subscribers, poll_interval=poll_interval)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""Local stand-in HTTP servers used by the benchmarks."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from fpl_notifier.standins import PushoverStandIn
+
+
+@contextmanager
+def pushover_stub(*, latency: float = 0.0) -> Iterator[str]:
+    """Serve a Pushover-like ``messages.json`` and yield its URL."""
+
+    with PushoverStandIn(latency=latency) as stand_in:
+        yield stand_in.url
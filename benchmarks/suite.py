@@ -0,0 +1,186 @@
+"""Time the parsing, scheduling and delivery hot paths and report JSON.
+
+Each case reports throughput, latency percentiles and peak traced memory.
+With a baseline file present, every case is compared against it and the
+command exits non-zero when a median latency regressed by more than
+``--tolerance``.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.suite [--output results.json]
+    PYTHONPATH=src python -m benchmarks.suite --update-baseline
+    PYTHONPATH=src python -m benchmarks.suite --only parse --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import timedelta
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fpl_notifier.deadlines import DeadlineTable, GameweekDeadline, fetch_gameweek_deadlines, parse_deadline
+from fpl_notifier.notifier import PushoverNotifier
+from fpl_notifier.rendering import MessageRenderer
+from fpl_notifier.service import DeadlineNotificationService
+from fpl_notifier.streaming import load_events_payload
+from fpl_notifier.transport import HTTPConnectionPool
+
+from .stubs import pushover_stub
+from .synthetic import SEASON_START, make_bootstrap_bytes
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name -> (operations per call, callable)
+Case = Tuple[int, Callable[[], object]]
+
+GAMEWEEK = GameweekDeadline(event_id=1, name="Gameweek 1", deadline=SEASON_START)
+LEAD = timedelta(hours=2)
+BEFORE_SEASON = SEASON_START - timedelta(days=3)
+
+
+def _fetch_cases() -> Iterator[Tuple[str, Case]]:
+    # The default layout lets the streaming parser stop early; the inflated
+    # payload puts ``events`` last so the whole document is scanned.
+    for scale, events_last in ((1, False), (8, True)):
+        data = make_bootstrap_bytes(scale=scale, events_last=events_last)
+
+        def fetch_json(url: str, timeout: int, data: bytes = data) -> dict:
+            return load_events_payload(io.BytesIO(data))
+
+        label = f"x{scale}{'.events_last' if events_last else ''}"
+        yield f"parse.fetch_gameweek_deadlines.{label}", (
+            1,
+            lambda fetch_json=fetch_json: fetch_gameweek_deadlines(now=BEFORE_SEASON, fetch_json=fetch_json),
+        )
+
+    # A full (non-304) response whose events did not change: fresh dicts,
+    # same content, as the streaming parser produces them on every fetch.
+    events = load_events_payload(io.BytesIO(make_bootstrap_bytes(scale=0)))["events"]
+    table = DeadlineTable(events)
+    yield "parse.deadline_table.update", (1, lambda: table.update([dict(event) for event in events]))
+
+    raw = [f"2024-{month:02d}-{day:02d}T17:30:00Z" for month in range(1, 13) for day in range(1, 29)]
+    yield "parse.parse_deadline", (len(raw), lambda: [parse_deadline(value) for value in raw])
+
+
+def _service_cases() -> Iterator[Tuple[str, Case]]:
+    deadlines = [
+        GameweekDeadline(event_id=n, name=f"Gameweek {n}", deadline=SEASON_START + timedelta(days=7 * (n - 1)))
+        for n in range(1, 39)
+    ]
+
+    class Notifier:
+        def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+            pass
+
+    service = DeadlineNotificationService(Notifier(), fetcher=lambda *, now: deadlines, sleep_func=lambda _: None)
+    yield "service.step", (1, lambda: service.step(now=BEFORE_SEASON))
+
+
+def _notifier_cases(url: str) -> Iterator[Tuple[str, Case]]:
+    notifier = PushoverNotifier("token", "user", transport=HTTPConnectionPool(), api_url=url)
+    yield "notifier.build_payload", (1, lambda: notifier._build_payload(GAMEWEEK, LEAD))
+    uncached = PushoverNotifier("token", "user", renderer=MessageRenderer(maxsize=0))
+    yield "notifier.build_payload.uncached", (1, lambda: uncached._build_payload(GAMEWEEK, LEAD))
+    yield "notifier.send", (1, lambda: notifier.send(GAMEWEEK, LEAD))
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    operations, run = case
+    run()  # warm caches and connections
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_op = [timing / operations for timing in timings]
+    return {
+        "ops_per_sec": operations * len(timings) / sum(timings),
+        "p50_us": _percentile(per_op, 0.50) * 1e6,
+        "p95_us": _percentile(per_op, 0.95) * 1e6,
+        "p99_us": _percentile(per_op, 0.99) * 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Return a description of every case slower than ``baseline`` allows."""
+
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = result["p50_us"] / previous["p50_us"]
+        result["p50_vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: p50 {result['p50_us']:.1f}us vs {previous['p50_us']:.1f}us ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--only", default="", help="Run only cases whose name starts with this prefix")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown, as a fraction")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    results: Dict[str, dict] = {}
+    with pushover_stub() as url:
+        for cases in (_fetch_cases(), _service_cases(), _notifier_cases(url)):
+            for name, case in cases:
+                if name.startswith(args.only):
+                    results[name] = {key: round(value, 2) for key, value in measure(case, args.repeat).items()}
+
+    regressions: List[str] = []
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+        "regressions": regressions,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Synthetic ``bootstrap-static`` payloads shaped like the real FPL API."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import json
+from typing import Optional
+
+SEASON_START = datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc)
+REAL_ELEMENT_COUNT = 700
+
+
+def _event(event_id: int, deadline: datetime) -> dict:
+    return {
+        "id": event_id,
+        "name": f"Gameweek {event_id}",
+        "deadline_time": deadline.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "release_time": None,
+        "average_entry_score": 0,
+        "finished": False,
+        "data_checked": False,
+        "highest_scoring_entry": None,
+        "deadline_time_epoch": int(deadline.timestamp()),
+        "deadline_time_game_offset": 0,
+        "highest_score": None,
+        "is_previous": False,
+        "is_current": False,
+        "is_next": event_id == 1,
+        "cup_leagues_created": False,
+        "h2h_ko_matches_created": False,
+        "can_enter": False,
+        "can_manage": False,
+        "released": True,
+        "ranked_count": 0,
+        "overrides": {"rules": {}, "scoring": {}, "element_types": [], "pick_multiplier": None},
+        "chip_plays": [
+            {"chip_name": "bboost", "num_played": 100_000 + event_id},
+            {"chip_name": "3xc", "num_played": 200_000 + event_id},
+        ],
+        "most_selected": None,
+        "most_transferred_in": None,
+        "top_element": None,
+        "top_element_info": None,
+        "transfers_made": 0,
+        "most_captained": None,
+        "most_vice_captained": None,
+    }
+
+
+def _element(element_id: int) -> dict:
+    element = {
+        "id": element_id,
+        "code": 100_000 + element_id,
+        "first_name": f"First{element_id}",
+        "second_name": f"Second{element_id}",
+        "web_name": f"Player {element_id}",
+        "team": element_id % 20 + 1,
+        "element_type": element_id % 4 + 1,
+        "now_cost": 45 + element_id % 90,
+        "status": "a",
+        "news": "",
+        "news_added": None,
+        "photo": f"{100_000 + element_id}.jpg",
+        "selected_by_percent": f"{element_id % 50}.{element_id % 10}",
+        "form": "0.0",
+        "points_per_game": "0.0",
+        "ep_next": "2.5",
+        "ep_this": None,
+        "in_dreamteam": False,
+        "special": False,
+        "chance_of_playing_next_round": None,
+        "chance_of_playing_this_round": None,
+    }
+    # The real records carry dozens of numeric and string statistics.
+    for index in range(60):
+        element[f"stat_{index}"] = (element_id * 31 + index) % 1000
+    for index in range(10):
+        element[f"rank_{index}"] = f"{(element_id * 7 + index) % 700}.0"
+    return element
+
+
+def make_bootstrap(
+    *,
+    scale: float = 1.0,
+    events: int = 38,
+    start: Optional[datetime] = None,
+    events_last: bool = False,
+) -> dict:
+    """Build a payload with ``scale`` times the real number of players.
+
+    ``events_last`` moves the ``events`` key to the end of the document, the
+    worst case for the events-only parser.
+    """
+
+    start = start or SEASON_START
+    element_count = max(1, int(REAL_ELEMENT_COUNT * scale))
+    payload = {
+        "chips": [
+            {"id": n, "name": name, "number": 1, "start_event": 1, "stop_event": 38, "chip_type": "team"}
+            for n, name in enumerate(("wildcard", "freehit", "bboost", "3xc"), start=1)
+        ],
+        "events": [_event(n, start + timedelta(days=7 * (n - 1))) for n in range(1, events + 1)],
+        "game_settings": {"league_join_private_max": 25, "squad_squadsize": 15, "timezone": "UTC"},
+        "phases": [{"id": 1, "name": "Overall", "start_event": 1, "stop_event": 38}],
+        "teams": [{"id": n, "name": f"Team {n}", "short_name": f"T{n:02d}", "strength": 3} for n in range(1, 21)],
+        "total_players": 10_000_000,
+        "elements": [_element(n) for n in range(1, element_count + 1)],
+        "element_stats": [{"label": f"Stat {n}", "name": f"stat_{n}"} for n in range(60)],
+        "element_types": [{"id": n, "plural_name": f"Type {n}", "squad_select": 5} for n in range(1, 5)],
+    }
+    if events_last:
+        payload["events"] = payload.pop("events")
+    return payload
+
+
+def make_bootstrap_bytes(**kwargs) -> bytes:
+    return json.dumps(make_bootstrap(**kwargs)).encode("utf-8")
@@ -3,12 +3,16 @@ import Foundation
 final class FplApiRepository {
     typealias DataFetcher = @Sendable (URL) async throws -> Data
 
-    private static let apiURL = URL(string: "https://fantasy.premierleague.com/api/bootstrap-static/")!
+    /// Public FPL endpoint. A `python -m fpl_notifier serve` instance exposes the same
+    /// shape at `http://<host>:<port>/api/bootstrap-static/` and can be used instead.
+    static let defaultAPIURL = URL(string: "https://fantasy.premierleague.com/api/bootstrap-static/")!
+    private let apiURL: URL
     private let fetcher: DataFetcher
     private let decoder: JSONDecoder
     private let isoFormatters: [ISO8601DateFormatter]
 
-    init(fetcher: DataFetcher? = nil) {
+    init(apiURL: URL = FplApiRepository.defaultAPIURL, fetcher: DataFetcher? = nil) {
+        self.apiURL = apiURL
         self.fetcher = fetcher ?? FplApiRepository.defaultFetcher
         self.decoder = JSONDecoder()
         self.isoFormatters = [
@@ -26,7 +30,7 @@ final class FplApiRepository {
     }
 
     func getUpcomingDeadlines(now: Date = Date()) async throws -> [GameweekDeadline] {
-        let data = try await fetcher(Self.apiURL)
+        let data = try await fetcher(apiURL)
         let payload = try decoder.decode(BootstrapStaticResponse.self, from: data)
         return payload.events
             .compactMap { event -> GameweekDeadline? in
@@ -1,13 +1,43 @@
-"""FPL deadline notification service."""
-
-from .deadlines import GameweekDeadline, fetch_gameweek_deadlines, get_next_gameweek_deadline
-from .notifier import PushoverNotifier
-from .service import DeadlineNotificationService
-
-__all__ = [
-    "GameweekDeadline",
-    "fetch_gameweek_deadlines",
-    "get_next_gameweek_deadline",
-    "PushoverNotifier",
-    "DeadlineNotificationService",
-]
+"""FPL deadline notification service.
+
+Public names are imported on first access so that ``python -m fpl_notifier``
+and short-lived scripts only load the modules they actually use.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .aio import AsyncDeadlineNotificationService, AsyncPushoverNotifier
+    from .deadlines import GameweekDeadline, fetch_gameweek_deadlines, get_next_gameweek_deadline
+    from .notifier import PushoverNotifier
+    from .scheduler import Subscriber, SubscriberScheduler
+    from .service import DeadlineNotificationService
+
+_EXPORTS = {
+    "AsyncDeadlineNotificationService": ".aio",
+    "AsyncPushoverNotifier": ".aio",
+    "GameweekDeadline": ".deadlines",
+    "fetch_gameweek_deadlines": ".deadlines",
+    "get_next_gameweek_deadline": ".deadlines",
+    "PushoverNotifier": ".notifier",
+    "DeadlineNotificationService": ".service",
+    "Subscriber": ".scheduler",
+    "SubscriberScheduler": ".scheduler",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
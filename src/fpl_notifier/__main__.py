@@ -3,15 +3,15 @@
 from __future__ import annotations
 
 import argparse
+from contextlib import contextmanager
+from functools import partial
 import logging
 import os
 from datetime import timedelta
-from typing import Optional
+from typing import Iterator, Optional
 
-from zoneinfo import ZoneInfo
-
-from .notifier import PushoverNotifier
-from .service import DeadlineNotificationService
+# Everything else is imported by the command that needs it, keeping
+# ``--once`` runs from a timer cheap to start.
 
 
 def _configure_logging(verbose: bool) -> None:
@@ -21,13 +21,57 @@ def _configure_logging(verbose: bool) -> None:
 
 def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Send push notifications before FPL deadlines")
-    parser.add_argument("--lead-hours", type=float, default=2.0, help="How many hours before the deadline to notify")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("run", "serve"),
+        default="run",
+        help="'run' sends notifications (default); 'serve' exposes cached deadlines over HTTP",
+    )
+    parser.add_argument(
+        "--lead-hours",
+        type=float,
+        nargs="+",
+        default=[2.0],
+        help="How many hours before the deadline to notify; several values send one reminder each",
+    )
+    parser.add_argument(
+        "--first-kickoff",
+        action="store_true",
+        help="Also remind before the first match of each gameweek",
+    )
+    parser.add_argument(
+        "--kickoff-teams",
+        type=int,
+        nargs="+",
+        default=[],
+        metavar="TEAM_ID",
+        help="Also remind before every match of these FPL team ids (for example your players' teams)",
+    )
+    parser.add_argument(
+        "--double-gameweeks",
+        action="store_true",
+        help="Also remind before the deadline of a double gameweek, naming the teams that play twice",
+    )
+    parser.add_argument(
+        "--kickoff-lead-minutes",
+        type=float,
+        nargs="+",
+        default=[60.0],
+        help="How many minutes before a kickoff to send kickoff reminders",
+    )
     parser.add_argument(
         "--poll-minutes",
         type=float,
         default=30.0,
         help="How frequently to refresh the FPL API while waiting for the next deadline",
     )
+    parser.add_argument(
+        "--poll-policy",
+        choices=("fixed", "adaptive"),
+        default="fixed",
+        help="'fixed' polls every --poll-minutes; 'adaptive' polls more often as the deadline nears",
+    )
     parser.add_argument(
         "--timezone",
         default="UTC",
@@ -38,13 +82,114 @@ def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         default=None,
         help="Optional Pushover notification sound",
     )
+    parser.add_argument(
+        "--title-template",
+        default=None,
+        help="Notification title, e.g. '{name} closes in {lead}' (fields: lead, name, gameweek, time)",
+    )
+    parser.add_argument(
+        "--message-template",
+        default=None,
+        help="Notification message, with the same fields as --title-template",
+    )
     parser.add_argument("--device", default=None, help="Optional Pushover device name")
+    parser.add_argument(
+        "--channels",
+        default=None,
+        help="JSON file with a list of channel specs to notify in parallel (webhook, ntfy, smtp, pushover)",
+    )
     parser.add_argument(
         "--priority",
         type=int,
         default=None,
         help="Optional Pushover priority override",
     )
+    parser.add_argument(
+        "--background-refresh",
+        action="store_true",
+        help="Refresh deadlines in a background thread (with hedged requests) instead of during scheduling",
+    )
+    parser.add_argument(
+        "--subscribers",
+        default=None,
+        help="JSON Lines file of subscribers to notify instead of PUSHOVER_USER_KEY; reloaded when it changes",
+    )
+    parser.add_argument(
+        "--reload-seconds",
+        type=float,
+        default=30.0,
+        help="How often to check the --subscribers file for changes",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="With --subscribers, notify from this many worker processes (0 for one per CPU);"
+        " the file is read once at start",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory used to cache FPL API responses between conditional requests",
+    )
+    parser.add_argument(
+        "--state",
+        default=None,
+        help="SQLite file used to remember sent notifications and deadlines across restarts",
+    )
+    parser.add_argument(
+        "--lease",
+        default=None,
+        help="SQLite file shared by replicas; only the replica holding its lease polls and sends (needs --state)",
+    )
+    parser.add_argument("--replica-id", default=None, help="Name of this replica in the lease (default host:pid)")
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=15.0,
+        help="How long a replica's lease lasts without renewal; bounds the failover time",
+    )
+    parser.add_argument(
+        "--outbox",
+        default=None,
+        help="SQLite file used to queue notifications and retry failed sends until the deadline",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address the 'serve' command listens on")
+    parser.add_argument("--port", type=int, default=8080, help="Port the 'serve' command listens on")
+    parser.add_argument(
+        "--refresh-minutes",
+        type=float,
+        default=15.0,
+        help="How often the 'serve' command refreshes deadlines from the FPL API",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Collect metrics and expose them on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single step (send anything due), print the next wake-up time and exit",
+    )
+    parser.add_argument(
+        "--next-wakeup-file",
+        default=None,
+        help="With --once, also write the next wake-up time (ISO 8601) to this file",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="DIR",
+        help="Time steps, fetches and sends, and write cProfile/tracemalloc captures of slow steps to DIR",
+    )
+    parser.add_argument(
+        "--profile-threshold-ms",
+        type=float,
+        default=500.0,
+        help="With --profile, keep profiles of steps that take longer than this",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     parser.add_argument(
         "--send-test",
@@ -71,51 +216,261 @@ def _load_env_file(path: str = ".env") -> None:
         pass
 
 
+def _write_atomically(path: str, text: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    os.replace(tmp_path, path)
+
+
+def _subscriber_conflicts(args: argparse.Namespace) -> list[str]:
+    """Options given with ``--subscribers`` that the subscriber scheduler does not support."""
+
+    options = {
+        "--once": args.once,
+        "--send-test": args.send_test,
+        "--state": args.state,
+        "--outbox": args.outbox,
+        "--lease": args.lease,
+        "--channels": args.channels,
+        "--poll-policy": args.poll_policy != "fixed",
+        "--background-refresh": args.background_refresh,
+        "--first-kickoff": args.first_kickoff,
+        "--kickoff-teams": args.kickoff_teams,
+        "--double-gameweeks": args.double_gameweeks,
+        # Set per subscriber in the file instead.
+        "--sound": args.sound is not None,
+        "--device": args.device is not None,
+        "--priority": args.priority is not None,
+    }
+    return [flag for flag, given in options.items() if given]
+
+
+@contextmanager
+def _profiled(service, args: argparse.Namespace, *, once: bool = False) -> Iterator[None]:
+    """Instrument ``service`` for the block if ``--profile`` was given.
+
+    With ``once``, the single step is captured too if it is slow, since
+    there is no later step to profile.
+    """
+
+    if not args.profile:
+        yield
+        return
+    from .profiling import Profiler
+
+    profiler = Profiler(args.profile, threshold=timedelta(milliseconds=args.profile_threshold_ms))
+    profiler.instrument(service)
+    if once:
+        profiler.arm()
+    try:
+        yield
+    finally:
+        profiler.close()
+
+
 def main(argv: Optional[list[str]] = None) -> None:
     _load_env_file()
 
     args = _parse_args(argv)
     _configure_logging(args.verbose)
 
+    if args.metrics_port is not None:
+        from .metrics import start_http_server
+
+        start_http_server(args.metrics_port)
+
+    if args.command == "serve":
+        from .deadlines import fetch_gameweek_deadlines
+        from .server import DeadlineCache, serve
+
+        cache = DeadlineCache(
+            fetcher=partial(fetch_gameweek_deadlines, cache_dir=args.cache_dir),
+            refresh_interval=timedelta(minutes=args.refresh_minutes),
+        )
+        serve(args.host, args.port, cache=cache)
+        return
+
+    if args.shards is not None:
+        if not args.subscribers:
+            raise SystemExit("--shards needs --subscribers")
+        if args.shards < 0:
+            raise SystemExit("--shards must not be negative")
+        if args.profile:
+            raise SystemExit("--shards cannot be combined with --profile")
+    if args.subscribers:
+        conflicts = _subscriber_conflicts(args)
+        if conflicts:
+            raise SystemExit(f"--subscribers cannot be combined with {', '.join(conflicts)}")
+
     token = os.environ.get("PUSHOVER_TOKEN")
     user_key = os.environ.get("PUSHOVER_USER_KEY")
-    if not token or not user_key:
+    if (not token or not user_key) and not (args.channels or args.subscribers):
         raise SystemExit(
             "PUSHOVER_TOKEN and PUSHOVER_USER_KEY environment variables are required for Pushover"
         )
 
+    from zoneinfo import ZoneInfo
+
+    from .deadlines import fetch_gameweek_deadlines
+    from .notifier import PushoverNotifier
+    from .service import DeadlineNotificationService
+
     try:
         tz = ZoneInfo(args.timezone)
     except Exception as exc:  # pragma: no cover - user configuration issue
         raise SystemExit(f"Invalid timezone '{args.timezone}': {exc}")
 
-    notifier = PushoverNotifier(
-        token=token,
-        user_key=user_key,
-        timezone=tz,
-        sound=args.sound,
-        device=args.device,
-        priority=args.priority,
-    )
+    renderer = None
+    if args.title_template or args.message_template:
+        from .rendering import DEADLINE, DEFAULT_LOCALE, DEFAULT_TEMPLATES, MessageRenderer, Template
+
+        default = DEFAULT_TEMPLATES[DEADLINE]
+        try:
+            template = Template(args.title_template or default.title, args.message_template or default.message)
+        except ValueError as exc:
+            raise SystemExit(f"Invalid notification template: {exc}")
+        renderer = MessageRenderer({DEFAULT_LOCALE: {**DEFAULT_TEMPLATES, DEADLINE: template}})
+
+    if args.subscribers:
+        from .scheduler import SubscriberScheduler
+        from .subscribers import SubscriberNotifiers, SubscriberRegistry
+
+        if not os.path.exists(args.subscribers):
+            raise SystemExit(f"Subscriber file '{args.subscribers}' does not exist")
+        registry = SubscriberRegistry(
+            args.subscribers, timezone=tz, lead_times=[timedelta(hours=hours) for hours in args.lead_hours]
+        )
+        if args.shards is not None:
+            from .dispatcher import ShardedDispatcher
+
+            # Workers get a fixed partition of the subscribers; changes to the file need a restart.
+            registry.reload()
+            dispatcher = ShardedDispatcher(
+                list(registry),
+                notifier_factory=SubscriberNotifiers(token, renderer=renderer),
+                shards=args.shards or None,
+                poll_interval=timedelta(minutes=args.poll_minutes),
+                fetcher=partial(fetch_gameweek_deadlines, cache_dir=args.cache_dir),
+            )
+            dispatcher.run()
+            return
+        # Sent reminders are only remembered in memory: a restart can repeat them.
+        scheduler = SubscriberScheduler(
+            notifier_factory=SubscriberNotifiers(token, renderer=renderer),
+            poll_interval=timedelta(minutes=args.poll_minutes),
+            fetcher=partial(fetch_gameweek_deadlines, cache_dir=args.cache_dir),
+            registry=registry,
+            reload_interval=timedelta(seconds=args.reload_seconds),
+        )
+        with _profiled(scheduler, args):
+            scheduler.run()
+        return
+
+    pushover = dict(sound=args.sound, device=args.device, priority=args.priority)
+    if args.channels:
+        import json
+
+        from .channels import ChannelRegistry
 
-    lead_time = timedelta(hours=args.lead_hours)
+        try:
+            with open(args.channels, "r", encoding="utf-8") as handle:
+                specs = list(json.load(handle))
+        except (OSError, ValueError, TypeError) as exc:
+            raise SystemExit(f"Cannot read channels from '{args.channels}': {exc}")
+        if token and user_key:
+            specs.insert(0, {"type": "pushover", "token": token, "user_key": user_key, **pushover})
+        registry = ChannelRegistry()
+        try:
+            notifier = registry.notifier([registry.create(spec, timezone=tz, renderer=renderer) for spec in specs])
+        except (KeyError, TypeError, ValueError) as exc:
+            raise SystemExit(f"Invalid channel spec in '{args.channels}': {exc}")
+    else:
+        notifier = PushoverNotifier(token=token, user_key=user_key, timezone=tz, renderer=renderer, **pushover)
+
+    lease = None
+    if args.lease:
+        if not args.state or args.once:
+            raise SystemExit("--lease needs a shared --state file and cannot be used with --once")
+        from .lease import SQLiteLease
+
+        lease = SQLiteLease(args.lease, holder=args.replica_id, ttl=timedelta(seconds=args.lease_seconds))
+
+    store = None
+    if args.state:
+        from .store import SQLiteStateStore
+
+        store = SQLiteStateStore(args.state)
+    poll_policy = None
+    if args.poll_policy == "adaptive":
+        from .polling import AdaptivePollPolicy
+
+        poll_policy = AdaptivePollPolicy()
+    outbox = None
+    if args.outbox:
+        from .outbox import Outbox
+
+        outbox = Outbox(args.outbox)
+
+    fixtures = None
+    if args.first_kickoff or args.kickoff_teams or args.double_gameweeks:
+        from .fixtures import FixtureReminders, FixtureSource
+
+        fixtures = FixtureReminders(
+            first_kickoff=args.first_kickoff,
+            teams=args.kickoff_teams,
+            double_gameweeks=args.double_gameweeks,
+            lead_times=[timedelta(minutes=minutes) for minutes in args.kickoff_lead_minutes],
+            source=FixtureSource(cache_dir=args.cache_dir),
+        )
+
+    lead_times = [timedelta(hours=hours) for hours in args.lead_hours]
     poll_interval = timedelta(minutes=args.poll_minutes)
+    fetcher = partial(fetch_gameweek_deadlines, cache_dir=args.cache_dir)
+    refresher = None
+    if args.background_refresh and not args.once:
+        from .refresher import DeadlineRefresher
+
+        refresher = DeadlineRefresher(fetcher=fetcher, poll_policy=poll_policy, poll_interval=poll_interval)
     service = DeadlineNotificationService(
         notifier,
-        lead_time=lead_time,
+        lead_time=lead_times,
         poll_interval=poll_interval,
+        fetcher=fetcher,
+        store=store,
+        poll_policy=poll_policy,
+        outbox=outbox,
+        fixtures=fixtures,
+        refresher=refresher,
+        lease=lease,
     )
 
+    if args.metrics_port is not None:
+        from .metrics import SENT_ENTRIES
+
+        SENT_ENTRIES.set_function(service.store.sent_count)
+
     if args.send_test:
         from .deadlines import get_next_gameweek_deadline
 
-        upcoming = get_next_gameweek_deadline()
+        upcoming = get_next_gameweek_deadline(cache_dir=args.cache_dir)
         if not upcoming:
             raise SystemExit("No upcoming deadlines found")
-        notifier.send(upcoming, lead_time)
+        notifier.send(upcoming, service.lead_time)
+        return
+
+    if args.once:
+        if store is None:
+            logging.getLogger(__name__).warning("--once without --state cannot remember sent notifications")
+        with _profiled(service, args, once=True):
+            wake_at = service.run_once().isoformat()
+        print(wake_at)
+        if args.next_wakeup_file:
+            _write_atomically(args.next_wakeup_file, wake_at + "\n")
         return
 
-    service.run()
+    with _profiled(service, args):
+        service.run()
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI entry point
@@ -0,0 +1,367 @@
+"""asyncio-native counterparts of the notifier and notification service."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import inspect
+import io
+import logging
+import ssl
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, List, Optional, Protocol, Set, Tuple, Union
+from urllib import error, parse
+
+from zoneinfo import ZoneInfo
+
+from . import metrics
+from .deadlines import DeadlineChanges, GameweekDeadline, fetch_gameweek_deadlines
+from .notifier import PUSHOVER_API_URL, PushoverNotifier
+from .polling import PollPolicy
+from .reminders import LeadTimes, Reminder
+from .service import ServiceCore
+from .store import StateStore
+
+if TYPE_CHECKING:  # pragma: no cover - only needed when configured
+    from .fixtures import FixtureReminders
+
+LOGGER = logging.getLogger(__name__)
+
+AsyncSleepFunction = Callable[[float], Awaitable[None]]
+AsyncFetcher = Callable[..., Union[List[GameweekDeadline], Awaitable[List[GameweekDeadline]]]]
+
+_SSL_CONTEXT: Optional[ssl.SSLContext] = None
+
+
+class AsyncNotifier(Protocol):
+    async def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None: ...
+
+
+class _ThreadedNotifier:
+    """Run a blocking notifier's ``send`` in the default executor."""
+
+    def __init__(self, notifier) -> None:
+        self.notifier = notifier
+
+    async def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        await asyncio.to_thread(self.notifier.send, gameweek, lead_time)
+
+
+def as_async_notifier(notifier) -> AsyncNotifier:
+    """Return ``notifier`` unchanged if its ``send`` is a coroutine function,
+    otherwise wrap it so that blocking sends run in a worker thread."""
+
+    if inspect.iscoroutinefunction(getattr(notifier, "send", None)):
+        return notifier
+    return _ThreadedNotifier(notifier)
+
+
+def _ssl_context() -> ssl.SSLContext:
+    global _SSL_CONTEXT
+    if _SSL_CONTEXT is None:
+        _SSL_CONTEXT = ssl.create_default_context()
+    return _SSL_CONTEXT
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                await reader.readline()
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return await reader.read()
+
+
+async def post_form(url: str, fields: Dict[str, str], *, timeout: float) -> Tuple[int, bytes]:
+    """POST urlencoded ``fields`` to ``url`` and return ``(status, body)``.
+
+    Errors are reported with the same ``urllib.error`` exceptions the blocking
+    notifier raises, so callers can handle both the same way.
+    """
+
+    parts = parse.urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    body = parse.urlencode(fields).encode()
+    head = (
+        f"POST {target} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\n"
+        "Content-Type: application/x-www-form-urlencoded\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode("latin-1")
+
+    try:
+        async with asyncio.timeout(timeout):
+            reader, writer = await asyncio.open_connection(
+                parts.hostname, port, ssl=_ssl_context() if secure else None
+            )
+            try:
+                writer.write(head + body)
+                await writer.drain()
+                status_line = await reader.readline()
+                status = int(status_line.split(b" ", 2)[1])
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                response_body = await _read_body(reader, headers)
+            finally:
+                writer.close()
+    except OSError as exc:
+        raise error.URLError(exc) from exc
+
+    if status >= 400:
+        raise error.HTTPError(url, status, "HTTP error", None, io.BytesIO(response_body))
+    return status, response_body
+
+
+class AsyncPushoverNotifier:
+    """Send Pushover notifications without blocking the event loop."""
+
+    def __init__(
+        self,
+        token: str,
+        user_key: str,
+        *,
+        timezone: Optional[ZoneInfo] = None,
+        sound: Optional[str] = None,
+        device: Optional[str] = None,
+        priority: Optional[int] = None,
+        timeout: float = 10,
+        api_url: str = PUSHOVER_API_URL,
+    ) -> None:
+        # Validation and payload formatting are shared with the blocking notifier.
+        self._payloads = PushoverNotifier(
+            token,
+            user_key,
+            timezone=timezone,
+            sound=sound,
+            device=device,
+            priority=priority,
+        )
+        self.timeout = timeout
+        self.api_url = api_url
+
+    async def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        """Send a push notification for the provided gameweek."""
+
+        payload = self._payloads._build_payload(gameweek, lead_time)
+        LOGGER.info("Sending push notification for %s", gameweek)
+        try:
+            status, body = await post_form(self.api_url, payload, timeout=self.timeout)
+        except error.HTTPError as exc:
+            LOGGER.error("Pushover rejected the request: %s", exc.read().decode("utf-8", errors="replace"))
+            raise
+        except error.URLError as exc:
+            LOGGER.error("Failed to contact Pushover: %s", exc)
+            raise
+        LOGGER.debug("Notification accepted (status %s): %s", status, body.decode("utf-8", errors="replace"))
+
+
+async def deliver_all(
+    notifiers: Iterable,
+    gameweek: GameweekDeadline,
+    lead_time: timedelta,
+    *,
+    max_concurrency: int = 100,
+    timeout: float = 30.0,
+) -> List[Optional[BaseException]]:
+    """Send one reminder through many notifiers concurrently.
+
+    At most ``max_concurrency`` sends are in flight at once and each is
+    cancelled after ``timeout`` seconds. The result holds ``None`` for every
+    successful send and the raised exception otherwise, in input order.
+    """
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _send(notifier: AsyncNotifier) -> None:
+        async with semaphore:
+            await asyncio.wait_for(notifier.send(gameweek, lead_time), timeout)
+
+    results = await asyncio.gather(
+        *(_send(as_async_notifier(notifier)) for notifier in notifiers), return_exceptions=True
+    )
+    return [result if isinstance(result, BaseException) else None for result in results]
+
+
+class AsyncDeadlineNotificationService(ServiceCore):
+    """Event-loop based variant of :class:`~fpl_notifier.service.DeadlineNotificationService`.
+
+    Deliveries run as background tasks, bounded by ``max_concurrency`` and
+    ``send_timeout``, so a slow notification never holds up scheduling.
+    Blocking fetchers and notifiers are run in worker threads. As with the
+    blocking service, waits can be interrupted with :meth:`wake`.
+    """
+
+    def __init__(
+        self,
+        notifier,
+        *,
+        lead_time: LeadTimes = timedelta(hours=2),
+        poll_interval: timedelta = timedelta(hours=6),
+        fetcher: AsyncFetcher = fetch_gameweek_deadlines,
+        sleep_func: Optional[AsyncSleepFunction] = None,
+        store: Optional[StateStore] = None,
+        max_concurrency: int = 100,
+        send_timeout: float = 30.0,
+        fetch_timeout: float = 30.0,
+        poll_policy: Optional[PollPolicy] = None,
+        fixtures: Optional[FixtureReminders] = None,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        super().__init__(
+            as_async_notifier(notifier),
+            lead_time=lead_time,
+            poll_interval=poll_interval,
+            fetcher=fetcher,
+            store=store,
+            poll_policy=poll_policy,
+            fixtures=fixtures,
+        )
+        self.sleep = sleep_func or self._interruptible_sleep
+        self.send_timeout = send_timeout
+        self.fetch_timeout = fetch_timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Set[Tuple[int, int]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def _event(self) -> asyncio.Event:
+        # Created lazily so that it binds to the running loop.
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    async def _interruptible_sleep(self, seconds: float) -> None:
+        wakeup = self._event()
+        try:
+            await asyncio.wait_for(wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            return
+        wakeup.clear()
+
+    def wake(self) -> None:
+        """Interrupt the current wait so the next step runs immediately."""
+
+        self._event().set()
+
+    def stop(self) -> None:
+        """Make :meth:`run` return after the current step."""
+
+        self._stopping = True
+        self.wake()
+
+    async def refresh(self, *, now: Optional[datetime] = None) -> DeadlineChanges:
+        """Fetch deadlines now and wake the loop if anything changed."""
+
+        now = self._normalise_now(now)
+        deadlines = await self._fetch(now)
+        changes = self._remember_deadlines(deadlines, now)
+        self._prefetched = deadlines
+        if changes:
+            self.wake()
+        return changes
+
+    async def _fetch(self, now: datetime) -> List[GameweekDeadline]:
+        if inspect.iscoroutinefunction(self.fetcher):
+            call = self.fetcher(now=now)
+        else:
+            call = asyncio.to_thread(self.fetcher, now=now)
+        return await asyncio.wait_for(call, self.fetch_timeout)
+
+    async def step(self, *, now: Optional[datetime] = None) -> float:
+        """Perform a single scheduling step and return the suggested sleep time."""
+
+        now = self._normalise_now(now)
+        LOGGER.debug("Scheduler step at %s", now.isoformat())
+        started = time.perf_counter()
+        try:
+            return await self._step(now)
+        finally:
+            metrics.STEP_SECONDS.observe(time.perf_counter() - started)
+
+    async def _step(self, now: datetime) -> float:
+        self._prune_sent(now)
+
+        try:
+            deadlines = self._take_prefetched(now)
+            from_store = False
+            if deadlines is None:
+                deadlines = self._take_stored_deadlines(now)
+                from_store = deadlines is not None
+            if deadlines is None:
+                deadlines = await self._fetch(now)
+                self._remember_deadlines(deadlines, now)
+        except Exception as exc:
+            return self._fetch_failed(now, exc)
+
+        if self.fixtures is not None:
+            targets = await asyncio.to_thread(self.fixtures.targets, deadlines, now=now)
+            self._remember_targets(targets, now)
+        due, sleep_for = self._plan(deadlines, now)
+        for reminder in due:
+            if reminder.key in self._inflight:
+                continue
+            self._inflight.add(reminder.key)
+            task = asyncio.create_task(self._deliver(reminder))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if from_store:
+            sleep_for = self._cap_stored_sleep(sleep_for, now)
+        return sleep_for
+
+    async def _deliver(self, reminder: Reminder) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Label wrapped blocking notifiers by their own class.
+        notifier = self.notifier.notifier if isinstance(self.notifier, _ThreadedNotifier) else self.notifier
+        try:
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    await asyncio.wait_for(
+                        self.notifier.send(reminder.gameweek, reminder.lead_time), self.send_timeout
+                    )
+                except Exception:
+                    metrics.observe_send(notifier, time.perf_counter() - started, failed=True)
+                    raise
+                metrics.observe_send(notifier, time.perf_counter() - started, failed=False)
+            self._mark_sent(reminder)
+            self.schedule.resolve(reminder)
+        except Exception as exc:  # pragma: no cover - defensive
+            LOGGER.error("Failed to send notification: %s", exc, exc_info=True)
+        finally:
+            self._inflight.discard(reminder.key)
+
+    async def drain(self) -> None:
+        """Wait for every in-flight delivery to finish."""
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        LOGGER.info("Starting deadline notification service")
+        try:
+            while not self._stopping:
+                sleep_for = await self.step()
+                if sleep_for > 0 and not self._stopping:
+                    LOGGER.debug("Sleeping for %.2f seconds", sleep_for)
+                    await self.sleep(sleep_for)
+        finally:
+            await self.drain()
+            LOGGER.info("Shutting down notification service")
@@ -0,0 +1,465 @@
+"""Notification channels beyond Pushover, and delivery to several at once.
+
+Built-in channel types are ``pushover``, ``webhook`` (a JSON ``POST``),
+``ntfy`` (a plain text ``POST`` in the style of ntfy.sh) and ``smtp`` (an
+e-mail through a local mail server). A :class:`ChannelRegistry` builds
+channels from plain specs such as ``{"type": "ntfy", "url":
+"https://ntfy.sh/my-topic"}`` and a :class:`CompositeNotifier` sends one
+reminder to all of a subscriber's channels in parallel.
+
+Every channel name has a :class:`ChannelGuard`, shared by all subscribers
+using it: a timeout, a limit on concurrent sends, its own sending threads
+and a :class:`CircuitBreaker`. A slow channel can only tie up its own slots
+and threads, and a broken one is skipped until its breaker lets a trial
+send through, so neither holds up delivery on the other channels.
+
+A reminder counts as delivered once any of its channels delivered it; the
+channels that failed for it are not retried, even with an outbox.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import timedelta
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+from zoneinfo import ZoneInfo
+
+from . import metrics
+from .deadlines import GameweekDeadline
+from .notifier import PushoverNotifier
+from .rendering import DEFAULT_LOCALE, DEFAULT_RENDERER, MessageRenderer
+from .transport import HTTPConnectionPool, default_pool
+
+LOGGER = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending through a channel whose breaker is open."""
+
+
+class ChannelBusyError(RuntimeError):
+    """Raised when a channel is at its concurrency limit."""
+
+
+class DeliveryError(RuntimeError):
+    """Raised by :class:`CompositeNotifier` when no channel delivered."""
+
+    def __init__(self, failures: Mapping[str, BaseException]) -> None:
+        summary = ", ".join(f"{name}: {exc!r}" for name, exc in failures.items())
+        super().__init__(f"every channel failed ({summary})")
+        self.failures = dict(failures)
+
+
+class CircuitBreaker:
+    """Stop calling a channel after ``failure_threshold`` consecutive failures.
+
+    Once open, calls are refused for ``reset_timeout``; then a single trial
+    call is let through (half-open), which closes the breaker on success or
+    opens it again on failure.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: timedelta = timedelta(minutes=1),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout.total_seconds()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return CLOSED
+            if self._trial or self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return OPEN
+
+    def before_call(self) -> None:
+        """Raise :class:`CircuitOpenError` unless a call may go ahead."""
+
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._trial or self._clock() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("circuit open")
+            self._trial = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+
+class ChannelGuard:
+    """Timeout, concurrency limit and circuit breaker for one channel.
+
+    :meth:`submit` runs sends on the guard's own ``max_concurrency`` threads
+    and fails fast when they are all busy, so queued sends of a slow channel
+    never wait on threads other channels need. :meth:`call` sends in the
+    calling thread, waiting up to ``timeout`` for a free slot.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 10.0,
+        max_concurrency: int = 4,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _run(self, send: Callable[[], None]) -> None:
+        # Called with a slot held, which is released here.
+        try:
+            # Checked once a slot is held so that a half-open trial always runs.
+            self.breaker.before_call()
+            try:
+                send()
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+        finally:
+            self._slots.release()
+
+    def call(self, send: Callable[[], None]) -> None:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ChannelBusyError(f"{self.max_concurrency} sends already in flight")
+        self._run(send)
+
+    def submit(self, send: Callable[[], None]) -> Future:
+        """Start ``send`` on this channel's threads, or raise :class:`ChannelBusyError`."""
+
+        if not self._slots.acquire(blocking=False):
+            raise ChannelBusyError(f"{self.max_concurrency} sends already in flight")
+        try:
+            with self._lock:
+                if self._executor is None:
+                    # One thread per slot, so a submitted send never queues.
+                    self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="channel")
+                return self._executor.submit(self._run, send)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+class _RenderedChannel:
+    def __init__(
+        self,
+        *,
+        timezone: Optional[ZoneInfo] = None,
+        renderer: Optional[MessageRenderer] = None,
+        locale: str = DEFAULT_LOCALE,
+        timeout: float = 10.0,
+    ) -> None:
+        self.timezone = timezone or ZoneInfo("UTC")
+        self.renderer = renderer or DEFAULT_RENDERER
+        self.locale = locale
+        self.timeout = timeout
+
+
+class WebhookChannel(_RenderedChannel):
+    """``POST`` each reminder as JSON to ``url``."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        transport: Optional[HTTPConnectionPool] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.url = url
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.transport = transport
+
+    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        rendered = self.renderer.render(gameweek, lead_time, self.timezone, self.locale)
+        body = {
+            "event_id": gameweek.event_id,
+            "gameweek": getattr(gameweek, "gameweek", gameweek.event_id),
+            "kind": getattr(gameweek, "kind", "deadline"),
+            "name": gameweek.name,
+            "deadline": gameweek.deadline.isoformat(),
+            "lead_seconds": int(lead_time.total_seconds()),
+            "title": rendered.title,
+            "message": rendered.message,
+        }
+        transport = self.transport or default_pool()
+        transport.request(
+            "POST", self.url, body=json.dumps(body).encode("utf-8"), headers=self.headers, timeout=self.timeout
+        )
+
+
+class NtfyChannel(_RenderedChannel):
+    """``POST`` the message as plain text to an ntfy-style topic ``url``."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        priority: Optional[str] = None,
+        tags: Sequence[str] = (),
+        token: Optional[str] = None,
+        transport: Optional[HTTPConnectionPool] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.url = url
+        self.headers: Dict[str, str] = {}
+        if priority:
+            self.headers["Priority"] = priority
+        if tags:
+            self.headers["Tags"] = ",".join(tags)
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self.transport = transport
+
+    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        rendered = self.renderer.render(gameweek, lead_time, self.timezone, self.locale)
+        transport = self.transport or default_pool()
+        transport.request(
+            "POST",
+            self.url,
+            body=rendered.message.encode("utf-8"),
+            headers={**self.headers, "Title": rendered.title},
+            timeout=self.timeout,
+        )
+
+
+class SMTPChannel(_RenderedChannel):
+    """Send each reminder as an e-mail through the SMTP server at ``host``."""
+
+    def __init__(
+        self,
+        to: str,
+        *,
+        host: str = "localhost",
+        port: int = 25,
+        sender: str = "fpl-notifier@localhost",
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.to = to
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        from email.message import EmailMessage
+        import smtplib
+
+        rendered = self.renderer.render(gameweek, lead_time, self.timezone, self.locale)
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = self.to
+        message["Subject"] = rendered.title
+        message.set_content(rendered.message)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as client:
+            client.send_message(message)
+
+
+class GuardedChannel:
+    """A channel called through its :class:`ChannelGuard`."""
+
+    def __init__(self, name: str, channel, guard: ChannelGuard) -> None:
+        self.name = name
+        self.channel = channel
+        self.guard = guard
+
+    def _send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        started = time.perf_counter()
+        try:
+            self.channel.send(gameweek, lead_time)
+        except Exception:
+            metrics.observe_send(self.channel, time.perf_counter() - started, failed=True)
+            raise
+        metrics.observe_send(self.channel, time.perf_counter() - started, failed=False)
+
+    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        self.guard.call(lambda: self._send(gameweek, lead_time))
+
+    def submit(self, gameweek: GameweekDeadline, lead_time: timedelta) -> Future:
+        return self.guard.submit(lambda: self._send(gameweek, lead_time))
+
+
+class CompositeNotifier:
+    """Send each reminder to several channels at once.
+
+    The send succeeds when at least one channel delivered; failures of the
+    others are logged and not retried. When every channel failed,
+    :class:`DeliveryError` lists why. With ``parallel``, each channel sends
+    on its guard's threads; a channel still running after its guard's
+    timeout is reported as failed and left to finish in the background.
+    """
+
+    def __init__(self, channels: Sequence[GuardedChannel], *, parallel: bool = True) -> None:
+        if not channels:
+            raise ValueError("at least one channel is required")
+        self.channels = list(channels)
+        self.parallel = parallel
+
+    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        if len(self.channels) == 1 or not self.parallel:
+            failures = self._send_inline(gameweek, lead_time)
+        else:
+            failures = self._send_parallel(gameweek, lead_time)
+        if len(failures) == len(self.channels):
+            raise DeliveryError(failures)
+        for name, exc in failures.items():
+            LOGGER.warning("Channel %s failed for %s: %s", name, gameweek, exc)
+
+    def _send_inline(self, gameweek: GameweekDeadline, lead_time: timedelta) -> Dict[str, BaseException]:
+        failures: Dict[str, BaseException] = {}
+        for channel in self.channels:
+            try:
+                channel.send(gameweek, lead_time)
+            except Exception as exc:
+                failures[channel.name] = exc
+        return failures
+
+    def _send_parallel(self, gameweek: GameweekDeadline, lead_time: timedelta) -> Dict[str, BaseException]:
+        failures: Dict[str, BaseException] = {}
+        futures: Dict[Future, GuardedChannel] = {}
+        for channel in self.channels:
+            try:
+                futures[channel.submit(gameweek, lead_time)] = channel
+            except ChannelBusyError as exc:
+                failures[channel.name] = exc
+        _, pending = wait(futures, timeout=max(channel.guard.timeout for channel in self.channels))
+        for future, channel in futures.items():
+            if future in pending:
+                failures[channel.name] = TimeoutError(f"no answer within {channel.guard.timeout}s")
+                continue
+            exc = future.exception()
+            if exc is not None:
+                failures[channel.name] = exc
+        return failures
+
+
+ChannelFactory = Callable[..., object]
+
+CHANNEL_TYPES: Dict[str, ChannelFactory] = {
+    "pushover": PushoverNotifier,
+    "webhook": WebhookChannel,
+    "ntfy": NtfyChannel,
+    "smtp": SMTPChannel,
+}
+
+# Spec keys that configure the guard rather than the channel itself.
+_GUARD_KEYS = ("name", "type", "timeout", "max_concurrency", "failure_threshold", "reset_seconds")
+
+
+class ChannelRegistry:
+    """Build channels from specs, sharing one guard per channel name.
+
+    A spec is a mapping with a ``type`` (one of :data:`CHANNEL_TYPES` or a
+    type added with :meth:`register`), the channel's own arguments, and
+    optionally ``name`` (defaults to the type), ``timeout``,
+    ``max_concurrency``, ``failure_threshold`` and ``reset_seconds``. The
+    guard settings of the first spec seen for a name apply to all of them.
+    """
+
+    def __init__(self) -> None:
+        self._types: Dict[str, ChannelFactory] = dict(CHANNEL_TYPES)
+        self._guards: Dict[str, ChannelGuard] = {}
+        self._lock = threading.Lock()
+
+    def register(self, type_name: str, factory: ChannelFactory) -> None:
+        """Make ``factory(**spec_arguments)`` available as channel type ``type_name``."""
+
+        self._types[type_name] = factory
+
+    def guard(self, name: str) -> Optional[ChannelGuard]:
+        return self._guards.get(name)
+
+    def _guard_for(self, name: str, spec: Mapping[str, object]) -> ChannelGuard:
+        with self._lock:
+            guard = self._guards.get(name)
+            if guard is None:
+                breaker = CircuitBreaker(
+                    failure_threshold=int(spec.get("failure_threshold", 5)),
+                    reset_timeout=timedelta(seconds=float(spec.get("reset_seconds", 60))),
+                )
+                guard = self._guards[name] = ChannelGuard(
+                    timeout=float(spec.get("timeout", 10)),
+                    max_concurrency=int(spec.get("max_concurrency", 4)),
+                    breaker=breaker,
+                )
+            return guard
+
+    def create(self, spec: Mapping[str, object], **defaults) -> GuardedChannel:
+        """Build the channel described by ``spec``.
+
+        ``defaults`` (for example ``timezone`` or ``renderer``) are passed to
+        the channel unless the spec sets them.
+        """
+
+        try:
+            factory = self._types[str(spec["type"])]
+        except KeyError:
+            raise ValueError(f"unknown channel type in {dict(spec)!r}") from None
+        name = str(spec.get("name", spec["type"]))
+        guard = self._guard_for(name, spec)
+        arguments = {**defaults, "timeout": guard.timeout}
+        arguments.update({key: value for key, value in spec.items() if key not in _GUARD_KEYS})
+        return GuardedChannel(name, factory(**arguments), guard)
+
+    def notifier(self, channels: Sequence[GuardedChannel]) -> CompositeNotifier:
+        return CompositeNotifier(channels)
+
+    def notifier_for(self, subscriber) -> CompositeNotifier:
+        """A notifier for ``subscriber.options["channels"]``, usable as a ``notifier_factory``."""
+
+        specs: List[Mapping[str, object]] = list(subscriber.options.get("channels", ()))
+        channels = [self.create(spec, timezone=subscriber.timezone) for spec in specs]
+        return self.notifier(channels)
+
+    def close(self) -> None:
+        with self._lock:
+            guards = list(self._guards.values())
+        for guard in guards:
+            guard.close()
@@ -2,18 +2,35 @@
 
 from __future__ import annotations
 
+import gzip
+import hashlib
+import io
 import json
+from bisect import bisect_right
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import logging
-from typing import Callable, List, Optional, Sequence
-from urllib import request
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from urllib import error
+
+from . import metrics
+from .streaming import load_events_payload
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily to keep startup fast
+    from urllib import request
 
 LOGGER = logging.getLogger(__name__)
 
-API_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
+DEFAULT_API_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
+# Overridable to point the notifier at a mirror or a local stand-in server.
+API_URL = os.environ.get("FPL_API_URL") or DEFAULT_API_URL
 
 FetchJson = Callable[[str, int], dict]
+ParseJson = Callable[[BinaryIO], dict]
+_T = TypeVar("_T")
 
 
 @dataclass(frozen=True)
@@ -32,6 +49,43 @@ class GameweekDeadline:
         return f"{self.name} (GW {self.event_id}) @ {self.deadline.isoformat()}"
 
 
+@dataclass(frozen=True)
+class DeadlineChanges:
+    """Differences between two fetched deadline lists."""
+
+    added: Tuple[GameweekDeadline, ...] = ()
+    removed: Tuple[GameweekDeadline, ...] = ()
+    # (previous, current) pairs for events whose name or deadline changed.
+    changed: Tuple[Tuple[GameweekDeadline, GameweekDeadline], ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_deadlines(
+    previous: Sequence[GameweekDeadline],
+    current: Sequence[GameweekDeadline],
+    *,
+    now: Optional[datetime] = None,
+) -> DeadlineChanges:
+    """Compare two deadline lists by ``event_id``.
+
+    Previous deadlines at or before ``now`` are ignored, so gameweeks that
+    simply passed between fetches are not reported as removed.
+    """
+
+    before = {gw.event_id: gw for gw in previous if now is None or gw.deadline > now}
+    after = {gw.event_id: gw for gw in current}
+    added = tuple(gw for event_id, gw in after.items() if event_id not in before)
+    removed = tuple(gw for event_id, gw in before.items() if event_id not in after)
+    changed = tuple(
+        (before[event_id], gw)
+        for event_id, gw in after.items()
+        if event_id in before and before[event_id] != gw
+    )
+    return DeadlineChanges(added=added, removed=removed, changed=changed)
+
+
 def _coerce_to_utc(value: datetime) -> datetime:
     if value.tzinfo is None:
         return value.replace(tzinfo=timezone.utc)
@@ -52,46 +106,312 @@ def parse_deadline(deadline_str: str) -> datetime:
     return dt
 
 
+class _CountingReader:
+    """Forward ``read`` calls while counting the bytes returned."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
 def _default_fetch(url: str, timeout: int) -> dict:
+    # Only ``events`` is ever read, so skip materialising the rest.
+    from urllib import request
+
     with request.urlopen(url, timeout=timeout) as response:
-        return json.load(response)
+        if not metrics.is_enabled():
+            return load_events_payload(response)
+        reader = _CountingReader(response)
+        payload = load_events_payload(reader)
+        metrics.FETCH_READ_BYTES.observe(reader.bytes_read)
+        return payload
+
+
+def _read_body(response) -> bytes:
+    body = response.read()
+    if (response.headers.get("Content-Encoding") or "").lower() == "gzip":
+        body = gzip.decompress(body)
+    return body
+
+
+class CachedFetch:
+    """A ``FetchJson`` that revalidates a persistent on-disk copy of each URL.
+
+    The response body is stored next to its ``ETag``/``Last-Modified``
+    validators. Subsequent requests are conditional, and when the server
+    answers ``304 Not Modified`` the previously parsed payload is returned
+    as-is (the same object), so callers can skip re-parsing it as well.
+    Bodies are decoded with ``parse``, which defaults to the events-only
+    streaming parser. With ``cache_dir=None`` the copies are only kept in
+    memory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        *,
+        opener: Optional[request.OpenerDirector] = None,
+        parse: ParseJson = load_events_payload,
+    ) -> None:
+        self.cache_dir = cache_dir
+        if opener is None:
+            from urllib import request
+
+            opener = request.build_opener()
+        self.opener = opener
+        self.parse = parse
+        self._lock = threading.Lock()
+        # URL -> (validators, parsed payload) for entries already loaded.
+        self._memory: Dict[str, Tuple[Dict[str, str], dict]] = {}
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".meta.json"
+
+    def _load(self, url: str) -> Optional[Tuple[Dict[str, str], dict]]:
+        cached = self._memory.get(url)
+        if cached is not None or self.cache_dir is None:
+            return cached
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handle:
+                validators = json.load(handle)
+            with open(body_path, "rb") as handle:
+                payload = self.parse(handle)
+        except (OSError, ValueError):
+            return None
+        cached = (validators, payload)
+        self._memory[url] = cached
+        return cached
+
+    def _store(self, url: str, validators: Dict[str, str], body: bytes) -> None:
+        body_path, meta_path = self._paths(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for path, data in ((body_path, body), (meta_path, json.dumps(validators).encode("utf-8"))):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as handle:
+                    handle.write(data)
+                os.replace(tmp_path, path)
+        except OSError as exc:
+            LOGGER.warning("Unable to write response cache in %s: %s", self.cache_dir, exc)
+
+    def __call__(self, url: str, timeout: int) -> dict:
+        # The lock only guards the cached copies; requests run concurrently,
+        # so a hedged fetch is not stuck behind the one it is racing.
+        with self._lock:
+            cached = self._load(url)
+        headers = {"Accept-Encoding": "gzip"}
+        if cached is not None:
+            validators = cached[0]
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        from urllib import request
+
+        req = request.Request(url, headers=headers)
+        try:
+            with self.opener.open(req, timeout=timeout) as response:
+                body = _read_body(response)
+                response_headers = response.headers
+        except error.HTTPError as exc:
+            if exc.code != 304 or cached is None:
+                raise
+            LOGGER.debug("%s not modified; reusing cached payload", url)
+            return cached[1]
+
+        metrics.FETCH_READ_BYTES.observe(len(body))
+        payload = self.parse(io.BytesIO(body))
+        validators = {}
+        if response_headers.get("ETag"):
+            validators["etag"] = response_headers["ETag"]
+        if response_headers.get("Last-Modified"):
+            validators["last_modified"] = response_headers["Last-Modified"]
+        with self._lock:
+            self._memory[url] = (validators, payload)
+            if validators and self.cache_dir is not None:
+                self._store(url, validators, body)
+        return payload
+
+
+_CACHED_FETCHERS: Dict[str, CachedFetch] = {}
+_CACHED_FETCHERS_LOCK = threading.Lock()
+
+
+def _cached_fetch_for(cache_dir: str) -> CachedFetch:
+    key = os.path.abspath(cache_dir)
+    with _CACHED_FETCHERS_LOCK:
+        fetcher = _CACHED_FETCHERS.get(key)
+        if fetcher is None:
+            fetcher = _CACHED_FETCHERS[key] = CachedFetch(key)
+        return fetcher
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _epoch_us(value: datetime) -> int:
+    # Exact integer arithmetic, unlike ``timestamp()`` which rounds via float.
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class _DeadlineRecord:
+    __slots__ = ("event_id", "name", "raw", "epoch_us", "position", "gameweek")
+
+    def __init__(self, event_id: int, name: str, raw: str, deadline: datetime, position: int) -> None:
+        self.event_id = event_id
+        self.name = name
+        self.raw = raw
+        self.epoch_us = _epoch_us(deadline)
+        self.position = position
+        self.gameweek = GameweekDeadline(event_id=event_id, name=name, deadline=deadline)
+
+
+class DeadlineTable:
+    """Sorted deadlines kept up to date across fetches.
+
+    :meth:`update` only re-parses events whose ``deadline_time`` or name
+    changed since the previous call, and reuses the same
+    :class:`GameweekDeadline` objects for the rest. Lookups bisect an array
+    of integer epoch microseconds instead of filtering the whole list.
+    Not thread-safe; callers serialise access.
+    """
+
+    def __init__(self, events: Sequence[dict] = ()) -> None:
+        self._records: Dict[int, _DeadlineRecord] = {}
+        self._parsed: Dict[str, datetime] = {}
+        self._sorted: List[_DeadlineRecord] = []
+        self._epochs: List[int] = []
+        if events:
+            self.update(events)
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def __iter__(self) -> Iterator[GameweekDeadline]:
+        return (record.gameweek for record in self._sorted)
+
+    def _parse(self, raw: str) -> datetime:
+        deadline = self._parsed.get(raw)
+        if deadline is None:
+            deadline = self._parsed[raw] = parse_deadline(raw)
+        return deadline
+
+    def update(self, events: Sequence[dict]) -> bool:
+        """Apply the API's ``events`` list and return whether anything changed."""
+
+        # No shortcut on the list's identity: a fetcher may mutate and return
+        # the same list. Unchanged events cost a lookup and two comparisons.
+        records: Dict[int, _DeadlineRecord] = {}
+        changed = False
+        for position, event in enumerate(events):
+            try:
+                event_id = int(event["id"])
+                raw = event["deadline_time"]
+                name = str(event.get("name") or event.get("event", "Gameweek"))
+                record = self._records.get(event_id)
+                if record is None or record.raw != raw or record.name != name:
+                    record = _DeadlineRecord(event_id, name, raw, self._parse(raw), position)
+                    changed = True
+                elif record.position != position:
+                    record.position = position
+                    changed = True
+            except (AttributeError, KeyError, TypeError, ValueError) as exc:
+                LOGGER.warning("Skipping event with invalid deadline: %s", exc)
+                continue
+            records[event_id] = record
+
+        if not changed and len(records) == len(self._records):
+            return False
+        self._records = records
+        # Forget parsed strings that no longer appear so the memo stays small.
+        self._parsed = {record.raw: record.gameweek.deadline for record in records.values()}
+        self._sorted = sorted(records.values(), key=lambda record: (record.epoch_us, record.position))
+        self._epochs = [record.epoch_us for record in self._sorted]
+        return True
+
+    def upcoming(self, now: datetime) -> List[GameweekDeadline]:
+        """Deadlines strictly after ``now``, earliest first."""
+
+        start = bisect_right(self._epochs, _epoch_us(_coerce_to_utc(now)))
+        return [record.gameweek for record in self._sorted[start:]]
+
+    def next_after(self, now: datetime) -> Optional[GameweekDeadline]:
+        """The first deadline strictly after ``now``, if any."""
+
+        index = bisect_right(self._epochs, _epoch_us(_coerce_to_utc(now)))
+        return self._sorted[index].gameweek if index < len(self._sorted) else None
+
+    def window(self, start: datetime, end: datetime) -> List[GameweekDeadline]:
+        """Deadlines in the half-open interval ``(start, end]``."""
+
+        lo = bisect_right(self._epochs, _epoch_us(_coerce_to_utc(start)))
+        hi = bisect_right(self._epochs, _epoch_us(_coerce_to_utc(end)), lo)
+        return [record.gameweek for record in self._sorted[lo:hi]]
+
+
+# Shared by every call of ``fetch_gameweek_deadlines`` so that unchanged
+# events are not parsed again on each poll.
+_TABLE = DeadlineTable()
+_TABLE_LOCK = threading.Lock()
+
+
+def _resolve_fetcher(fetch_json: Optional[FetchJson], cache_dir: Optional[str]) -> FetchJson:
+    if fetch_json is not None:
+        return fetch_json
+    if cache_dir is not None:
+        return _cached_fetch_for(cache_dir)
+    return _default_fetch
+
+
+def _fetch_events(fetcher: FetchJson, url: Optional[str]) -> Sequence[dict]:
+    url = url or API_URL
+    LOGGER.debug("Fetching FPL data from %s", url)
+    started = time.perf_counter()
+    try:
+        payload = fetcher(url, 10)
+    except Exception:
+        metrics.FETCH_FAILURES.inc()
+        raise
+    metrics.FETCH_SECONDS.observe(time.perf_counter() - started)
+    return payload.get("events", [])
+
+
+def _query_table(events: Sequence[dict], query: Callable[[DeadlineTable], _T]) -> _T:
+    with _TABLE_LOCK:
+        started = time.perf_counter()
+        _TABLE.update(events)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - started)
+        return query(_TABLE)
 
 
 def fetch_gameweek_deadlines(
     *,
     now: Optional[datetime] = None,
     fetch_json: Optional[FetchJson] = None,
+    cache_dir: Optional[str] = None,
+    api_url: Optional[str] = None,
 ) -> List[GameweekDeadline]:
-    """Fetch upcoming gameweek deadlines from the public FPL API."""
+    """Fetch upcoming gameweek deadlines from the public FPL API.
 
-    if now is None:
-        now = datetime.now(timezone.utc)
-    else:
-        now = _coerce_to_utc(now)
-
-    fetcher = fetch_json or _default_fetch
-    LOGGER.debug("Fetching FPL data from %s", API_URL)
-    payload = fetcher(API_URL, 10)
-    events: Sequence[dict] = payload.get("events", [])
-    deadlines: List[GameweekDeadline] = []
-    for event in events:
-        try:
-            deadline = parse_deadline(event["deadline_time"])
-        except (KeyError, TypeError, ValueError) as exc:
-            LOGGER.warning("Skipping event with invalid deadline: %s", exc)
-            continue
-        if deadline <= now:
-            # Skip past deadlines, including the current active gameweek.
-            continue
-        deadlines.append(
-            GameweekDeadline(
-                event_id=int(event["id"]),
-                name=str(event.get("name") or event.get("event", "Gameweek")),
-                deadline=deadline,
-            )
-        )
-
-    deadlines.sort(key=lambda gw: gw.deadline)
+    When ``cache_dir`` is given (and no ``fetch_json`` override), responses are
+    kept on disk and revalidated with conditional requests. ``api_url``
+    replaces :data:`API_URL` (itself set from ``FPL_API_URL`` if present).
+    """
+
+    now = datetime.now(timezone.utc) if now is None else _coerce_to_utc(now)
+    events = _fetch_events(_resolve_fetcher(fetch_json, cache_dir), api_url)
+    # Skip past deadlines, including the current active gameweek.
+    deadlines = _query_table(events, lambda table: table.upcoming(now))
     LOGGER.debug("Found %d upcoming deadlines", len(deadlines))
     return deadlines
 
@@ -100,10 +420,11 @@ def get_next_gameweek_deadline(
     *,
     now: Optional[datetime] = None,
     fetch_json: Optional[FetchJson] = None,
+    cache_dir: Optional[str] = None,
+    api_url: Optional[str] = None,
 ) -> Optional[GameweekDeadline]:
     """Return the next upcoming gameweek deadline, if one exists."""
 
-    deadlines = fetch_gameweek_deadlines(now=now, fetch_json=fetch_json)
-    if not deadlines:
-        return None
-    return deadlines[0]
+    now = datetime.now(timezone.utc) if now is None else _coerce_to_utc(now)
+    events = _fetch_events(_resolve_fetcher(fetch_json, cache_dir), api_url)
+    return _query_table(events, lambda table: table.next_after(now))
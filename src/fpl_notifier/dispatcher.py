@@ -0,0 +1,259 @@
+"""Spread subscribers over worker processes for very large fan-outs.
+
+A :class:`ShardedDispatcher` assigns every subscriber to one of ``shards``
+worker processes by a stable hash of its id. Each worker runs its own
+:class:`~fpl_notifier.scheduler.SubscriberScheduler`; only the coordinator
+talks to the FPL API and broadcasts the deadlines it fetched, so the API
+sees one request per refresh however many workers there are.
+
+Subscribers and ``notifier_factory`` are sent to the workers, so both must
+be picklable (for example a module-level function rather than a lambda).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import multiprocessing
+from multiprocessing.context import BaseContext
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+import zlib
+
+from .deadlines import GameweekDeadline, fetch_gameweek_deadlines
+from .scheduler import Fetcher, NotifierFactory, Subscriber, SubscriberScheduler
+
+LOGGER = logging.getLogger(__name__)
+
+_TICK = object()
+
+
+def shard_for(subscriber_id: str, shards: int) -> int:
+    """Return the shard that owns ``subscriber_id``.
+
+    CRC-32 rather than :func:`hash`, whose value for strings changes
+    between interpreter runs.
+    """
+
+    return zlib.crc32(subscriber_id.encode("utf-8")) % shards
+
+
+@dataclass(frozen=True)
+class ShardStats:
+    """Delivery totals reported by one worker."""
+
+    shard: int
+    subscribers: int
+    delivered: int = 0
+    failed: int = 0
+    # Time spent inside scheduling steps, i.e. rendering and sending.
+    busy_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Delivery attempts per busy second."""
+
+        attempts = self.delivered + self.failed
+        return attempts / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+
+def _worker_main(
+    shard: int,
+    subscribers: Sequence[Subscriber],
+    notifier_factory: NotifierFactory,
+    poll_interval: timedelta,
+    retry_interval: timedelta,
+    inbox,
+    outbox,
+) -> None:
+    latest: List[List[GameweekDeadline]] = [[]]
+    scheduler = SubscriberScheduler(
+        subscribers,
+        notifier_factory=notifier_factory,
+        poll_interval=poll_interval,
+        retry_interval=retry_interval,
+        fetcher=lambda *, now: latest[0],
+    )
+    busy = 0.0
+    outbox.put(ShardStats(shard, len(subscribers)))
+
+    timeout: Optional[float] = None
+    while True:
+        try:
+            message = inbox.get(timeout=timeout)
+        except queue.Empty:
+            message = _TICK
+        if message is None:
+            break
+
+        started = time.perf_counter()
+        attempts = scheduler.delivered + scheduler.failed
+        if message is not _TICK:
+            latest[0] = message
+            scheduler.refresh(datetime.now(timezone.utc))
+        timeout = scheduler.step()
+        busy += time.perf_counter() - started
+        if scheduler.delivered + scheduler.failed != attempts:
+            outbox.put(ShardStats(shard, len(subscribers), scheduler.delivered, scheduler.failed, busy))
+
+
+class ShardedDispatcher:
+    """Coordinate per-shard delivery loops in worker processes."""
+
+    def __init__(
+        self,
+        subscribers: Iterable[Subscriber],
+        *,
+        notifier_factory: NotifierFactory,
+        shards: Optional[int] = None,
+        poll_interval: timedelta = timedelta(hours=6),
+        retry_interval: timedelta = timedelta(minutes=5),
+        fetcher: Fetcher = fetch_gameweek_deadlines,
+        context: Optional[BaseContext] = None,
+    ) -> None:
+        shards = shards or os.cpu_count() or 1
+        if shards <= 0:
+            raise ValueError("shards must be positive")
+        if poll_interval <= timedelta(0):
+            raise ValueError("poll_interval must be positive")
+
+        self.notifier_factory = notifier_factory
+        self.shards = shards
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self.fetcher = fetcher
+        self._context = context or multiprocessing.get_context()
+        self._partitions: List[List[Subscriber]] = [[] for _ in range(shards)]
+        for subscriber in subscribers:
+            self._partitions[shard_for(subscriber.subscriber_id, shards)].append(subscriber)
+
+        self._processes: List[multiprocessing.process.BaseProcess] = []
+        self._inboxes: list = []
+        self._outbox = None
+        self._stats: Dict[int, ShardStats] = {}
+        self._stopping = threading.Event()
+
+    def __enter__(self) -> "ShardedDispatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def partition_sizes(self) -> List[int]:
+        return [len(partition) for partition in self._partitions]
+
+    def start(self, timeout: float = 60.0) -> None:
+        """Start one worker per shard and wait until each is ready."""
+
+        if self._processes:
+            return
+        self._outbox = self._context.Queue()
+        for shard, partition in enumerate(self._partitions):
+            inbox = self._context.Queue()
+            process = self._context.Process(
+                target=_worker_main,
+                name=f"fpl-shard-{shard}",
+                args=(
+                    shard,
+                    partition,
+                    self.notifier_factory,
+                    self.poll_interval,
+                    self.retry_interval,
+                    inbox,
+                    self._outbox,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+
+        deadline = time.monotonic() + timeout
+        while len(self._stats) < self.shards:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise TimeoutError("shard workers did not start in time")
+            try:
+                self._record(self._outbox.get(timeout=remaining))
+            except queue.Empty:
+                continue
+        LOGGER.info("Started %d shards: %s subscribers", self.shards, self.partition_sizes())
+
+    def _record(self, stats: ShardStats) -> None:
+        self._stats[stats.shard] = stats
+
+    def broadcast(self, deadlines: Sequence[GameweekDeadline]) -> None:
+        """Send ``deadlines`` to every worker."""
+
+        payload = list(deadlines)
+        for inbox in self._inboxes:
+            inbox.put(payload)
+
+    def refresh(self, now: Optional[datetime] = None) -> Optional[List[GameweekDeadline]]:
+        """Fetch deadlines once and broadcast them; ``None`` if the fetch failed."""
+
+        now = now or datetime.now(timezone.utc)
+        try:
+            deadlines = self.fetcher(now=now)
+        except Exception as exc:
+            LOGGER.error("Failed to fetch deadlines: %s", exc, exc_info=True)
+            return None
+        self.broadcast(deadlines)
+        return deadlines
+
+    def stats(self) -> List[ShardStats]:
+        """Latest totals per shard, in shard order."""
+
+        if self._outbox is not None:
+            while True:
+                try:
+                    self._record(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+        return [self._stats[shard] for shard in sorted(self._stats)]
+
+    def run(self) -> None:
+        """Refresh and broadcast every ``poll_interval`` until :meth:`stop`."""
+
+        self.start()
+        LOGGER.info("Starting sharded dispatcher")
+        try:
+            while not self._stopping.is_set():
+                self.refresh()
+                self._stopping.wait(self.poll_interval.total_seconds())
+                for stats in self.stats():
+                    LOGGER.info(
+                        "Shard %d: %d delivered, %d failed, %.0f/s",
+                        stats.shard,
+                        stats.delivered,
+                        stats.failed,
+                        stats.throughput,
+                    )
+        except KeyboardInterrupt:  # pragma: no cover - manual interrupt
+            pass
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop every worker, terminating those that do not exit in time."""
+
+        self._stopping.set()
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():  # pragma: no cover - stuck worker
+                process.terminate()
+                process.join()
+        self._processes = []
+        self._inboxes = []
+        LOGGER.info("Shut down sharded dispatcher")
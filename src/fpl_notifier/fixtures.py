@@ -0,0 +1,297 @@
+"""Fixture-level reminders: first kickoffs, chosen teams' matches and doubles.
+
+Fixtures come from the FPL ``fixtures`` endpoint, requested one gameweek at
+a time (``?event=N``) and only for the next few upcoming gameweeks, plus the
+current gameweek (whose deadline has passed but whose matches may not have)
+and any other gameweek whose matches have not all kicked off yet. Requests are
+conditional, so an unchanged gameweek costs a ``304`` and no parsing.
+
+Reminders are expressed as :class:`FixtureDeadline` objects, a kind of
+:class:`~fpl_notifier.deadlines.GameweekDeadline` whose ``deadline`` is the
+moment to remind about. They are scheduled, deduplicated and persisted
+exactly like gameweek deadlines; their ``event_id`` is a reminder id from
+a range that cannot clash with real gameweek ids (see :func:`reminder_id`),
+and the gameweek itself is kept in ``gameweek``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from urllib.parse import urljoin
+
+from .deadlines import API_URL, CachedFetch, FetchJson, GameweekDeadline, parse_deadline
+from .reminders import LeadTimes, normalise_lead_times
+
+LOGGER = logging.getLogger(__name__)
+
+# Next to ``bootstrap-static`` unless overridden, so FPL_API_URL moves both.
+FIXTURES_URL = os.environ.get("FPL_FIXTURES_URL") or urljoin(API_URL, "../fixtures/?event={event_id}")
+
+FIRST_KICKOFF = "first_kickoff"
+KICKOFF = "kickoff"
+DOUBLE_GAMEWEEK = "double_gameweek"
+
+# Reminder ids are offset per kind so they never equal a gameweek id (1-38)
+# or each other; the store and outbox key reminders by these ids.
+_ID_BASE = {FIRST_KICKOFF: 1_000_000, KICKOFF: 2_000_000, DOUBLE_GAMEWEEK: 3_000_000}
+
+
+def reminder_id(kind: str, number: int) -> int:
+    """Return the id of the ``kind`` reminder for gameweek or fixture ``number``."""
+
+    return _ID_BASE[kind] + number
+
+
+@dataclass(frozen=True)
+class Fixture:
+    fixture_id: int
+    event_id: int
+    kickoff: datetime
+    team_h: int
+    team_a: int
+
+
+@dataclass(frozen=True)
+class FixtureDeadline(GameweekDeadline):
+    """A fixture-level moment scheduled like a gameweek deadline.
+
+    ``lead_times`` overrides the service's reminder plan for this target
+    when not empty.
+    """
+
+    gameweek: int = 0
+    kind: str = KICKOFF
+    teams: Tuple[int, ...] = ()
+    lead_times: Tuple[timedelta, ...] = ()
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.name} ({self.kind}, GW {self.gameweek}) @ {self.deadline.isoformat()}"
+
+
+def parse_fixtures(payload: Iterable[dict]) -> List[Fixture]:
+    """Turn a ``fixtures`` response into fixtures with a kickoff time, by kickoff."""
+
+    fixtures = []
+    for item in payload:
+        try:
+            if item.get("event") is None or not item.get("kickoff_time"):
+                continue  # Not scheduled yet.
+            fixtures.append(
+                Fixture(
+                    fixture_id=int(item["id"]),
+                    event_id=int(item["event"]),
+                    kickoff=parse_deadline(item["kickoff_time"]),
+                    team_h=int(item["team_h"]),
+                    team_a=int(item["team_a"]),
+                )
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            LOGGER.debug("Skipping invalid fixture %r: %s", item, exc)
+    fixtures.sort(key=lambda fixture: (fixture.kickoff, fixture.fixture_id))
+    return fixtures
+
+
+class FixtureSource:
+    """Per-gameweek fixtures, fetched only for gameweeks that still matter.
+
+    Each gameweek is re-requested at most every ``refresh_interval``; the
+    payload is parsed again only when the server returned a new one.
+    """
+
+    def __init__(
+        self,
+        *,
+        fetch_json: Optional[FetchJson] = None,
+        cache_dir: Optional[str] = None,
+        gameweeks: int = 2,
+        refresh_interval: timedelta = timedelta(hours=6),
+        timeout: int = 10,
+    ) -> None:
+        if gameweeks <= 0:
+            raise ValueError("gameweeks must be positive")
+        self.fetch_json = fetch_json or CachedFetch(cache_dir, parse=json.load)
+        self.gameweeks = gameweeks
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.requests = 0
+        self._lock = threading.Lock()
+        # event id -> (raw payload, parsed fixtures, fetched at)
+        self._events: Dict[int, Tuple[object, List[Fixture], datetime]] = {}
+        # Gameweeks seen with every match kicked off; never fetched again.
+        self._finished: Set[int] = set()
+
+    def _refresh(self, event_id: int, now: datetime) -> None:
+        cached = self._events.get(event_id)
+        if cached is not None and now - cached[2] < self.refresh_interval:
+            return
+        self.requests += 1
+        try:
+            payload = self.fetch_json(FIXTURES_URL.format(event_id=event_id), self.timeout)
+        except Exception as exc:
+            LOGGER.warning("Failed to fetch fixtures for GW %s: %s", event_id, exc)
+            return
+        if cached is not None and payload is cached[0]:
+            self._events[event_id] = (payload, cached[1], now)
+            return
+        fixtures = [fixture for fixture in parse_fixtures(payload) if fixture.event_id == event_id]
+        self._events[event_id] = (payload, fixtures, now)
+
+    def update(self, deadlines: Sequence[GameweekDeadline], *, now: datetime) -> Dict[int, List[Fixture]]:
+        """Refresh what is due and return fixtures by gameweek.
+
+        ``deadlines`` are the upcoming gameweek deadlines in order; the first
+        ``gameweeks`` of them are fetched, as are earlier gameweeks that
+        still have matches to come. That includes the current gameweek (the
+        one before the first upcoming deadline; gameweek ids are sequential),
+        also on a cold start after its deadline has passed.
+        """
+
+        with self._lock:
+            wanted = [gameweek.event_id for gameweek in deadlines[: self.gameweeks]]
+            for event_id, (_, fixtures, _) in list(self._events.items()):
+                if event_id in wanted:
+                    continue
+                if any(fixture.kickoff > now for fixture in fixtures):
+                    wanted.append(event_id)
+                else:
+                    del self._events[event_id]
+                    self._finished.add(event_id)
+            current = deadlines[0].event_id - 1 if deadlines else 0
+            if current > 0 and current not in wanted and current not in self._finished:
+                wanted.append(current)
+            for event_id in wanted:
+                self._refresh(event_id, now)
+            return {event_id: cached[1] for event_id, cached in self._events.items()}
+
+
+def _team_name(team_names: Mapping[int, str], team: int) -> str:
+    return team_names.get(team, f"Team {team}")
+
+
+class FixtureReminders:
+    """Build fixture-level reminder targets from a :class:`FixtureSource`.
+
+    * ``first_kickoff``: one reminder per gameweek before its first match.
+    * ``teams``: a reminder before every match of these team ids (for
+      example the teams of the players in your squad).
+    * ``double_gameweeks``: a reminder before the deadline of a gameweek in
+      which some teams play more than once, naming them.
+
+    Kickoff reminders use ``lead_times``; double gameweek reminders use the
+    service's own reminder plan, like the deadline they precede.
+    """
+
+    def __init__(
+        self,
+        *,
+        first_kickoff: bool = False,
+        teams: Iterable[int] = (),
+        double_gameweeks: bool = False,
+        lead_times: LeadTimes = timedelta(hours=1),
+        team_names: Optional[Mapping[int, str]] = None,
+        source: Optional[FixtureSource] = None,
+    ) -> None:
+        self.first_kickoff = first_kickoff
+        self.teams = frozenset(teams)
+        self.double_gameweeks = double_gameweeks
+        self.lead_times = normalise_lead_times(lead_times)
+        self.team_names = dict(team_names or {})
+        self.source = source or FixtureSource()
+        # Fixtures by gameweek as of the last :meth:`refresh`.
+        self._by_event: Dict[int, List[Fixture]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.first_kickoff or self.teams or self.double_gameweeks)
+
+    def refresh(self, deadlines: Sequence[GameweekDeadline], *, now: datetime) -> bool:
+        """Fetch what is due from the source; return whether any fixtures changed."""
+
+        if not self:
+            return False
+        by_event = self.source.update(deadlines, now=now)
+        changed = by_event != self._by_event
+        self._by_event = by_event
+        return changed
+
+    def targets(
+        self, deadlines: Sequence[GameweekDeadline], *, now: datetime, refresh: bool = True
+    ) -> List[FixtureDeadline]:
+        """Fixture reminder targets still ahead of ``now``, in time order.
+
+        With ``refresh=False`` nothing is fetched; the fixtures of the last
+        :meth:`refresh` are used.
+        """
+
+        if not self:
+            return []
+        if refresh:
+            self.refresh(deadlines, now=now)
+        by_event = self._by_event
+        gameweek_deadlines = {gameweek.event_id: gameweek for gameweek in deadlines}
+        targets = []
+        for event_id, fixtures in by_event.items():
+            targets.extend(self._event_targets(event_id, fixtures, gameweek_deadlines.get(event_id)))
+        targets = [target for target in targets if target.deadline > now]
+        targets.sort(key=lambda target: (target.deadline, target.event_id))
+        return targets
+
+    def _match_name(self, fixture: Fixture) -> str:
+        home = _team_name(self.team_names, fixture.team_h)
+        away = _team_name(self.team_names, fixture.team_a)
+        return f"{home} v {away}"
+
+    def _event_targets(
+        self, event_id: int, fixtures: List[Fixture], deadline: Optional[GameweekDeadline]
+    ) -> List[FixtureDeadline]:
+        targets = []
+        if self.first_kickoff and fixtures:
+            first = fixtures[0]
+            targets.append(
+                FixtureDeadline(
+                    reminder_id(FIRST_KICKOFF, event_id),
+                    self._match_name(first),
+                    first.kickoff,
+                    gameweek=event_id,
+                    kind=FIRST_KICKOFF,
+                    teams=(first.team_h, first.team_a),
+                    lead_times=self.lead_times,
+                )
+            )
+        for fixture in fixtures:
+            if fixture.team_h in self.teams or fixture.team_a in self.teams:
+                targets.append(
+                    FixtureDeadline(
+                        reminder_id(KICKOFF, fixture.fixture_id),
+                        self._match_name(fixture),
+                        fixture.kickoff,
+                        gameweek=event_id,
+                        kind=KICKOFF,
+                        teams=(fixture.team_h, fixture.team_a),
+                        lead_times=self.lead_times,
+                    )
+                )
+        if self.double_gameweeks and deadline is not None:
+            counts: Dict[int, int] = {}
+            for fixture in fixtures:
+                for team in (fixture.team_h, fixture.team_a):
+                    counts[team] = counts.get(team, 0) + 1
+            doubles = tuple(sorted(team for team, count in counts.items() if count > 1))
+            if doubles:
+                names = ", ".join(_team_name(self.team_names, team) for team in doubles)
+                targets.append(
+                    FixtureDeadline(
+                        reminder_id(DOUBLE_GAMEWEEK, event_id),
+                        f"{deadline.name} doubles: {names}",
+                        deadline.deadline,
+                        gameweek=event_id,
+                        kind=DOUBLE_GAMEWEEK,
+                        teams=doubles,
+                    )
+                )
+        return targets
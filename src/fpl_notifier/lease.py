@@ -0,0 +1,195 @@
+"""Leader election between replicas through a lease in a shared SQLite file.
+
+Run several copies of the notifier against the same lease database (and the
+same ``--state`` store, so whoever leads knows what was already sent); only
+the replica holding the lease polls and sends. The leader renews the lease
+every ``renew_interval``. If it stops renewing, for example because it crashed
+or hung, another replica takes over once ``ttl`` has passed. A replica that
+shuts down cleanly releases the lease so the next one takes over at its next
+attempt.
+
+Every change of holder increments the lease's ``token``, which can be used
+as a fencing token: :meth:`SQLiteLease.verify` checks that the token is
+still the current one before acting as leader. A takeover records how long
+the lease went without a live holder in :attr:`SQLiteLease.last_failover`.
+
+A leader that cannot reach the database, for example because another
+replica holds its write lock for longer than the busy timeout, keeps
+leading until its lease expires: no other replica can take it before then.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from . import metrics
+
+LOGGER = logging.getLogger(__name__)
+
+Clock = Callable[[], float]
+
+
+def default_holder() -> str:
+    """A replica id unique to this process: ``host:pid``."""
+
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SQLiteLease:
+    """A named, time-limited lease stored in an SQLite database.
+
+    ``clock`` must be a wall clock shared by all replicas (seconds since the
+    epoch), since expiry times are compared across processes.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            token INTEGER NOT NULL,
+            renewed_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        name: str = "leader",
+        holder: Optional[str] = None,
+        ttl: timedelta = timedelta(seconds=15),
+        renew_interval: Optional[timedelta] = None,
+        clock: Clock = time.time,
+    ) -> None:
+        if ttl <= timedelta(0):
+            raise ValueError("ttl must be positive")
+        renew_interval = renew_interval or ttl / 3
+        if not timedelta(0) < renew_interval < ttl:
+            raise ValueError("renew_interval must be positive and shorter than ttl")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.name = name
+        self.holder = holder or default_holder()
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.clock = clock
+        self.token: Optional[int] = None
+        self.last_failover: Optional[float] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=ttl.total_seconds(), check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute(self._SCHEMA)
+
+    @property
+    def held(self) -> bool:
+        """Whether this replica held the lease at its last renewal and it has not expired since."""
+
+        return self.token is not None and self.clock() < self._expires_at
+
+    def verify(self) -> bool:
+        """Whether the lease is still ours in the database, with our token and not expired.
+
+        Unlike :attr:`held`, this notices a lease taken over or released
+        behind this replica's back; call it right before acting as leader.
+        """
+
+        with self._lock:
+            token = self.token
+            if token is None or self.clock() >= self._expires_at:
+                return False
+            row = self._conn.execute(
+                "SELECT holder, token, expires_at FROM leases WHERE name = ?", (self.name,)
+            ).fetchone()
+        return row is not None and (row[0], row[1]) == (self.holder, token) and self.clock() < row[2]
+
+    def acquire(self) -> bool:
+        """Take or renew the lease if it is free, expired or already ours."""
+
+        with self._lock:
+            now = self.clock()
+            expires_at = now + self.ttl.total_seconds()
+            conn = self._conn
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as exc:
+                LOGGER.warning("Could not lock lease %s: %s", self.path, exc)
+                return self._unconfirmed(now)
+            try:
+                row = conn.execute(
+                    "SELECT holder, token, renewed_at, expires_at FROM leases WHERE name = ?", (self.name,)
+                ).fetchone()
+                if row is not None and row[0] != self.holder and row[3] > now:
+                    conn.execute("COMMIT")
+                    return self._lost()
+                if row is not None and row[0] == self.holder:
+                    token = row[1]
+                else:
+                    token = row[1] + 1 if row is not None else 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO leases (name, holder, token, renewed_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self.name, self.holder, token, now, expires_at),
+                )
+                conn.execute("COMMIT")
+            except sqlite3.OperationalError as exc:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                LOGGER.warning("Could not renew lease %s: %s", self.path, exc)
+                return self._unconfirmed(now)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if self.token != token:
+            if row is not None and row[0] != self.holder:
+                # The previous holder's last renewal is when it was last known to be alive.
+                self.last_failover = now - row[2]
+                metrics.LEASE_FAILOVER_SECONDS.observe(self.last_failover)
+                LOGGER.info("Took over lease %r from %s after %.2f seconds", self.name, row[0], self.last_failover)
+            else:
+                LOGGER.info("Acquired lease %r", self.name)
+            metrics.LEASE_HELD.set(1)
+        self.token = token
+        self._expires_at = expires_at
+        return True
+
+    def _unconfirmed(self, now: float) -> bool:
+        # The database being busy says nothing about who holds the lease, and
+        # nobody can take ours before it expires, so keep leading until then.
+        if self.token is not None and now < self._expires_at:
+            return True
+        return self._lost()
+
+    def _lost(self) -> bool:
+        if self.token is not None:
+            LOGGER.warning("Lost lease %r", self.name)
+            metrics.LEASE_HELD.set(0)
+        self.token = None
+        return False
+
+    def release(self) -> None:
+        """Give the lease up so another replica can take it straight away."""
+
+        with self._lock:
+            if self.token is not None:
+                # Expire rather than delete, so the next holder's token still increases.
+                self._conn.execute(
+                    "UPDATE leases SET expires_at = 0 WHERE name = ? AND holder = ?", (self.name, self.holder)
+                )
+                LOGGER.info("Released lease %r", self.name)
+                metrics.LEASE_HELD.set(0)
+            self.token = None
+
+    def close(self) -> None:
+        self.release()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,273 @@
+"""Counters, gauges and histograms in the Prometheus text format.
+
+Recording is disabled by default; every ``inc``/``observe`` then returns
+after a single attribute check. Call :func:`enable` (or run the CLI with
+``--metrics-port``) to start collecting, and :func:`start_http_server` to
+expose ``/metrics`` for scraping.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import logging
+import math
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - http.server is only needed when serving
+    from .metrics_server import MetricsServer
+
+LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1_024, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216)
+DRIFT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    """A set of metrics rendered together; collection is off until enabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._metrics: List["_Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), *, registry: Registry = REGISTRY
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        registry.register(self)
+
+    def labels(self, *values: str) -> "_Metric":
+        """Return the child metric for one combination of label values."""
+
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> "_Metric":
+        child = object.__new__(type(self))
+        child.__dict__.update(self.__dict__)
+        child._lock = threading.Lock()
+        child._children = {}
+        child._reset()
+        return child
+
+    def _reset(self) -> None:  # pragma: no cover - overridden
+        pass
+
+    def samples(self) -> List[str]:
+        if not self.labelnames:
+            return self._samples(())
+        lines: List[str] = []
+        for values, child in sorted(self._children.items()):
+            lines.extend(child._samples(values))
+        return lines
+
+    def _samples(self, values: Tuple[str, ...]) -> List[str]:  # pragma: no cover - overridden
+        return []
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+    def _samples(self, values: Tuple[str, ...]) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, or is read from a callback when scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        if self._registry.enabled:
+            self.value = value
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Read the value from ``function`` at scrape time instead."""
+
+        self._function = function
+
+    def _samples(self, values: Tuple[str, ...]) -> List[str]:
+        value = self.value
+        if self._function is not None and self._registry.enabled:
+            try:
+                value = self._function()
+            except Exception as exc:  # pragma: no cover - defensive
+                LOGGER.debug("Unable to read %s: %s", self.name, exc)
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(*args, **kwargs)
+        self._reset()
+
+    def _reset(self) -> None:
+        # One slot per bucket plus the +Inf overflow slot; cumulated on render.
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        if not self._registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def _samples(self, values: Tuple[str, ...]) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+FETCH_SECONDS = Histogram("fpl_fetch_seconds", "Time spent fetching the FPL API, including decoding.")
+# The default fetcher stops reading once ``events`` is parsed, so this is
+# what was read per fetch rather than the full response size.
+FETCH_READ_BYTES = Histogram(
+    "fpl_fetch_read_bytes",
+    "Decoded FPL API response bytes read per fetch, up to where parsing stopped (304 responses excluded).",
+    buckets=SIZE_BUCKETS,
+)
+FETCH_FAILURES = Counter("fpl_fetch_failures_total", "Failed deadline fetches.")
+FETCH_HEDGES = Counter("fpl_fetch_hedges_total", "Duplicate deadline fetches started because upstream was slow.")
+PARSE_SECONDS = Histogram("fpl_parse_seconds", "Time spent turning API events into deadlines.")
+STEP_SECONDS = Histogram("fpl_step_seconds", "Duration of one scheduling step.")
+SLEEP_DRIFT_SECONDS = Histogram(
+    "fpl_sleep_drift_seconds", "How late a reminder woke up after its scheduled time.", buckets=DRIFT_BUCKETS
+)
+SEND_SECONDS = Histogram("fpl_notification_send_seconds", "Notification send latency.", ("notifier",))
+SEND_FAILURES = Counter("fpl_notification_failures_total", "Failed notification sends.", ("notifier",))
+# Bound once, by whoever owns the store (the CLI binds its service's store).
+SENT_ENTRIES = Gauge("fpl_sent_entries", "Notifications remembered as already sent.")
+LEASE_HELD = Gauge("fpl_lease_held", "1 while this replica holds the leader lease.")
+LEASE_FAILOVER_SECONDS = Histogram(
+    "fpl_lease_failover_seconds",
+    "Time between the previous leader's last renewal and a takeover.",
+    buckets=DRIFT_BUCKETS,
+)
+
+
+def enable() -> None:
+    REGISTRY.enabled = True
+
+
+def disable() -> None:
+    REGISTRY.enabled = False
+
+
+def is_enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def observe_send(notifier: object, seconds: float, failed: bool) -> None:
+    """Record one notification attempt through ``notifier``."""
+
+    if not REGISTRY.enabled:
+        return
+    label = type(notifier).__name__
+    SEND_SECONDS.labels(label).observe(seconds)
+    if failed:
+        SEND_FAILURES.labels(label).inc()
+
+
+def start_http_server(port: int, host: str = "127.0.0.1", *, registry: Registry = REGISTRY) -> "MetricsServer":
+    """Enable ``registry`` and serve it on ``/metrics`` from a daemon thread."""
+
+    from .metrics_server import MetricsServer
+
+    registry.enabled = True
+    server = MetricsServer((host, port), registry)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    LOGGER.info("Serving metrics on http://%s:%s/metrics", *server.server_address[:2])
+    return server
@@ -0,0 +1,43 @@
+"""HTTP endpoint serving a :class:`~fpl_notifier.metrics.Registry`.
+
+Kept apart from :mod:`fpl_notifier.metrics` so that recording metrics does
+not pull in :mod:`http.server`.
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+from typing import Tuple
+
+from .metrics import CONTENT_TYPE, REGISTRY, Registry
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "MetricsServer"
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], registry: Registry = REGISTRY) -> None:
+        super().__init__(address, _Handler)
+        self.registry = registry
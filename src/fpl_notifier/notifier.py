@@ -4,32 +4,39 @@ from __future__ import annotations
 
 from datetime import timedelta
 import logging
-from typing import Optional
-from urllib import error, parse, request
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, List, Mapping, Optional, Union
+from urllib import error, parse
 
 from zoneinfo import ZoneInfo
 
 from .deadlines import GameweekDeadline
+from .rendering import DEFAULT_LOCALE, DEFAULT_RENDERER, MessageRenderer, RenderedMessage
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily to keep startup fast
+    from urllib import request
+
+    from .transport import HTTPConnectionPool
 
 LOGGER = logging.getLogger(__name__)
 
-PUSHOVER_API_URL = "https://api.pushover.net/1/messages.json"
+DEFAULT_PUSHOVER_API_URL = "https://api.pushover.net/1/messages.json"
+# Overridable to send through a proxy or to a local stand-in server.
+PUSHOVER_API_URL = os.environ.get("PUSHOVER_API_URL") or DEFAULT_PUSHOVER_API_URL
+
+# A user key, or a mapping of payload fields (``user``, ``device``, ...) that
+# override the notifier's defaults for one recipient.
+Recipient = Union[str, Mapping[str, str]]
+
 
+class RateLimitedError(RuntimeError):
+    """Raised instead of sending while Pushover's rate limit is exhausted."""
 
-def _format_timedelta(delta: timedelta) -> str:
-    total_seconds = int(delta.total_seconds())
-    if total_seconds < 60:
-        return f"{total_seconds} seconds"
-    minutes, seconds = divmod(total_seconds, 60)
-    hours, minutes = divmod(minutes, 60)
-    parts = []
-    if hours:
-        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-    if minutes:
-        parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-    if seconds and not hours:
-        parts.append(f"{seconds} second{'s' if seconds != 1 else ''}")
-    return " and ".join(parts)
+    def __init__(self, reset_at: float) -> None:
+        super().__init__(f"Pushover rate limit exhausted until {reset_at:.0f}")
+        self.reset_at = reset_at
 
 
 class PushoverNotifier:
@@ -46,6 +53,10 @@ class PushoverNotifier:
         device: Optional[str] = None,
         priority: Optional[int] = None,
         timeout: int = 10,
+        transport: Optional[HTTPConnectionPool] = None,
+        api_url: str = PUSHOVER_API_URL,
+        renderer: Optional[MessageRenderer] = None,
+        locale: str = DEFAULT_LOCALE,
     ) -> None:
         if not token:
             raise ValueError("token is required")
@@ -54,26 +65,33 @@ class PushoverNotifier:
 
         self.token = token
         self.user_key = user_key
-        self.opener = opener or request.build_opener()
+        # An explicit urllib opener takes precedence over the pooled transport.
+        self.opener = opener
+        self.transport = transport
+        self.api_url = api_url
         self.timezone = timezone or ZoneInfo("UTC")
+        self.renderer = renderer or DEFAULT_RENDERER
+        self.locale = locale
         self.sound = sound
         self.device = device
         self.priority = priority
         self.timeout = timeout
+        self._limit_lock = threading.Lock()
+        self._limit_remaining: Optional[int] = None
+        self._limit_reset = 0.0
+
+    def render(self, gameweek: GameweekDeadline, lead_time: timedelta) -> RenderedMessage:
+        """The title and message for ``gameweek``, shared with other notifiers through the renderer."""
+
+        return self.renderer.render(gameweek, lead_time, self.timezone, self.locale)
 
     def _build_payload(self, gameweek: GameweekDeadline, lead_time: timedelta) -> dict:
-        deadline_local = gameweek.deadline.astimezone(self.timezone)
-        formatted_lead = _format_timedelta(lead_time)
-        title = f"FPL deadline in {formatted_lead}"
-        message = (
-            f"{gameweek.name} (GW {gameweek.event_id}) deadline at "
-            f"{deadline_local.strftime('%Y-%m-%d %H:%M %Z')}"
-        )
+        rendered = self.render(gameweek, lead_time)
         payload = {
             "token": self.token,
             "user": self.user_key,
-            "title": title,
-            "message": message,
+            "title": rendered.title,
+            "message": rendered.message,
         }
         if self.sound:
             payload["sound"] = self.sound
@@ -83,22 +101,113 @@ class PushoverNotifier:
             payload["priority"] = str(self.priority)
         return payload
 
-    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
-        """Send a push notification for the provided gameweek."""
+    def _update_rate_limit(self, headers: Optional[Mapping[str, str]]) -> None:
+        if headers is None:
+            return
+        remaining = headers.get("X-Limit-App-Remaining")
+        reset = headers.get("X-Limit-App-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            with self._limit_lock:
+                self._limit_remaining = int(remaining)
+                self._limit_reset = float(reset)
+        except ValueError:
+            LOGGER.debug("Ignoring malformed rate limit headers: %s / %s", remaining, reset)
 
-        payload = self._build_payload(gameweek, lead_time)
-        LOGGER.info("Sending push notification for %s", gameweek)
+    def _check_rate_limit(self) -> None:
+        with self._limit_lock:
+            if self._limit_remaining is None or self._limit_remaining > 0:
+                return
+            if time.time() >= self._limit_reset:
+                self._limit_remaining = None
+                return
+            raise RateLimitedError(self._limit_reset)
+
+    def _post(self, payload: Mapping[str, str]) -> None:
+        self._check_rate_limit()
         encoded = parse.urlencode(payload).encode()
-        req = request.Request(PUSHOVER_API_URL, data=encoded)
         try:
-            with self.opener.open(req, timeout=self.timeout) as response:
-                status = response.getcode()
-                body = response.read().decode("utf-8", errors="replace")
+            if self.opener is not None:
+                from urllib import request
+
+                req = request.Request(self.api_url, data=encoded)
+                with self.opener.open(req, timeout=self.timeout) as response:
+                    status = response.getcode()
+                    body = response.read().decode("utf-8", errors="replace")
+                    headers = getattr(response, "headers", None)
+            else:
+                from .transport import default_pool
+
+                transport = self.transport or default_pool()
+                response = transport.request(
+                    "POST",
+                    self.api_url,
+                    body=encoded,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                    timeout=self.timeout,
+                )
+                status = response.status
+                body = response.body.decode("utf-8", errors="replace")
+                headers = response.headers
         except error.HTTPError as exc:
+            self._update_rate_limit(exc.headers)
+            if exc.code == 429:
+                with self._limit_lock:
+                    self._limit_remaining = 0
+                    self._limit_reset = max(self._limit_reset, time.time() + 60)
             LOGGER.error("Pushover rejected the request: %s", exc.read().decode("utf-8", errors="replace"))
             raise
         except error.URLError as exc:
             LOGGER.error("Failed to contact Pushover: %s", exc)
             raise
         else:
+            self._update_rate_limit(headers)
             LOGGER.debug("Notification accepted (status %s): %s", status, body)
+
+    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        """Send a push notification for the provided gameweek."""
+
+        payload = self._build_payload(gameweek, lead_time)
+        LOGGER.info("Sending push notification for %s", gameweek)
+        self._post(payload)
+
+    def send_many(
+        self,
+        gameweek: GameweekDeadline,
+        lead_time: timedelta,
+        recipients: Iterable[Recipient],
+        *,
+        max_workers: int = 8,
+    ) -> List[Optional[Exception]]:
+        """Send the same reminder to many recipients over a bounded worker pool.
+
+        The message is formatted once and each worker reuses pooled
+        connections. Once Pushover reports the application's rate limit as
+        exhausted, remaining recipients fail fast with :class:`RateLimitedError`.
+        The result holds ``None`` for each delivered message and the raised
+        exception otherwise, in the order of ``recipients``.
+        """
+
+        base = self._build_payload(gameweek, lead_time)
+        payloads = []
+        for recipient in recipients:
+            payload = dict(base)
+            if isinstance(recipient, str):
+                payload["user"] = recipient
+            else:
+                payload.update(recipient)
+            payloads.append(payload)
+        LOGGER.info("Sending %d push notifications for %s", len(payloads), gameweek)
+
+        def _send_one(payload: Mapping[str, str]) -> Optional[Exception]:
+            try:
+                self._post(payload)
+            except Exception as exc:
+                return exc
+            return None
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pushover") as pool:
+            return list(pool.map(_send_one, payloads))
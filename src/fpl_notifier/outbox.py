@@ -0,0 +1,323 @@
+"""A persistent outbox that retries notifications until their deadline.
+
+Each pending notification is written to SQLite before it is sent and is
+identified by an idempotency key of ``(subscriber_id, event_id,
+lead_seconds)``, so enqueuing the same reminder twice (or after a restart)
+does not send it twice. Failed sends are retried with exponential backoff;
+retries stop once the next attempt would fall after the gameweek deadline.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from .deadlines import GameweekDeadline
+
+LOGGER = logging.getLogger(__name__)
+
+OutboxKey = Tuple[str, int, int]
+
+PENDING = "pending"
+SENT = "sent"
+EXPIRED = "expired"
+
+
+def _from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+@dataclass(frozen=True)
+class OutboxEntry:
+    subscriber_id: str
+    gameweek: GameweekDeadline
+    lead_time: timedelta
+    scheduled_at: datetime
+    next_attempt_at: datetime
+    attempts: int = 0
+    status: str = PENDING
+    sent_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    @property
+    def key(self) -> OutboxKey:
+        return self.subscriber_id, self.gameweek.event_id, int(self.lead_time.total_seconds())
+
+    @property
+    def latency(self) -> Optional[timedelta]:
+        """How long after its scheduled time the notification was delivered."""
+
+        return self.sent_at - self.scheduled_at if self.sent_at is not None else None
+
+
+@dataclass(frozen=True)
+class OutboxStats:
+    pending: int
+    sent: int
+    expired: int
+    # Attempts beyond the first, over every entry.
+    retries: int
+    latency_p50: Optional[float]
+    latency_p95: Optional[float]
+    latency_max: Optional[float]
+
+
+class Outbox:
+    """SQLite-backed queue of notifications; ``":memory:"`` keeps it in-process."""
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            subscriber_id TEXT NOT NULL,
+            event_id INTEGER NOT NULL,
+            lead_seconds INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            deadline REAL NOT NULL,
+            scheduled_at REAL NOT NULL,
+            next_attempt_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending',
+            sent_at REAL,
+            last_error TEXT,
+            PRIMARY KEY (subscriber_id, event_id, lead_seconds)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)",
+    )
+    _COLUMNS = (
+        "subscriber_id, event_id, lead_seconds, name, deadline, scheduled_at, "
+        "next_attempt_at, attempts, status, sent_at, last_error"
+    )
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        backoff_base: timedelta = timedelta(seconds=5),
+        backoff_max: timedelta = timedelta(minutes=5),
+    ) -> None:
+        if backoff_base <= timedelta(0) or backoff_max < backoff_base:
+            raise ValueError("backoff_base must be positive and at most backoff_max")
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+
+    @staticmethod
+    def _entry(row) -> OutboxEntry:
+        subscriber_id, event_id, lead_seconds, name, deadline, scheduled_at, next_attempt_at = row[:7]
+        attempts, status, sent_at, last_error = row[7:]
+        return OutboxEntry(
+            subscriber_id=subscriber_id,
+            gameweek=GameweekDeadline(event_id=event_id, name=name, deadline=_from_epoch(deadline)),
+            lead_time=timedelta(seconds=lead_seconds),
+            scheduled_at=_from_epoch(scheduled_at),
+            next_attempt_at=_from_epoch(next_attempt_at),
+            attempts=attempts,
+            status=status,
+            sent_at=_from_epoch(sent_at) if sent_at is not None else None,
+            last_error=last_error,
+        )
+
+    def enqueue(
+        self,
+        subscriber_id: str,
+        gameweek: GameweekDeadline,
+        lead_time: timedelta,
+        *,
+        now: datetime,
+    ) -> bool:
+        """Record a notification to send; return ``False`` for a duplicate.
+
+        An existing entry with the same key is only replaced when the
+        gameweek's deadline has moved since it was enqueued.
+        """
+
+        scheduled_at = gameweek.deadline - lead_time
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO outbox (subscriber_id, event_id, lead_seconds, name, deadline,
+                                    scheduled_at, next_attempt_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (subscriber_id, event_id, lead_seconds) DO UPDATE SET
+                    name = excluded.name, deadline = excluded.deadline,
+                    scheduled_at = excluded.scheduled_at, next_attempt_at = excluded.next_attempt_at,
+                    attempts = 0, status = 'pending', sent_at = NULL, last_error = NULL
+                WHERE outbox.deadline != excluded.deadline
+                """,
+                (
+                    subscriber_id,
+                    gameweek.event_id,
+                    int(lead_time.total_seconds()),
+                    gameweek.name,
+                    gameweek.deadline.timestamp(),
+                    scheduled_at.timestamp(),
+                    now.timestamp(),
+                ),
+            )
+        return cursor.rowcount > 0
+
+    def due(self, now: datetime, limit: int = 1000) -> List[OutboxEntry]:
+        """Pending entries whose next attempt is due, oldest first."""
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (now.timestamp(), limit),
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def entries(self, status: Optional[str] = None) -> List[OutboxEntry]:
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute(f"SELECT {self._COLUMNS} FROM outbox").fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT {self._COLUMNS} FROM outbox WHERE status = ?", (status,)
+                ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def next_attempt_at(self) -> Optional[datetime]:
+        with self._lock:
+            (value,) = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        return _from_epoch(value) if value is not None else None
+
+    def _backoff(self, attempts: int) -> timedelta:
+        # Cap the exponent so huge attempt counts cannot overflow.
+        return min(self.backoff_base * (2 ** min(attempts - 1, 32)), self.backoff_max)
+
+    def mark_sent(self, entry: OutboxEntry, *, now: datetime) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1 "
+                "WHERE subscriber_id = ? AND event_id = ? AND lead_seconds = ?",
+                (now.timestamp(), *entry.key),
+            )
+
+    def mark_failed(self, entry: OutboxEntry, error: BaseException, *, now: datetime) -> Optional[datetime]:
+        """Schedule a retry and return its time, or ``None`` if it would be too late."""
+
+        attempts = entry.attempts + 1
+        retry_at = now + self._backoff(attempts)
+        status = PENDING if retry_at < entry.gameweek.deadline else EXPIRED
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE subscriber_id = ? AND event_id = ? AND lead_seconds = ?",
+                (status, attempts, retry_at.timestamp(), repr(error), *entry.key),
+            )
+        if status == EXPIRED:
+            LOGGER.error("Giving up on %s after %d attempts: %s", entry.key, attempts, error)
+            return None
+        LOGGER.warning("Attempt %d for %s failed (%s); retrying at %s", attempts, entry.key, error, retry_at)
+        return retry_at
+
+    def drain(
+        self,
+        send: Callable[[OutboxEntry], None],
+        *,
+        now: datetime,
+        max_workers: int = 8,
+    ) -> int:
+        """Send every due entry, up to ``max_workers`` at a time.
+
+        Returns the number of entries delivered. Entries whose deadline has
+        already passed are expired instead of sent.
+        """
+
+        due = []
+        for entry in self.due(now):
+            if entry.gameweek.deadline <= now:
+                self.mark_failed(entry, TimeoutError("deadline passed before delivery"), now=now)
+            else:
+                due.append(entry)
+        if not due:
+            return 0
+
+        started = time.monotonic()
+
+        def attempt(entry: OutboxEntry) -> Tuple[Optional[BaseException], datetime]:
+            try:
+                send(entry)
+            except Exception as exc:
+                return exc, now
+            # Completion time on the caller's clock, so the sent latency
+            # includes the send itself and any wait for a free worker.
+            return None, now + timedelta(seconds=time.monotonic() - started)
+
+        if len(due) == 1 or max_workers <= 1:
+            results = [attempt(entry) for entry in due]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(due))) as executor:
+                results = list(executor.map(attempt, due))
+
+        delivered = 0
+        for entry, (exc, finished_at) in zip(due, results):
+            if exc is None:
+                self.mark_sent(entry, now=finished_at)
+                delivered += 1
+            else:
+                self.mark_failed(entry, exc, now=now)
+        return delivered
+
+    def stats(self) -> OutboxStats:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            (retries,) = self._conn.execute(
+                "SELECT COALESCE(SUM(MAX(attempts - 1, 0)), 0) FROM outbox"
+            ).fetchone()
+            latencies = [
+                value
+                for (value,) in self._conn.execute(
+                    "SELECT sent_at - scheduled_at FROM outbox WHERE status = 'sent' ORDER BY 1"
+                )
+            ]
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(math.ceil(fraction * len(latencies)) - 1, len(latencies) - 1)]
+
+        return OutboxStats(
+            pending=counts.get(PENDING, 0),
+            sent=counts.get(SENT, 0),
+            expired=counts.get(EXPIRED, 0),
+            retries=retries,
+            latency_p50=percentile(0.5),
+            latency_p95=percentile(0.95),
+            latency_max=latencies[-1] if latencies else None,
+        )
+
+    def prune(self, before: datetime) -> int:
+        """Delete finished entries for deadlines before ``before``."""
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status != 'pending' AND deadline < ?", (before.timestamp(),)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
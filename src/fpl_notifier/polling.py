@@ -0,0 +1,89 @@
+"""Policies deciding how long to wait before refreshing deadlines."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import random
+from typing import Optional, Protocol
+
+
+class PollPolicy(Protocol):
+    """Chooses the delay until the next deadline refresh.
+
+    ``next_deadline`` is the earliest upcoming deadline (``None`` if there is
+    none) and ``failures`` the number of consecutive failed fetches.
+    """
+
+    def next_poll(
+        self, *, now: datetime, next_deadline: Optional[datetime], failures: int
+    ) -> timedelta: ...
+
+
+class FixedPollPolicy:
+    """Refresh at a constant interval, whatever the outcome of the last fetch."""
+
+    def __init__(self, interval: timedelta) -> None:
+        if interval <= timedelta(0):
+            raise ValueError("interval must be positive")
+        self.interval = interval
+
+    def next_poll(
+        self, *, now: datetime, next_deadline: Optional[datetime], failures: int
+    ) -> timedelta:
+        return self.interval
+
+
+class AdaptivePollPolicy:
+    """Poll rarely when the next deadline is far away and often as it nears.
+
+    The interval is ``proximity`` times the time left until the next deadline,
+    clamped to ``[min_interval, max_interval]``, so that a postponed gameweek
+    is noticed well before the original deadline while quiet weeks cost a
+    handful of requests. Failed fetches back off exponentially from
+    ``backoff_base`` up to ``backoff_max``; the actual delay is drawn
+    uniformly from the upper half of that range so replicas do not retry in
+    lockstep, and is never longer than the proximity interval would be.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: timedelta = timedelta(minutes=15),
+        max_interval: timedelta = timedelta(hours=24),
+        proximity: float = 0.25,
+        backoff_base: timedelta = timedelta(seconds=30),
+        backoff_max: timedelta = timedelta(hours=1),
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if min_interval <= timedelta(0):
+            raise ValueError("min_interval must be positive")
+        if max_interval < min_interval:
+            raise ValueError("max_interval must not be shorter than min_interval")
+        if not 0 < proximity <= 1:
+            raise ValueError("proximity must be in (0, 1]")
+        if backoff_base <= timedelta(0) or backoff_max < backoff_base:
+            raise ValueError("backoff_base must be positive and at most backoff_max")
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.proximity = proximity
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rng = rng or random.Random()
+
+    def _proximity_interval(self, now: datetime, next_deadline: Optional[datetime]) -> timedelta:
+        if next_deadline is None:
+            return self.max_interval
+        interval = (next_deadline - now) * self.proximity
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def next_poll(
+        self, *, now: datetime, next_deadline: Optional[datetime], failures: int
+    ) -> timedelta:
+        interval = self._proximity_interval(now, next_deadline)
+        if failures <= 0:
+            return interval
+        # Cap the exponent so huge failure counts cannot overflow.
+        backoff = min(self.backoff_base * (2 ** min(failures - 1, 32)), self.backoff_max)
+        jittered = backoff * self.rng.uniform(0.5, 1.0)
+        return min(jittered, interval)
@@ -0,0 +1,336 @@
+"""Built-in profiling of the scheduling and delivery loop.
+
+:meth:`Profiler.instrument` wraps a service's ``step``, its fetcher and its
+notifier's ``send`` (or the ``send`` of every notifier its
+``notifier_factory`` returns) in timing spans: two clock reads and a
+counter update per call, summarised in ``spans.json`` every ``interval``.
+
+Heavier tools stay off until a step takes longer than ``threshold``. Up to
+``max_armed_steps`` following steps then run under :mod:`cProfile` with
+:mod:`tracemalloc` tracing until one of them takes longer than ``threshold``
+too; captures of faster steps are discarded. A profiled step's time is
+corrected for the profilers' own per-call cost, measured once, so that
+the overhead alone does not make a step count as slow. The slow step's
+stats (``profile-*.pstats``, readable with :mod:`pstats`) and top
+allocations (``alloc-*.txt``) are written to the output directory, at most
+once per ``interval``. The oldest captures are deleted to keep the
+directory within ``max_files`` and ``max_bytes``.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+_CAPTURE_PREFIXES = ("profile-", "alloc-")
+_CALIBRATION_CALLS = 10000
+_CALIBRATION_ROUNDS = 3
+
+
+def _probe() -> None:
+    pass
+
+
+def _calls() -> None:
+    for _ in range(_CALIBRATION_CALLS):
+        _probe()
+
+
+def _call_overhead_ns() -> float:
+    """Return the time cProfile and tracemalloc add per profiled call.
+
+    Each measurement is the best of a few rounds, to keep scheduler noise out.
+    """
+
+    import cProfile
+    import tracemalloc
+
+    bare = profiled = None
+    counted = 1
+    for _ in range(_CALIBRATION_ROUNDS):
+        started = time.perf_counter_ns()
+        _calls()
+        elapsed = time.perf_counter_ns() - started
+        bare = elapsed if bare is None else min(bare, elapsed)
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        for _ in range(_CALIBRATION_ROUNDS):
+            profile = cProfile.Profile()
+            started = time.perf_counter_ns()
+            profile.runcall(_calls)
+            elapsed = time.perf_counter_ns() - started
+            profiled = elapsed if profiled is None else min(profiled, elapsed)
+            counted = sum(entry.callcount for entry in profile.getstats())
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return max(0.0, (profiled - bare) / counted)
+
+
+class Profiler:
+    """Timing spans plus threshold-triggered cProfile and tracemalloc captures."""
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        threshold: timedelta = timedelta(milliseconds=500),
+        interval: timedelta = timedelta(minutes=5),
+        max_files: int = 20,
+        max_bytes: int = 50 * 1024 * 1024,
+        top_allocations: int = 25,
+        max_armed_steps: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_files < 2:
+            raise ValueError("max_files must allow at least one capture (two files)")
+        if max_armed_steps < 1:
+            raise ValueError("max_armed_steps must be positive")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.threshold_ns = int(threshold.total_seconds() * 1e9)
+        self.interval = interval.total_seconds()
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.top_allocations = top_allocations
+        self.max_armed_steps = max_armed_steps
+        self.clock = clock
+        self.captures = 0
+        self._lock = threading.Lock()
+        # Span name -> [count, total ns, max ns].
+        self._spans: Dict[str, List[int]] = {}
+        self._armed = False
+        self._armed_steps = 0
+        self._call_overhead_ns: Optional[float] = None
+        self._last_capture: Optional[float] = None
+        self._last_summary = clock()
+
+    # Spans -------------------------------------------------------------------
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                self._spans[name] = [1, elapsed_ns, elapsed_ns]
+            else:
+                span[0] += 1
+                span[1] += elapsed_ns
+                if elapsed_ns > span[2]:
+                    span[2] = elapsed_ns
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - started)
+
+    def _timed(self, name: str, function: Callable) -> Callable:
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter_ns() - started)
+
+        return timed
+
+    def spans(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean and max milliseconds per span."""
+
+        with self._lock:
+            spans = {name: list(values) for name, values in self._spans.items()}
+        return {
+            name: {
+                "count": count,
+                "total_ms": total / 1e6,
+                "mean_ms": total / count / 1e6,
+                "max_ms": longest / 1e6,
+            }
+            for name, (count, total, longest) in sorted(spans.items())
+        }
+
+    # Instrumentation ---------------------------------------------------------
+
+    def instrument(self, service) -> None:
+        """Wrap ``service.step``, ``service.fetcher`` and ``service.notifier.send``.
+
+        Works for any object with a ``step`` method; the fetcher (also that
+        of a background ``refresher``) and notifier are wrapped when present.
+        With a ``notifier_factory`` instead, as on a
+        :class:`~fpl_notifier.scheduler.SubscriberScheduler`, every notifier
+        it returns is wrapped.
+        """
+
+        for owner in (service, getattr(service, "refresher", None)):
+            fetcher = getattr(owner, "fetcher", None)
+            if fetcher is not None:
+                owner.fetcher = self._timed("fetch", fetcher)
+        notifier = getattr(service, "notifier", None)
+        if notifier is not None:
+            self._time_send(notifier)
+        factory = getattr(service, "notifier_factory", None)
+        if factory is not None:
+            service.notifier_factory = self._timed_factory(factory)
+        service.step = self.wrap_step(service.step)
+
+    def _time_send(self, notifier) -> None:
+        send = getattr(notifier, "send", None)
+        # Factories may return the same notifier again; wrap it only once.
+        if send is not None and not hasattr(send, "__wrapped__"):
+            notifier.send = self._timed("send", send)
+
+    def _timed_factory(self, factory: Callable) -> Callable:
+        # Not functools.wraps: factories are often objects, such as SubscriberNotifiers.
+        def timed_factory(*args, **kwargs):
+            notifier = factory(*args, **kwargs)
+            self._time_send(notifier)
+            return notifier
+
+        forget = getattr(factory, "forget", None)
+        if forget is not None:
+            timed_factory.forget = forget
+        return timed_factory
+
+    def wrap_step(self, step: Callable[..., float]) -> Callable[..., float]:
+        @functools.wraps(step)
+        def profiled_step(*args, **kwargs):
+            if self._armed:
+                return self._capture(step, args, kwargs)
+            started = time.perf_counter_ns()
+            try:
+                return step(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - started
+                self.record("step", elapsed)
+                if elapsed > self.threshold_ns:
+                    self._arm(elapsed)
+                self._maybe_summarise()
+
+        return profiled_step
+
+    # Captures ----------------------------------------------------------------
+
+    def arm(self) -> None:
+        """Profile the following steps until one takes longer than the threshold.
+
+        At most ``max_armed_steps`` steps are profiled; if none of them is
+        slow, the profiler disarms without a capture.
+        """
+
+        self._armed_steps = 0
+        self._armed = True
+
+    def _arm(self, elapsed_ns: int) -> None:
+        now = self.clock()
+        if self._last_capture is not None and now - self._last_capture < self.interval:
+            return
+        LOGGER.info("Step took %.1f ms; profiling the next slow one", elapsed_ns / 1e6)
+        self.arm()
+
+    def _capture(self, step: Callable[..., float], args, kwargs) -> float:
+        import cProfile
+        import tracemalloc
+
+        if self._call_overhead_ns is None:
+            self._call_overhead_ns = _call_overhead_ns()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        started = time.perf_counter_ns()
+        try:
+            return profile.runcall(step, *args, **kwargs)
+        finally:
+            measured = time.perf_counter_ns() - started
+            calls = sum(entry.callcount for entry in profile.getstats())
+            elapsed = max(0, measured - int(calls * self._call_overhead_ns))
+            self.record("step", elapsed)
+            # Only a step as slow as the one that armed the profiler is kept.
+            slow = elapsed > self.threshold_ns
+            snapshot = tracemalloc.take_snapshot() if slow else None
+            if not tracing:
+                tracemalloc.stop()
+            self._armed_steps += 1
+            if slow:
+                self._armed = False
+                self._last_capture = self.clock()
+                self._write_capture(profile, snapshot, elapsed)
+            elif self._armed_steps >= self.max_armed_steps:
+                # The slowness has passed; wait an interval before arming again
+                # rather than profiling every step of a service that is now fast.
+                LOGGER.info("No slow step in %d profiled steps; disarming", self._armed_steps)
+                self._armed = False
+                self._last_capture = self.clock()
+            self._maybe_summarise()
+
+    def _write_capture(self, profile, snapshot, elapsed_ns: int) -> None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        try:
+            profile.dump_stats(os.path.join(self.directory, f"profile-{stamp}.pstats"))
+            lines = [f"# step took {elapsed_ns / 1e6:.1f} ms; top allocations by size"]
+            lines.extend(str(stat) for stat in snapshot.statistics("lineno")[: self.top_allocations])
+            with open(os.path.join(self.directory, f"alloc-{stamp}.txt"), "w", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+        except OSError as exc:
+            LOGGER.warning("Could not write profile to %s: %s", self.directory, exc)
+            return
+        self.captures += 1
+        LOGGER.info("Wrote profile %s to %s", stamp, self.directory)
+        self._enforce_limits()
+
+    def _enforce_limits(self) -> None:
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.is_file() and entry.name.startswith(_CAPTURE_PREFIXES):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        entries.sort()
+        total = sum(size for _, _, size in entries)
+        while entries and (len(entries) > self.max_files or total > self.max_bytes):
+            _, name, size = entries.pop(0)
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+    # Summaries ---------------------------------------------------------------
+
+    def _maybe_summarise(self) -> None:
+        if self.clock() - self._last_summary >= self.interval:
+            self.write_summary()
+
+    def write_summary(self) -> None:
+        """Write the span totals to ``spans.json`` (replaced atomically)."""
+
+        self._last_summary = self.clock()
+        path = os.path.join(self.directory, "spans.json")
+        document = {
+            "written_at": datetime.now(timezone.utc).isoformat(),
+            "captures": self.captures,
+            "spans": self.spans(),
+        }
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as handle:
+                json.dump(document, handle, indent=2)
+            os.replace(path + ".tmp", path)
+        except OSError as exc:
+            LOGGER.warning("Could not write span summary to %s: %s", path, exc)
+
+    def close(self) -> None:
+        self.write_summary()
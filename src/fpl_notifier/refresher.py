@@ -0,0 +1,206 @@
+"""Deadlines kept fresh by a background thread, served stale while revalidating.
+
+A :class:`DeadlineRefresher` fetches deadlines on its own schedule and
+publishes them as an immutable :class:`DeadlineSnapshot`. Readers such as
+the scheduling step only look at the latest snapshot, so a slow or failing
+FPL API never holds them up; they keep using the previous deadlines until a
+fetch succeeds.
+
+With ``fixtures``, the fixture reminders' fixtures are refreshed in the
+same thread after each fetch, so readers never request them either.
+
+Fetches are hedged: when a request has taken longer than ``hedge_percentile``
+of recent successful fetches, a duplicate request is started and whichever
+returns first is used. Until ``min_samples`` fetches have been timed,
+``hedge_after`` seconds is used as the threshold.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Deque, List, Optional, Tuple
+
+from . import metrics
+from .deadlines import GameweekDeadline, fetch_gameweek_deadlines
+from .polling import FixedPollPolicy, PollPolicy
+
+if TYPE_CHECKING:  # pragma: no cover - only needed when configured
+    from .fixtures import FixtureReminders
+
+LOGGER = logging.getLogger(__name__)
+
+Fetcher = Callable[..., List[GameweekDeadline]]
+Clock = Callable[[], datetime]
+
+
+@dataclass(frozen=True)
+class DeadlineSnapshot:
+    """Deadlines as of ``fetched_at``; ``version`` changes only when they do."""
+
+    deadlines: Tuple[GameweekDeadline, ...]
+    fetched_at: datetime
+    version: int
+
+
+class DeadlineRefresher:
+    """Refresh deadlines in a background thread and publish snapshots.
+
+    The delay between refreshes comes from ``poll_policy`` (by default a
+    :class:`~fpl_notifier.polling.FixedPollPolicy` of ``poll_interval``),
+    which also decides how quickly to retry after failures. Callbacks given
+    to :meth:`subscribe` are called from the refresher thread whenever the
+    deadlines or the ``fixtures`` change.
+    """
+
+    def __init__(
+        self,
+        *,
+        fetcher: Fetcher = fetch_gameweek_deadlines,
+        poll_policy: Optional[PollPolicy] = None,
+        poll_interval: timedelta = timedelta(minutes=30),
+        hedge_percentile: Optional[float] = 0.95,
+        hedge_after: float = 2.0,
+        min_hedge_delay: float = 0.25,
+        min_samples: int = 5,
+        latency_window: int = 50,
+        clock: Optional[Clock] = None,
+        fixtures: Optional[FixtureReminders] = None,
+    ) -> None:
+        if hedge_percentile is not None and not 0 < hedge_percentile <= 1:
+            raise ValueError("hedge_percentile must be in (0, 1]")
+        self.fetcher = fetcher
+        self.poll_policy = poll_policy or FixedPollPolicy(poll_interval)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.fixtures = fixtures
+        self.fetches = 0
+        self.hedges = 0
+        self.failures = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._snapshot: Optional[DeadlineSnapshot] = None
+        self._listeners: List[Callable[[], None]] = []
+        self._trigger = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = self._new_executor()
+
+    @staticmethod
+    def _new_executor() -> ThreadPoolExecutor:
+        # Room for a hedged pair plus stragglers from an earlier refresh.
+        return ThreadPoolExecutor(max_workers=4, thread_name_prefix="deadline-fetch")
+
+    def snapshot(self) -> Optional[DeadlineSnapshot]:
+        """The latest deadlines, or ``None`` before the first successful fetch."""
+
+        return self._snapshot
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        self._listeners.append(callback)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait for a fetch before starting a duplicate, if hedging."""
+
+        if self.hedge_percentile is None:
+            return None
+        if len(self._latencies) < self.min_samples:
+            return max(self.hedge_after, self.min_hedge_delay)
+        samples = sorted(self._latencies)
+        index = max(math.ceil(self.hedge_percentile * len(samples)) - 1, 0)
+        return max(samples[index], self.min_hedge_delay)
+
+    def _fetch(self, now: datetime) -> List[GameweekDeadline]:
+        started = time.perf_counter()
+        pending = {self._executor.submit(self.fetcher, now=now)}
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, pending = wait(pending, timeout=delay)
+            if not done:
+                self.hedges += 1
+                metrics.FETCH_HEDGES.inc()
+                LOGGER.info("Deadline fetch slower than %.2f seconds; sending a hedged request", delay)
+                pending.add(self._executor.submit(self.fetcher, now=now))
+            else:
+                pending = done
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    deadlines = future.result()
+                except Exception as exc:
+                    error = exc
+                    continue
+                self._latencies.append(time.perf_counter() - started)
+                return deadlines
+        assert error is not None
+        raise error
+
+    def refresh(self, *, now: Optional[datetime] = None) -> float:
+        """Fetch once, publish the result and return seconds until the next refresh."""
+
+        now = now or self.clock()
+        self.fetches += 1
+        previous = self._snapshot
+        changed = False
+        try:
+            deadlines = tuple(self._fetch(now))
+        except Exception as exc:
+            self.failures += 1
+            LOGGER.error("Background deadline refresh failed: %s", exc, exc_info=True)
+        else:
+            self.failures = 0
+            changed = previous is None or previous.deadlines != deadlines
+            version = (previous.version if previous is not None else 0) + changed
+            self._snapshot = DeadlineSnapshot(deadlines, now, version)
+        snapshot = self._snapshot
+        upcoming_deadlines = [gw for gw in snapshot.deadlines if gw.deadline > now] if snapshot else []
+        if self.fixtures is not None and snapshot is not None:
+            changed = self.fixtures.refresh(upcoming_deadlines, now=now) or changed
+        if changed:
+            for callback in self._listeners:
+                callback()
+        upcoming = [gw.deadline for gw in upcoming_deadlines]
+        delay = self.poll_policy.next_poll(
+            now=now, next_deadline=upcoming[0] if upcoming else None, failures=self.failures
+        )
+        return max(delay.total_seconds(), 0.0)
+
+    def trigger(self) -> None:
+        """Refresh as soon as possible instead of waiting for the next poll."""
+
+        self._trigger.set()
+
+    def _run(self) -> None:
+        # A thread left running by a timed-out stop() exits once a new one started.
+        while not self._stopping.is_set() and self._thread is threading.current_thread():
+            delay = self.refresh()
+            if self._trigger.wait(delay):
+                self._trigger.clear()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="deadline-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background thread; :meth:`start` can start it again."""
+
+        thread, self._thread = self._thread, None
+        self._stopping.set()
+        self._trigger.set()
+        if thread is not None:
+            thread.join(timeout)
+        executor, self._executor = self._executor, self._new_executor()
+        executor.shutdown(wait=False)
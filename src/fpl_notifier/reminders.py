@@ -0,0 +1,118 @@
+"""Reminder plans: several lead times per deadline, precomputed for the season."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from .deadlines import GameweekDeadline
+
+LeadTimes = Union[timedelta, Sequence[timedelta]]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _epoch_us(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def normalise_lead_times(lead_times: LeadTimes) -> Tuple[timedelta, ...]:
+    """Return ``lead_times`` as a tuple without duplicates, longest lead first."""
+
+    if isinstance(lead_times, timedelta):
+        lead_times = (lead_times,)
+    leads = tuple(sorted(set(lead_times), reverse=True))
+    if not leads:
+        raise ValueError("at least one lead time is required")
+    if leads[-1] <= timedelta(0):
+        raise ValueError("lead times must be positive")
+    return leads
+
+
+class Reminder:
+    """One reminder: ``gameweek``'s deadline minus ``lead_time``."""
+
+    __slots__ = ("gameweek", "lead_time", "lead_seconds", "fire_at", "fire_us", "done")
+
+    def __init__(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        self.gameweek = gameweek
+        self.lead_time = lead_time
+        self.lead_seconds = int(lead_time.total_seconds())
+        self.fire_at = gameweek.deadline - lead_time
+        self.fire_us = _epoch_us(self.fire_at)
+        self.done = False
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.gameweek.event_id, self.lead_seconds
+
+    def __repr__(self) -> str:  # pragma: no cover - debugging aid
+        return f"Reminder({self.gameweek.event_id}, {self.lead_time}, fire_at={self.fire_at.isoformat()})"
+
+
+class ReminderSchedule:
+    """Every reminder for a list of deadlines, ordered by fire time.
+
+    The schedule is rebuilt only when the deadlines change. Between rebuilds a
+    cursor marks the first reminder not yet :meth:`resolve`-d; :meth:`due`
+    and :meth:`next_after` bisect the fire times from there, so a step costs
+    O(log n) rather than recomputing fire times for the head of the list.
+    """
+
+    def __init__(self, lead_times: LeadTimes) -> None:
+        self.lead_times = normalise_lead_times(lead_times)
+        self._deadlines: List[GameweekDeadline] = []
+        self._reminders: List[Reminder] = []
+        self._fires: List[int] = []
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return len(self._reminders) - self._cursor
+
+    def __iter__(self) -> Iterator[Reminder]:
+        return iter(self._reminders[self._cursor:])
+
+    def leads_for(self, gameweek: GameweekDeadline) -> Tuple[timedelta, ...]:
+        """The lead times for ``gameweek``: its own plan if it has one, else the default."""
+
+        # Fixture reminder targets may carry their own plan.
+        return getattr(gameweek, "lead_times", None) or self.lead_times
+
+    def update(self, deadlines: Sequence[GameweekDeadline]) -> bool:
+        """Rebuild for ``deadlines`` if they differ from the last call."""
+
+        if self._deadlines == deadlines:
+            return False
+        self._deadlines = list(deadlines)
+        reminders = [Reminder(gameweek, lead) for gameweek in deadlines for lead in self.leads_for(gameweek)]
+        # Stable sort: equal fire times keep deadline order.
+        reminders.sort(key=lambda reminder: reminder.fire_us)
+        self._reminders = reminders
+        self._fires = [reminder.fire_us for reminder in reminders]
+        self._cursor = 0
+        return True
+
+    def due(self, now: datetime) -> List[Reminder]:
+        """Unresolved reminders whose fire time is at or before ``now``."""
+
+        end = bisect_right(self._fires, _epoch_us(now), self._cursor)
+        return [reminder for reminder in self._reminders[self._cursor:end] if not reminder.done]
+
+    def next_after(self, now: datetime) -> Optional[Reminder]:
+        """The first unresolved reminder firing strictly after ``now``."""
+
+        index = bisect_right(self._fires, _epoch_us(now), self._cursor)
+        for reminder in self._reminders[index:]:
+            if not reminder.done:
+                return reminder
+        return None
+
+    def resolve(self, reminder: Reminder) -> None:
+        """Mark ``reminder`` as sent or skipped so it is no longer reported."""
+
+        reminder.done = True
+        reminders = self._reminders
+        while self._cursor < len(reminders) and reminders[self._cursor].done:
+            self._cursor += 1
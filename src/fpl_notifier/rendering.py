@@ -0,0 +1,161 @@
+"""Notification text, rendered once per gameweek, timezone, lead and locale.
+
+A reminder going out to thousands of subscribers only has as many distinct
+texts as there are (gameweek, timezone, lead time, locale) combinations.
+:class:`MessageRenderer` formats each combination once and keeps the result
+in a bounded LRU cache, so fanning out a reminder costs a cache lookup per
+recipient instead of ``astimezone``/``strftime``/``str.format`` calls.
+
+Templates are plain :meth:`str.format` strings validated when the
+:class:`Template` is created, so a typo fails at startup rather than at the
+deadline. The fields available are ``lead`` (for example "2 hours"),
+``name``, ``gameweek`` (the gameweek number) and ``time`` (the deadline or
+kickoff in the recipient's timezone, formatted with ``time_format``).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+import string
+import threading
+from typing import Callable, Dict, Mapping, Optional
+
+from zoneinfo import ZoneInfo
+
+from .deadlines import GameweekDeadline
+
+DEFAULT_LOCALE = "en"
+DEFAULT_TIME_FORMAT = "%Y-%m-%d %H:%M %Z"
+
+# Template kinds; fixture reminder targets carry their kind, anything else
+# (including double gameweek reminders) uses the deadline template.
+DEADLINE = "deadline"
+
+TemplateSet = Mapping[str, "Template"]
+
+
+def format_timedelta(delta: timedelta) -> str:
+    total_seconds = int(delta.total_seconds())
+    if total_seconds < 60:
+        return f"{total_seconds} seconds"
+    minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if minutes:
+        parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
+    if seconds and not hours:
+        parts.append(f"{seconds} second{'s' if seconds != 1 else ''}")
+    return " and ".join(parts)
+
+
+@dataclass(frozen=True)
+class RenderedMessage:
+    title: str
+    message: str
+
+
+class Template:
+    """A title and message pair, checked and bound once."""
+
+    FIELDS = frozenset({"lead", "name", "gameweek", "time"})
+
+    def __init__(
+        self,
+        title: str,
+        message: str,
+        *,
+        time_format: str = DEFAULT_TIME_FORMAT,
+        format_lead: Callable[[timedelta], str] = format_timedelta,
+    ) -> None:
+        for text in (title, message):
+            for _, field, _, _ in string.Formatter().parse(text):
+                if field is None:
+                    continue
+                if field not in self.FIELDS:
+                    raise ValueError(f"unknown template field {{{field}}} in {text!r}")
+        self.title = title
+        self.message = message
+        self.time_format = time_format
+        self.format_lead = format_lead
+        self._title = title.format
+        self._message = message.format
+
+    def render(self, gameweek: GameweekDeadline, lead_time: timedelta, timezone: ZoneInfo) -> RenderedMessage:
+        fields = {
+            "lead": self.format_lead(lead_time),
+            "name": gameweek.name,
+            "gameweek": getattr(gameweek, "gameweek", gameweek.event_id),
+            "time": gameweek.deadline.astimezone(timezone).strftime(self.time_format),
+        }
+        return RenderedMessage(self._title(**fields), self._message(**fields))
+
+
+DEFAULT_TEMPLATES: Dict[str, Template] = {
+    DEADLINE: Template("FPL deadline in {lead}", "{name} (GW {gameweek}) deadline at {time}"),
+    "first_kickoff": Template("First kickoff in {lead}", "GW {gameweek} starts with {name} at {time}"),
+    "kickoff": Template("Kickoff in {lead}", "{name} (GW {gameweek}) kicks off at {time}"),
+}
+
+
+class MessageRenderer:
+    """Render notification text through a bounded cache.
+
+    ``templates`` maps a locale (any name, for example ``"en"`` or a
+    subscriber-chosen style) to templates by kind. Kinds missing from a
+    locale fall back to its deadline template, then to the defaults.
+    """
+
+    def __init__(self, templates: Optional[Mapping[str, TemplateSet]] = None, *, maxsize: int = 4096) -> None:
+        self._templates: Dict[str, TemplateSet] = {DEFAULT_LOCALE: DEFAULT_TEMPLATES}
+        self._templates.update(templates or {})
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self._cached = lru_cache(maxsize=maxsize)(self._render)
+
+    def __getstate__(self) -> dict:
+        # The lock and cache stay behind, e.g. when sent to a shard worker.
+        return {"templates": self._templates, "maxsize": self.maxsize}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["templates"], maxsize=state["maxsize"])
+
+    def register(self, locale: str, templates: TemplateSet) -> None:
+        """Add or replace the templates for ``locale``."""
+
+        with self._lock:
+            self._templates[locale] = templates
+            self._cached = lru_cache(maxsize=self.maxsize)(self._render)
+
+    def _template(self, locale: str, kind: str) -> Template:
+        templates = self._templates.get(locale, DEFAULT_TEMPLATES)
+        template = templates.get(kind) or templates.get(DEADLINE)
+        if template is None:
+            template = DEFAULT_TEMPLATES.get(kind, DEFAULT_TEMPLATES[DEADLINE])
+        return template
+
+    def _render(
+        self, gameweek: GameweekDeadline, lead_time: timedelta, timezone: ZoneInfo, locale: str
+    ) -> RenderedMessage:
+        template = self._template(locale, getattr(gameweek, "kind", DEADLINE))
+        return template.render(gameweek, lead_time, timezone)
+
+    def render(
+        self,
+        gameweek: GameweekDeadline,
+        lead_time: timedelta,
+        timezone: ZoneInfo,
+        locale: str = DEFAULT_LOCALE,
+    ) -> RenderedMessage:
+        return self._cached(gameweek, lead_time, timezone, locale)
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+
+# Shared by every notifier unless one is given its own, so that per-subscriber
+# notifiers in a fan-out reuse each other's renderings.
+DEFAULT_RENDERER = MessageRenderer()
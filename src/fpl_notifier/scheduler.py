@@ -0,0 +1,309 @@
+"""Multi-subscriber scheduling of deadline reminders on a single timer heap."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import heapq
+import itertools
+import logging
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from zoneinfo import ZoneInfo
+
+from . import metrics
+from .deadlines import GameweekDeadline, fetch_gameweek_deadlines
+
+if TYPE_CHECKING:  # pragma: no cover - only needed with a subscriber file
+    from .subscribers import SubscriberRegistry
+
+LOGGER = logging.getLogger(__name__)
+
+SleepFunction = Callable[[float], None]
+Fetcher = Callable[..., list[GameweekDeadline]]
+
+# Heap entries are plain tuples so that ordering is handled by the C heapq
+# implementation: (fire_at, sequence, deadline, event_id, lead_seconds, subscriber_id)
+# where both timestamps are epoch seconds.
+_Entry = Tuple[float, int, float, int, int, str]
+
+
+@dataclass(frozen=True, slots=True)
+class Subscriber:
+    """A single recipient of deadline reminders."""
+
+    subscriber_id: str
+    lead_times: Tuple[timedelta, ...] = (timedelta(hours=2),)
+    timezone: ZoneInfo = ZoneInfo("UTC")
+    options: Mapping[str, object] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.subscriber_id:
+            raise ValueError("subscriber_id is required")
+        if not self.lead_times:
+            raise ValueError("at least one lead time is required")
+        if any(lead <= timedelta(0) for lead in self.lead_times):
+            raise ValueError("lead times must be positive")
+
+    @property
+    def lead_seconds(self) -> Tuple[int, ...]:
+        return tuple(int(lead.total_seconds()) for lead in self.lead_times)
+
+
+NotifierFactory = Callable[[Subscriber], object]
+
+
+class SubscriberScheduler:
+    """Deliver reminders for many subscribers from one shared deadline fetch.
+
+    Every pending ``(subscriber, gameweek, lead)`` reminder lives in a single
+    binary heap ordered by fire time, so inserting and popping a reminder is
+    ``O(log n)`` regardless of how many subscribers are registered. Entries are
+    never removed eagerly: when a deadline moves or a subscriber disappears the
+    stale entries are discarded as they reach the top of the heap.
+
+    With a :class:`~fpl_notifier.subscribers.SubscriberRegistry`, its file is
+    checked for changes every ``reload_interval`` and only added or changed
+    subscribers are (re-)armed.
+    """
+
+    def __init__(
+        self,
+        subscribers: Iterable[Subscriber] = (),
+        *,
+        notifier_factory: NotifierFactory,
+        poll_interval: timedelta = timedelta(hours=6),
+        horizon: timedelta = timedelta(days=7),
+        retry_interval: timedelta = timedelta(minutes=5),
+        fetcher: Fetcher = fetch_gameweek_deadlines,
+        sleep_func: SleepFunction = time.sleep,
+        registry: Optional[SubscriberRegistry] = None,
+        reload_interval: timedelta = timedelta(seconds=30),
+    ) -> None:
+        if poll_interval <= timedelta(0):
+            raise ValueError("poll_interval must be positive")
+        if horizon <= timedelta(0):
+            raise ValueError("horizon must be positive")
+        if retry_interval <= timedelta(0):
+            raise ValueError("retry_interval must be positive")
+
+        self.notifier_factory = notifier_factory
+        self.poll_interval = poll_interval
+        self.horizon = horizon
+        self.retry_interval = retry_interval
+        self.fetcher = fetcher
+        self.sleep = sleep_func
+        self.registry = registry
+        self.reload_interval = reload_interval
+
+        self._subscribers: Dict[str, Subscriber] = {}
+        self._deadlines: Dict[int, GameweekDeadline] = {}
+        # Event id -> deadline epoch the heap entries were armed with.
+        self._armed: Dict[int, float] = {}
+        self._heap: List[_Entry] = []
+        self._counter = itertools.count()
+        self._sent: Dict[int, Set[Tuple[str, int]]] = {}
+        self._next_refresh: Optional[float] = None
+        self._next_reload: Optional[float] = None
+        # Running totals of delivery attempts, for throughput reporting.
+        self.delivered = 0
+        self.failed = 0
+
+        for subscriber in subscribers:
+            self.add_subscriber(subscriber)
+
+    # Subscriber management -------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def pending(self) -> int:
+        """Number of heap entries, including stale ones not yet discarded."""
+
+        return len(self._heap)
+
+    def add_subscriber(self, subscriber: Subscriber) -> None:
+        """Register or replace a subscriber and arm its reminders."""
+
+        previous = self._subscribers.get(subscriber.subscriber_id)
+        self._subscribers[subscriber.subscriber_id] = subscriber
+        if previous is not None and previous.lead_seconds == subscriber.lead_seconds:
+            return  # Queued entries only name the subscriber; they still apply.
+        for event_id, deadline_epoch in self._armed.items():
+            self._push_subscriber(subscriber, event_id, deadline_epoch)
+
+    def remove_subscriber(self, subscriber_id: str) -> None:
+        """Forget a subscriber; its queued reminders are dropped lazily."""
+
+        self._subscribers.pop(subscriber_id, None)
+        # Let a caching factory, such as SubscriberNotifiers, drop its notifier.
+        forget = getattr(self.notifier_factory, "forget", None)
+        if forget is not None:
+            forget(subscriber_id)
+
+    # Scheduling ------------------------------------------------------------
+
+    def _get_now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _push_subscriber(self, subscriber: Subscriber, event_id: int, deadline_epoch: float) -> None:
+        sent = self._sent.get(event_id, ())
+        for lead in subscriber.lead_seconds:
+            if (subscriber.subscriber_id, lead) in sent:
+                continue
+            heapq.heappush(
+                self._heap,
+                (
+                    deadline_epoch - lead,
+                    next(self._counter),
+                    deadline_epoch,
+                    event_id,
+                    lead,
+                    subscriber.subscriber_id,
+                ),
+            )
+
+    def _arm(self, deadline: GameweekDeadline, now_epoch: float) -> None:
+        deadline_epoch = deadline.deadline.timestamp()
+        if self._armed.get(deadline.event_id) == deadline_epoch:
+            return
+        if deadline.event_id in self._armed:
+            LOGGER.info("Deadline for GW %s moved; re-arming reminders", deadline.event_id)
+            # Reminders sent for the old deadline are due again for the new
+            # one, unless the new reminder time has already passed.
+            sent = self._sent.get(deadline.event_id)
+            if sent:
+                self._sent[deadline.event_id] = {
+                    (subscriber_id, lead) for subscriber_id, lead in sent if deadline_epoch - lead <= now_epoch
+                }
+        self._armed[deadline.event_id] = deadline_epoch
+        for subscriber in self._subscribers.values():
+            self._push_subscriber(subscriber, deadline.event_id, deadline_epoch)
+
+    def refresh(self, now: datetime) -> None:
+        """Fetch deadlines once for all subscribers and arm those within the horizon."""
+
+        try:
+            deadlines = self.fetcher(now=now)
+        except Exception as exc:  # pragma: no cover - defensive
+            LOGGER.error("Failed to fetch deadlines: %s", exc, exc_info=True)
+            return
+
+        self._deadlines = {deadline.event_id: deadline for deadline in deadlines}
+        for event_id in list(self._armed):
+            if event_id not in self._deadlines:
+                LOGGER.info("GW %s is no longer upcoming; dropping its reminders", event_id)
+                del self._armed[event_id]
+
+        cutoff = now + self.horizon
+        for deadline in deadlines:
+            if deadline.deadline <= cutoff:
+                self._arm(deadline, now.timestamp())
+        LOGGER.debug(
+            "Armed %d gameweeks for %d subscribers (%d heap entries)",
+            len(self._armed),
+            len(self._subscribers),
+            len(self._heap),
+        )
+
+    def _prune_sent(self, now_epoch: float) -> None:
+        for event_id in list(self._sent):
+            deadline_epoch = self._armed.get(event_id)
+            if deadline_epoch is None or deadline_epoch <= now_epoch:
+                del self._sent[event_id]
+
+    def _is_current(self, entry: _Entry) -> bool:
+        _, _, deadline_epoch, event_id, lead, subscriber_id = entry
+        if self._armed.get(event_id) != deadline_epoch:
+            return False
+        subscriber = self._subscribers.get(subscriber_id)
+        if subscriber is None or lead not in subscriber.lead_seconds:
+            return False
+        return (subscriber_id, lead) not in self._sent.get(event_id, ())
+
+    def step(self, *, now: Optional[datetime] = None) -> float:
+        """Refresh if due, deliver every reminder whose time has come, and
+        return the number of seconds until the next timer or refresh."""
+
+        raw_now = now or self._get_now()
+        if raw_now.tzinfo is None:
+            now = raw_now.replace(tzinfo=timezone.utc)
+        else:
+            now = raw_now.astimezone(timezone.utc)
+        now_epoch = now.timestamp()
+
+        if self.registry is not None and (self._next_reload is None or now_epoch >= self._next_reload):
+            self.registry.reload().apply(self)
+            self._next_reload = now_epoch + self.reload_interval.total_seconds()
+        if self._next_refresh is None or now_epoch >= self._next_refresh:
+            self.refresh(now)
+            self._next_refresh = now_epoch + self.poll_interval.total_seconds()
+        self._prune_sent(now_epoch)
+
+        heap = self._heap
+        # Several reminders can be overdue for one gameweek after downtime;
+        # only the one with the shortest lead (the latest) is worth sending.
+        latest: Dict[Tuple[str, int], _Entry] = {}
+        while heap and heap[0][0] <= now_epoch:
+            entry = heapq.heappop(heap)
+            if entry[2] <= now_epoch or not self._is_current(entry):
+                continue
+            key = (entry[5], entry[3])
+            skipped = latest.get(key)
+            if skipped is not None and skipped[4] < entry[4]:
+                skipped, entry = entry, skipped
+            if skipped is not None:
+                LOGGER.debug("Skipping overdue %ss reminder for %s about GW %s", skipped[4], *key)
+                self._sent.setdefault(skipped[3], set()).add((skipped[5], skipped[4]))
+            latest[key] = entry
+        for entry in latest.values():
+            self._deliver(entry, now_epoch)
+
+        wake_at = self._next_refresh
+        if self._next_reload is not None:
+            wake_at = min(wake_at, self._next_reload)
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        if heap and heap[0][0] < wake_at:
+            wake_at = heap[0][0]
+        return max(wake_at - now_epoch, 0.0)
+
+    def _deliver(self, entry: _Entry, now_epoch: float) -> None:
+        _, _, deadline_epoch, event_id, lead, subscriber_id = entry
+        subscriber = self._subscribers[subscriber_id]
+        gameweek = self._deadlines[event_id]
+        notifier = None
+        started = time.perf_counter()
+        try:
+            notifier = self.notifier_factory(subscriber)
+            notifier.send(gameweek, timedelta(seconds=lead))
+        except Exception as exc:  # pragma: no cover - defensive
+            self.failed += 1
+            if notifier is not None:
+                metrics.observe_send(notifier, time.perf_counter() - started, failed=True)
+            LOGGER.error(
+                "Failed to notify %s about GW %s: %s", subscriber_id, event_id, exc, exc_info=True
+            )
+            retry_at = now_epoch + self.retry_interval.total_seconds()
+            if retry_at < deadline_epoch:
+                heapq.heappush(
+                    self._heap,
+                    (retry_at, next(self._counter), deadline_epoch, event_id, lead, subscriber_id),
+                )
+            return
+        metrics.observe_send(notifier, time.perf_counter() - started, failed=False)
+        self.delivered += 1
+        self._sent.setdefault(event_id, set()).add((subscriber_id, lead))
+
+    def run(self) -> None:
+        LOGGER.info("Starting scheduler for %d subscribers", len(self._subscribers))
+        try:
+            while True:
+                sleep_for = self.step()
+                if sleep_for > 0:
+                    LOGGER.debug("Sleeping for %.2f seconds", sleep_for)
+                    self.sleep(sleep_for)
+        except KeyboardInterrupt:  # pragma: no cover - manual interrupt
+            LOGGER.info("Shutting down scheduler")
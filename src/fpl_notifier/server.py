@@ -0,0 +1,262 @@
+"""A small read-through HTTP cache of upcoming deadlines.
+
+Devices (such as the companion mobile apps) can poll this server instead of
+the public FPL API. Upstream is contacted at most once per refresh window no
+matter how many clients ask, responses carry strong ``ETag`` and
+``Cache-Control`` headers, and conditional requests are answered with ``304``
+straight from memory.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .deadlines import GameweekDeadline, fetch_gameweek_deadlines
+
+LOGGER = logging.getLogger(__name__)
+
+Fetcher = Callable[..., List[GameweekDeadline]]
+Clock = Callable[[], datetime]
+
+# Bodies smaller than this are sent uncompressed; gzip would not pay off.
+_GZIP_MIN_BYTES = 256
+
+
+@dataclass(frozen=True)
+class _Resource:
+    body: bytes
+    gzip_body: Optional[bytes]
+    etag: str
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    resources: Dict[str, _Resource]
+    expires_at: datetime
+    # The first deadline it lists; it must be rebuilt once that passes.
+    next_deadline: Optional[datetime] = None
+
+
+def _encode(document: object) -> _Resource:
+    body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    gzip_body = gzip.compress(body, mtime=0) if len(body) >= _GZIP_MIN_BYTES else None
+    return _Resource(body=body, gzip_body=gzip_body, etag=etag)
+
+
+def _deadline_document(gameweek: GameweekDeadline) -> dict:
+    return {
+        "event_id": gameweek.event_id,
+        "name": gameweek.name,
+        "deadline": gameweek.deadline.isoformat().replace("+00:00", "Z"),
+    }
+
+
+class DeadlineCache:
+    """Pre-encoded deadline responses refreshed from upstream on demand.
+
+    Upstream is fetched when the refresh window has passed. Between fetches,
+    responses are rebuilt from memory whenever the earliest deadline passes,
+    so ``/deadlines/next`` never reports a gameweek that has already closed.
+    Only one request thread fetches at a time, without holding the lock;
+    other requests are served the previous data meanwhile (they only wait
+    for the very first fetch). If the fetch fails, the previous data keeps
+    being served. Failed fetches are retried after at most a minute, also
+    when there is no data yet to serve.
+    """
+
+    def __init__(
+        self,
+        *,
+        fetcher: Fetcher = fetch_gameweek_deadlines,
+        refresh_interval: timedelta = timedelta(minutes=15),
+        clock: Optional[Clock] = None,
+    ) -> None:
+        if refresh_interval <= timedelta(0):
+            raise ValueError("refresh_interval must be positive")
+        self.fetcher = fetcher
+        self.refresh_interval = refresh_interval
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.upstream_fetches = 0
+        self._lock = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+        self._refreshing = False
+        self._deadlines: List[GameweekDeadline] = []
+        self._refresh_at: Optional[datetime] = None
+        self._snapshot: Optional[_Snapshot] = None
+        # The failure behind a missing first snapshot, re-raised until the retry.
+        self._error: Optional[Exception] = None
+
+    def _build(self, now: datetime) -> _Snapshot:
+        upcoming = [gw for gw in self._deadlines if gw.deadline > now]
+        expires_at = self._refresh_at or now
+        if upcoming and upcoming[0].deadline < expires_at:
+            expires_at = upcoming[0].deadline
+        resources = {
+            "/deadlines": _encode({"deadlines": [_deadline_document(gw) for gw in upcoming]}),
+            "/deadlines/next": _encode({"deadline": _deadline_document(upcoming[0]) if upcoming else None}),
+            # Same shape as the ``events`` of bootstrap-static, so existing
+            # clients only need a different base URL.
+            "/api/bootstrap-static/": _encode(
+                {
+                    "events": [
+                        {
+                            "id": gw.event_id,
+                            "name": gw.name,
+                            "deadline_time": gw.deadline.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        }
+                        for gw in upcoming
+                    ]
+                }
+            ),
+        }
+        return _Snapshot(
+            resources=resources, expires_at=expires_at, next_deadline=upcoming[0].deadline if upcoming else None
+        )
+
+    def snapshot(self) -> _Snapshot:
+        now = self.clock()
+        snapshot = self._snapshot
+        if snapshot is not None and now < snapshot.expires_at:
+            return snapshot
+        with self._lock:
+            while True:
+                snapshot = self._snapshot
+                if snapshot is not None and now < snapshot.expires_at:
+                    return snapshot
+                if not self._refreshing:
+                    break
+                if snapshot is not None:
+                    # Another thread is fetching; serve the stale data meanwhile.
+                    if snapshot.next_deadline is not None and now >= snapshot.next_deadline:
+                        snapshot = self._snapshot = self._build(now)
+                    return snapshot
+                self._refreshed.wait()
+            if self._refresh_at is not None and now < self._refresh_at:
+                if snapshot is None and self._error is not None:
+                    raise self._error
+                self._snapshot = self._build(now)
+                return self._snapshot
+            self._refreshing = True
+            self.upstream_fetches += 1
+        try:
+            deadlines = self.fetcher(now=now)
+        except Exception as exc:
+            LOGGER.error("Failed to refresh deadlines: %s", exc, exc_info=True)
+            with self._lock:
+                self._refreshing = False
+                self._refreshed.notify_all()
+                # Retry after a short pause, serving what we have (or
+                # failing fast) until then rather than refetching per request.
+                self._refresh_at = now + min(self.refresh_interval, timedelta(minutes=1))
+                if self._snapshot is None:
+                    self._error = exc
+                    raise
+                self._snapshot = self._build(now)
+                return self._snapshot
+        with self._lock:
+            self._refreshing = False
+            self._refreshed.notify_all()
+            self._deadlines = deadlines
+            self._refresh_at = now + self.refresh_interval
+            self._error = None
+            self._snapshot = self._build(now)
+            return self._snapshot
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "DeadlineServer"
+
+    def do_GET(self) -> None:
+        self._respond(include_body=True)
+
+    def do_HEAD(self) -> None:
+        self._respond(include_body=False)
+
+    def _respond(self, *, include_body: bool) -> None:
+        path = self.path.split("?", 1)[0]
+        try:
+            snapshot = self.server.cache.snapshot()
+        except Exception:
+            self._send_plain(503, b"upstream unavailable\n", include_body)
+            return
+        resource = snapshot.resources.get(path)
+        if resource is None:
+            self._send_plain(404, b"not found\n", include_body)
+            return
+
+        max_age = max(math.ceil((snapshot.expires_at - self.server.cache.clock()).total_seconds()), 0)
+        use_gzip = resource.gzip_body is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        etag = resource.etag[:-1] + '-gz"' if use_gzip else resource.etag
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in _split_etags(if_none_match)):
+            self.send_response(304)
+            self._send_cache_headers(etag, max_age)
+            self.end_headers()
+            return
+
+        body = resource.gzip_body if use_gzip else resource.body
+        assert body is not None
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self._send_cache_headers(etag, max_age)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, etag: str, max_age: int) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"public, max-age={max_age}")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _send_plain(self, status: int, body: bytes, include_body: bool) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+def _split_etags(header: str) -> Tuple[str, ...]:
+    return tuple(tag.strip() for tag in header.split(","))
+
+
+class DeadlineServer(ThreadingHTTPServer):
+    """Threaded HTTP server exposing a :class:`DeadlineCache`."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], cache: DeadlineCache) -> None:
+        super().__init__(address, _Handler)
+        self.cache = cache
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080, *, cache: Optional[DeadlineCache] = None) -> None:
+    """Serve deadlines until interrupted."""
+
+    server = DeadlineServer((host, port), cache or DeadlineCache())
+    LOGGER.info("Serving deadlines on http://%s:%s", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover - manual interrupt
+        LOGGER.info("Shutting down deadline server")
+    finally:
+        server.server_close()
@@ -4,115 +4,553 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 import logging
+import threading
 import time
-from typing import Callable, Dict, Optional
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
 
-from .deadlines import GameweekDeadline, fetch_gameweek_deadlines
+from . import metrics
+from .deadlines import DeadlineChanges, GameweekDeadline, diff_deadlines, fetch_gameweek_deadlines
+from .polling import FixedPollPolicy, PollPolicy
+from .reminders import LeadTimes, Reminder, ReminderSchedule
+from .store import MemoryStateStore, StateStore
+
+if TYPE_CHECKING:  # pragma: no cover - only needed when configured
+    from .fixtures import FixtureDeadline, FixtureReminders
+    from .lease import SQLiteLease
+    from .outbox import Outbox, OutboxEntry
+    from .refresher import DeadlineRefresher
 
 LOGGER = logging.getLogger(__name__)
 
 SleepFunction = Callable[[float], None]
+# Outbox idempotency keys include a subscriber; the service has just one.
+OUTBOX_SUBSCRIBER = "default"
 Fetcher = Callable[..., list[GameweekDeadline]]
 
 
-class DeadlineNotificationService:
-    """Continuously polls the FPL API and delivers notifications."""
+class ServiceCore:
+    """Scheduling decisions shared by the blocking and asyncio services.
+
+    The core never performs I/O itself: subclasses fetch deadlines, hand them
+    to :meth:`_plan`, deliver whatever it reports as due, and sleep.
+
+    ``lead_time`` is a single lead time or a reminder plan of several (for
+    example 24 hours, 2 hours and 15 minutes); each gameweek gets one
+    reminder per lead time, tracked separately in the store.
+
+    How long to wait between refreshes is decided by ``poll_policy``; by
+    default a :class:`~fpl_notifier.polling.FixedPollPolicy` of
+    ``poll_interval``.
+
+    With ``fixtures``, kickoff and double gameweek reminders are scheduled
+    alongside the deadlines (see :mod:`fpl_notifier.fixtures`).
+    """
 
     def __init__(
         self,
         notifier,
         *,
-        lead_time: timedelta = timedelta(hours=2),
+        lead_time: LeadTimes = timedelta(hours=2),
         poll_interval: timedelta = timedelta(hours=6),
         fetcher: Fetcher = fetch_gameweek_deadlines,
-        sleep_func: SleepFunction = time.sleep,
+        store: Optional[StateStore] = None,
+        poll_policy: Optional[PollPolicy] = None,
+        fixtures: Optional[FixtureReminders] = None,
     ) -> None:
-        if lead_time <= timedelta(0):
-            raise ValueError("lead_time must be positive")
         if poll_interval <= timedelta(0):
             raise ValueError("poll_interval must be positive")
 
         self.notifier = notifier
-        self.lead_time = lead_time
+        self.schedule = ReminderSchedule(lead_time)
+        self.lead_times = self.schedule.lead_times
         self.poll_interval = poll_interval
         self.fetcher = fetcher
-        self.sleep = sleep_func
-        self._sent: Dict[int, datetime] = {}
+        self.poll_policy = poll_policy or FixedPollPolicy(poll_interval)
+        self.store = store if store is not None else MemoryStateStore()
+        self.fixtures = fixtures
+        self._targets: List[FixtureDeadline] = []
+        self._deadlines, self._fetched_at = self.store.load_deadlines()
+        self._warm_start = bool(self._deadlines)
+        self._failures = 0
+        # Deadlines fetched by ``refresh`` for the next step to consume.
+        self._prefetched: Optional[List[GameweekDeadline]] = None
+        # (event_id, lead_seconds, fire_us) of the reminder the last step is waiting for.
+        self._armed: Optional[Tuple[int, int, int]] = None
+        self.last_drift: Optional[float] = None
 
-    def _prune_sent(self, now: datetime) -> None:
-        for event_id, deadline in list(self._sent.items()):
-            expiry = deadline + self.poll_interval
-            if now >= expiry:
-                LOGGER.debug("Removing expired notification cache for GW %s", event_id)
-                del self._sent[event_id]
+    @property
+    def lead_time(self) -> timedelta:
+        """The longest lead time, i.e. the first reminder for each gameweek."""
+
+        return self.lead_times[0]
 
     def _get_now(self) -> datetime:
         return datetime.now(timezone.utc)
 
-    def step(self, *, now: Optional[datetime] = None) -> float:
-        """Perform a single scheduling step and return the suggested sleep time."""
-
+    def _normalise_now(self, now: Optional[datetime]) -> datetime:
         raw_now = now or self._get_now()
         if raw_now.tzinfo is None:
-            now = raw_now.replace(tzinfo=timezone.utc)
-        else:
-            now = raw_now.astimezone(timezone.utc)
-        LOGGER.debug("Scheduler step at %s", now.isoformat())
-        self._prune_sent(now)
+            return raw_now.replace(tzinfo=timezone.utc)
+        return raw_now.astimezone(timezone.utc)
 
-        try:
-            deadlines = self.fetcher(now=now)
-        except Exception as exc:  # pragma: no cover - defensive
-            LOGGER.error("Failed to fetch deadlines: %s", exc, exc_info=True)
-            return self.poll_interval.total_seconds()
+    def _prune_sent(self, now: datetime) -> None:
+        removed = self.store.prune_sent(now)
+        if removed:
+            LOGGER.debug("Removed %d expired notification cache entries", removed)
 
-        if not deadlines:
-            LOGGER.info("No upcoming deadlines. Sleeping for %s", self.poll_interval)
-            return self.poll_interval.total_seconds()
+    def _take_stored_deadlines(self, now: datetime) -> Optional[List[GameweekDeadline]]:
+        """Return stored deadlines on the first step after startup, if still fresh."""
 
-        upcoming = deadlines[0]
-        if upcoming.event_id in self._sent:
-            LOGGER.debug(
-                "Already notified about %s. Sleeping for %s", upcoming, self.poll_interval
+        if not self._warm_start:
+            return None
+        self._warm_start = False
+        if self._stored_fresh_for(now) <= 0:
+            LOGGER.info("Stored deadlines are due for a refresh; fetching")
+            return None
+        LOGGER.info("Scheduling from %d stored deadlines", len(self._deadlines))
+        return [gw for gw in self._deadlines if gw.deadline > now]
+
+    def _take_prefetched(self, now: datetime) -> Optional[List[GameweekDeadline]]:
+        deadlines, self._prefetched = self._prefetched, None
+        if deadlines is None:
+            return None
+        return [gw for gw in deadlines if gw.deadline > now]
+
+    def _remember_deadlines(self, deadlines: List[GameweekDeadline], now: datetime) -> DeadlineChanges:
+        """Store freshly fetched deadlines and re-arm reminders for moved ones."""
+
+        self._failures = 0
+        changes = DeadlineChanges()
+        if self._fetched_at is not None:
+            changes = diff_deadlines(self._deadlines, deadlines, now=now)
+        for previous, current in changes.changed:
+            if previous.deadline == current.deadline:
+                continue
+            LOGGER.info(
+                "Deadline for %s moved from %s to %s",
+                current,
+                previous.deadline.isoformat(),
+                current.deadline.isoformat(),
             )
-            return self.poll_interval.total_seconds()
+            self._rearm(current, now)
+        for gameweek in changes.added:
+            LOGGER.info("New deadline announced: %s", gameweek)
+        for gameweek in changes.removed:
+            LOGGER.info("Deadline withdrawn: %s", gameweek)
+
+        if deadlines != self._deadlines:
+            self.store.save_deadlines(deadlines, now)
+        else:
+            self.store.touch_deadlines(now)
+        self._deadlines = deadlines
+        self._fetched_at = now
+        return changes
+
+    def _rearm(self, current: GameweekDeadline, now: datetime) -> None:
+        # Reminders already sent for the old time are sent again for the
+        # new one, unless the new reminder time has already passed.
+        rearmed = 0
+        for lead in self.schedule.leads_for(current):
+            if current.deadline - lead > now:
+                rearmed += self.store.clear_sent(current.event_id, int(lead.total_seconds()))
+        if rearmed:
+            LOGGER.info("Re-arming %d reminder(s) for %s", rearmed, current)
 
-        notify_at = upcoming.deadline - self.lead_time
-        if notify_at <= now:
-            LOGGER.info("Within lead time for %s. Sending notification immediately.", upcoming)
-            self._deliver(upcoming)
-            return self.poll_interval.total_seconds()
+    def _remember_targets(self, targets: List[FixtureDeadline], now: datetime) -> None:
+        """Keep fixture reminder targets, re-arming those whose time moved."""
 
-        wait_seconds = (notify_at - now).total_seconds()
-        if wait_seconds > self.poll_interval.total_seconds():
+        for previous, current in diff_deadlines(self._targets, targets, now=now).changed:
+            if previous.deadline != current.deadline:
+                LOGGER.info("%s moved from %s", current, previous.deadline.isoformat())
+                self._rearm(current, now)
+        self._targets = targets
+
+    def _poll_delay(self, now: datetime, next_deadline: Optional[datetime]) -> float:
+        delay = self.poll_policy.next_poll(now=now, next_deadline=next_deadline, failures=self._failures)
+        return max(delay.total_seconds(), 0.0)
+
+    def _fetch_failed(self, now: datetime, exc: Exception) -> float:
+        """Record a failed fetch and return how long to wait before retrying."""
+
+        self._failures += 1
+        LOGGER.error("Failed to fetch deadlines: %s", exc, exc_info=True)
+        upcoming = [gw.deadline for gw in self._deadlines if gw.deadline > now]
+        delay = self._poll_delay(now, upcoming[0] if upcoming else None)
+        LOGGER.info("Retrying after %d consecutive failures in %.0f seconds", self._failures, delay)
+        return delay
+
+    def _plan(self, deadlines: List[GameweekDeadline], now: datetime) -> Tuple[List[Reminder], float]:
+        """Return the reminders to send now and the sleep time."""
+
+        armed, self._armed = self._armed, None
+        schedule = self.schedule
+        targets = [target for target in self._targets if target.deadline > now]
+        if targets:
+            schedule.update(sorted([*deadlines, *targets], key=lambda target: target.deadline))
+        else:
+            schedule.update(deadlines)
+        refresh = self._poll_delay(now, deadlines[0].deadline if deadlines else None)
+
+        # Several reminders can be overdue for one gameweek after downtime;
+        # only the one with the shortest lead (the latest) is worth sending.
+        latest: dict[int, Reminder] = {}
+        for reminder in schedule.due(now):
+            gameweek = reminder.gameweek
+            if gameweek.deadline <= now or self.store.is_sent(*reminder.key):
+                schedule.resolve(reminder)
+                continue
+            skipped = latest.get(gameweek.event_id)
+            if skipped is not None:
+                LOGGER.info("Skipping overdue %s reminder for %s", skipped.lead_time, gameweek)
+                self._mark_sent(skipped)
+                schedule.resolve(skipped)
+            latest[gameweek.event_id] = reminder
+
+        due = list(latest.values())
+        for reminder in due:
+            if armed == (*reminder.key, reminder.fire_us):
+                self._record_drift(reminder, now)
+            else:
+                LOGGER.info(
+                    "Within %s of %s. Sending notification immediately.", reminder.lead_time, reminder.gameweek
+                )
+
+        upcoming = schedule.next_after(now)
+        while upcoming is not None and self.store.is_sent(*upcoming.key):
+            schedule.resolve(upcoming)
+            upcoming = schedule.next_after(now)
+        if upcoming is None:
+            if not deadlines:
+                LOGGER.info("No upcoming deadlines. Sleeping for %.0f seconds", refresh)
+            return due, refresh
+
+        wait_seconds = (upcoming.fire_at - now).total_seconds()
+        if wait_seconds > refresh:
             LOGGER.debug(
-                "Notification is %.2f hours away; refreshing after %s",
+                "Next notification is %.2f hours away; refreshing after %.0f seconds",
                 wait_seconds / 3600.0,
-                self.poll_interval,
+                refresh,
             )
-            return self.poll_interval.total_seconds()
+            return due, refresh
 
         LOGGER.info(
-            "Scheduling notification for %s in %.1f minutes",
-            upcoming,
+            "Scheduling %s notification for %s in %.1f minutes",
+            upcoming.lead_time,
+            upcoming.gameweek,
             wait_seconds / 60.0,
         )
-        return max(wait_seconds, 0.0)
+        self._armed = (*upcoming.key, upcoming.fire_us)
+        return due, max(wait_seconds, 0.0)
+
+    def _stored_fresh_for(self, now: datetime) -> float:
+        # Stored deadlines are only trusted until the next poll would have
+        # been due; after that, refresh from the API straight away.
+        if self._fetched_at is None:
+            return 0.0
+        fetched_at = self._fetched_at
+        upcoming = [gw.deadline for gw in self._deadlines if gw.deadline > fetched_at]
+        refresh = self._poll_delay(fetched_at, upcoming[0] if upcoming else None)
+        return refresh - (now - fetched_at).total_seconds()
+
+    def _cap_stored_sleep(self, sleep_for: float, now: datetime) -> float:
+        return max(min(sleep_for, self._stored_fresh_for(now)), 0.0)
+
+    def _record_drift(self, reminder: Reminder, now: datetime) -> None:
+        drift = (now - reminder.fire_at).total_seconds()
+        self.last_drift = drift
+        metrics.SLEEP_DRIFT_SECONDS.observe(drift)
+        LOGGER.info(
+            "Reminder for %s is due; woke %.3f seconds after its scheduled time", reminder.gameweek, drift
+        )
+
+    def _mark_sent(self, reminder: Reminder) -> None:
+        gameweek = reminder.gameweek
+        self.store.mark_sent(gameweek.event_id, reminder.lead_seconds, gameweek.deadline + self.poll_interval)
+
+
+class DeadlineNotificationService(ServiceCore):
+    """Continuously polls the FPL API and delivers notifications.
+
+    Unless a custom ``sleep_func`` is given, waits between steps can be cut
+    short from another thread with :meth:`wake` (for example after
+    :meth:`refresh` spotted a moved deadline) or ended with :meth:`stop`.
+
+    With an :class:`~fpl_notifier.outbox.Outbox`, due reminders are written
+    to it before sending; failed sends are retried with backoff, and the
+    service wakes up for the next retry instead of waiting for the next poll.
+    Such a wake-up in :meth:`run` only drains the outbox; it does not fetch.
+
+    With a :class:`~fpl_notifier.refresher.DeadlineRefresher`, steps never
+    fetch: they schedule from the refresher's latest snapshot (or the stored
+    deadlines until it has one), and the refresher wakes the service when
+    the deadlines change. It refreshes the ``fixtures`` too, which steps
+    then only read. :meth:`run` starts and stops the refresher.
+
+    With a :class:`~fpl_notifier.lease.SQLiteLease`, :meth:`run` renews the
+    lease every ``lease.renew_interval`` and, while holding it, steps when a
+    step is due like without a lease; renewing never fetches. Otherwise it
+    waits as a standby, retrying every ``lease.renew_interval``. The
+    refresher only runs while leading, and every send first checks with
+    :meth:`~fpl_notifier.lease.SQLiteLease.verify` that the lease (and its
+    fencing token) is still ours. Replicas sharing a lease should share a
+    persistent ``store`` too, so a new leader does not repeat what the
+    previous one sent.
+    """
+
+    def __init__(
+        self,
+        notifier,
+        *,
+        lead_time: LeadTimes = timedelta(hours=2),
+        poll_interval: timedelta = timedelta(hours=6),
+        fetcher: Fetcher = fetch_gameweek_deadlines,
+        sleep_func: Optional[SleepFunction] = None,
+        store: Optional[StateStore] = None,
+        poll_policy: Optional[PollPolicy] = None,
+        outbox: Optional[Outbox] = None,
+        max_workers: int = 8,
+        fixtures: Optional[FixtureReminders] = None,
+        refresher: Optional[DeadlineRefresher] = None,
+        lease: Optional[SQLiteLease] = None,
+    ) -> None:
+        super().__init__(
+            notifier,
+            lead_time=lead_time,
+            poll_interval=poll_interval,
+            fetcher=fetcher,
+            store=store,
+            poll_policy=poll_policy,
+            fixtures=fixtures,
+        )
+        self.outbox = outbox
+        self.max_workers = max_workers
+        self.sleep = sleep_func or self._interruptible_sleep
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self.refresher = refresher
+        self.lease = lease
+        self._snapshot_version: Optional[int] = None
+        # When :meth:`run` should step next; earlier wake-ups only retry the outbox.
+        self._step_due_at: Optional[datetime] = None
+        # When :meth:`run` should next renew the lease, and whether it held it then.
+        self._renew_at: Optional[datetime] = None
+        self._leading = False
+        if refresher is not None:
+            refresher.subscribe(self.wake)
+            if fixtures is not None:
+                refresher.fixtures = fixtures
+
+    def _interruptible_sleep(self, seconds: float) -> None:
+        # Measured on the monotonic clock so wall-clock jumps cannot stretch
+        # or cut short the wait.
+        end = time.monotonic() + seconds
+        while not self._stopping:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._wakeup.wait(remaining):
+                self._wakeup.clear()
+                LOGGER.debug("Woken up %.2f seconds early", max(end - time.monotonic(), 0.0))
+                return
+
+    def wake(self) -> None:
+        """Interrupt the current wait so the next step runs immediately."""
+
+        self._step_due_at = None
+        self._wakeup.set()
 
-    def _deliver(self, gameweek: GameweekDeadline) -> None:
+    def stop(self) -> None:
+        """Make :meth:`run` return after the current step."""
+
+        self._stopping = True
+        self._wakeup.set()
+
+    def refresh(self, *, now: Optional[datetime] = None) -> DeadlineChanges:
+        """Fetch deadlines now and wake the loop if anything changed.
+
+        Safe to call from any thread; the fetched list is used by the next
+        step instead of fetching again. Fetch errors propagate to the caller.
+        """
+
+        now = self._normalise_now(now)
+        deadlines = self.fetcher(now=now)
+        with self._lock:
+            changes = self._remember_deadlines(deadlines, now)
+            self._prefetched = deadlines
+        if changes:
+            self.wake()
+        return changes
+
+    def step(self, *, now: Optional[datetime] = None) -> float:
+        """Perform a single scheduling step and return the suggested sleep time."""
+
+        now = self._normalise_now(now)
+        LOGGER.debug("Scheduler step at %s", now.isoformat())
+        started = time.perf_counter()
         try:
-            self.notifier.send(gameweek, self.lead_time)
-            self._sent[gameweek.event_id] = gameweek.deadline
+            with self._lock:
+                return self._step(now)
+        finally:
+            metrics.STEP_SECONDS.observe(time.perf_counter() - started)
+
+    def _step(self, now: datetime) -> float:
+        self._prune_sent(now)
+
+        try:
+            deadlines = self._take_prefetched(now)
+            from_store = False
+            if deadlines is None and self.refresher is not None:
+                deadlines = self._take_snapshot(now)
+            if deadlines is None:
+                deadlines = self._take_stored_deadlines(now)
+                from_store = deadlines is not None
+            if deadlines is None:
+                deadlines = self.fetcher(now=now)
+                self._remember_deadlines(deadlines, now)
+        except Exception as exc:
+            return self._finish_step(self._fetch_failed(now, exc), now)
+
+        if self.fixtures is not None:
+            # With a refresher, fixtures are fetched in its thread, not under the lock.
+            targets = self.fixtures.targets(deadlines, now=now, refresh=self.refresher is None)
+            self._remember_targets(targets, now)
+        due, sleep_for = self._plan(deadlines, now)
+        if self.outbox is None:
+            for reminder in due:
+                self._deliver(reminder)
+        else:
+            for reminder in due:
+                self._enqueue(reminder, now)
+        if from_store:
+            sleep_for = self._cap_stored_sleep(sleep_for, now)
+        return self._finish_step(sleep_for, now)
+
+    def _finish_step(self, sleep_for: float, now: datetime) -> float:
+        self._step_due_at = now + timedelta(seconds=sleep_for)
+        if self.outbox is None:
+            return sleep_for
+        return min(sleep_for, self._drain_outbox(now))
+
+    def _tick(self) -> float:
+        """Step if one is due; before that, only retry what the outbox has due."""
+
+        now = self._get_now()
+        due_at = self._step_due_at
+        if due_at is None or now >= due_at:
+            return self.step(now=now)
+        with self._lock:
+            sleep_for = (due_at - now).total_seconds()
+            if self.outbox is not None:
+                sleep_for = min(sleep_for, self._drain_outbox(now))
+        return sleep_for
+
+    def _lead(self) -> float:
+        """Renew the lease when due and, while holding it, step when due."""
+
+        assert self.lease is not None
+        now = self._get_now()
+        if self._renew_at is None or now >= self._renew_at:
+            leading = self.lease.acquire()
+            self._renew_at = now + self.lease.renew_interval
+            if leading and not self._leading:
+                # A new leader steps straight away rather than when it last planned to.
+                self._step_due_at = None
+                if self.refresher is not None:
+                    self.refresher.start()
+            elif self._leading and not leading and self.refresher is not None:
+                self.refresher.stop(timeout=1.0)
+            self._leading = leading
+        until_renewal = (self._renew_at - now).total_seconds()
+        if not self._leading:
+            return until_renewal
+        return min(self._tick(), until_renewal)
+
+    def _take_snapshot(self, now: datetime) -> List[GameweekDeadline]:
+        assert self.refresher is not None
+        snapshot = self.refresher.snapshot()
+        if snapshot is not None and snapshot.version != self._snapshot_version:
+            self._snapshot_version = snapshot.version
+            self._remember_deadlines(list(snapshot.deadlines), now)
+        return [gw for gw in self._deadlines if gw.deadline > now]
+
+    def _fenced(self) -> bool:
+        """Whether sends may go out: without a lease always, else only while it is still ours."""
+
+        return self.lease is None or self.lease.verify()
+
+    def _deliver(self, reminder: Reminder) -> None:
+        if not self._fenced():
+            LOGGER.warning("No longer holding the lease; leaving %s to the new leader", reminder.gameweek)
+            return
+        started = time.perf_counter()
+        try:
+            self.notifier.send(reminder.gameweek, reminder.lead_time)
         except Exception as exc:  # pragma: no cover - defensive
+            metrics.observe_send(self.notifier, time.perf_counter() - started, failed=True)
             LOGGER.error("Failed to send notification: %s", exc, exc_info=True)
+            return
+        metrics.observe_send(self.notifier, time.perf_counter() - started, failed=False)
+        self._mark_sent(reminder)
+        self.schedule.resolve(reminder)
+
+    def _enqueue(self, reminder: Reminder, now: datetime) -> None:
+        # Once in the outbox the reminder is the outbox's to deliver.
+        assert self.outbox is not None
+        self.outbox.enqueue(OUTBOX_SUBSCRIBER, reminder.gameweek, reminder.lead_time, now=now)
+        self._mark_sent(reminder)
+        self.schedule.resolve(reminder)
+
+    def _send_entry(self, entry: OutboxEntry) -> None:
+        if not self._fenced():
+            raise RuntimeError("no longer holding the lease")
+        started = time.perf_counter()
+        try:
+            self.notifier.send(entry.gameweek, entry.lead_time)
+        except Exception:
+            metrics.observe_send(self.notifier, time.perf_counter() - started, failed=True)
+            raise
+        metrics.observe_send(self.notifier, time.perf_counter() - started, failed=False)
+
+    def _drain_outbox(self, now: datetime) -> float:
+        """Send what the outbox has due and return the seconds until its next retry."""
+
+        assert self.outbox is not None
+        self.outbox.drain(self._send_entry, now=now, max_workers=self.max_workers)
+        self.outbox.prune(now - self.poll_interval)
+        retry_at = self.outbox.next_attempt_at()
+        if retry_at is None:
+            return float("inf")
+        return max((retry_at - now).total_seconds(), 0.0)
+
+    def run_once(self, *, now: Optional[datetime] = None) -> datetime:
+        """Run a single step and return when the next one should run.
+
+        Meant for hosts that start the notifier from a timer: with a
+        persistent store the step reuses saved deadlines and sent reminders,
+        so repeated invocations behave like one long-running service. Saved
+        deadlines older than the poll delay are fetched again first.
+        """
+
+        now = self._normalise_now(now)
+        sleep_for = self.step(now=now)
+        return now + timedelta(seconds=min(sleep_for, self.poll_interval.total_seconds()))
 
     def run(self) -> None:
         LOGGER.info("Starting deadline notification service")
+        if self.refresher is not None and self.lease is None:
+            self.refresher.start()
         try:
-            while True:
-                sleep_for = self.step()
-                if sleep_for > 0:
+            while not self._stopping:
+                sleep_for = self._tick() if self.lease is None else self._lead()
+                if sleep_for > 0 and not self._stopping:
                     LOGGER.debug("Sleeping for %.2f seconds", sleep_for)
                     self.sleep(sleep_for)
         except KeyboardInterrupt:  # pragma: no cover - manual interrupt
-            LOGGER.info("Shutting down notification service")
+            pass
+        finally:
+            if self.refresher is not None:
+                self.refresher.stop(timeout=1.0)
+            if self.lease is not None:
+                self.lease.release()
+        LOGGER.info("Shutting down notification service")
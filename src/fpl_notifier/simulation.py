@@ -0,0 +1,385 @@
+"""Replay a season against the schedulers on a virtual clock.
+
+A :class:`Season` describes the deadlines as the FPL API would have served
+them over time: the original fixture list, postponements announced part-way
+through, and windows during which the API is down. :func:`simulate_service`
+and :func:`simulate_subscribers` run the real ``run()`` loops of
+:class:`~fpl_notifier.service.DeadlineNotificationService` and
+:class:`~fpl_notifier.scheduler.SubscriberScheduler` against it, with a
+:class:`VirtualClock` injected as their ``sleep_func`` and ``_get_now`` so a
+whole season takes seconds, and report every reminder that was missed, late,
+early or sent twice.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import logging
+import random
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .deadlines import DeadlineTable, GameweekDeadline
+from .polling import PollPolicy
+from .reminders import LeadTimes, normalise_lead_times
+from .scheduler import Subscriber, SubscriberScheduler
+from .service import DeadlineNotificationService
+
+LOGGER = logging.getLogger(__name__)
+
+SEASON_START = datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc)
+
+# (subscriber_id, event_id, lead_seconds)
+ReminderKey = Tuple[str, int, int]
+
+
+class SimulationFinished(Exception):
+    """Raised by :meth:`VirtualClock.sleep` once the end of the season is reached."""
+
+
+class VirtualClock:
+    """A clock that only moves when the code under test sleeps."""
+
+    def __init__(self, start: datetime, end: datetime, *, max_idle_reads: int = 100_000) -> None:
+        self.current = start
+        self.end = end
+        self.sleeps = 0
+        self.max_idle_reads = max_idle_reads
+        self._idle_reads = 0
+
+    def now(self) -> datetime:
+        # A loop that never sleeps would otherwise spin forever at one instant.
+        self._idle_reads += 1
+        if self._idle_reads > self.max_idle_reads:
+            raise RuntimeError(f"no sleep for {self.max_idle_reads} clock reads at {self.current}")
+        return self.current
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps += 1
+        self._idle_reads = 0
+        self.current += timedelta(seconds=max(seconds, 0.0))
+        if self.current >= self.end:
+            raise SimulationFinished
+
+
+@dataclass(frozen=True)
+class Postponement:
+    """A deadline moved by ``shift``, visible from ``announced`` onwards."""
+
+    event_id: int
+    announced: datetime
+    shift: timedelta
+
+
+@dataclass(frozen=True)
+class Outage:
+    """An interval during which every API request fails."""
+
+    start: datetime
+    end: datetime
+
+
+@dataclass(frozen=True)
+class Season:
+    deadlines: Mapping[int, datetime]
+    postponements: Tuple[Postponement, ...] = ()
+    outages: Tuple[Outage, ...] = ()
+    names: Mapping[int, str] = field(default_factory=dict)
+
+    @classmethod
+    def synthetic(
+        cls,
+        *,
+        seed: int = 0,
+        gameweeks: int = 38,
+        postponements: int = 4,
+        outages: int = 6,
+        start: datetime = SEASON_START,
+    ) -> "Season":
+        """Weekly deadlines with random postponements and outages of up to 12 hours."""
+
+        rng = random.Random(seed)
+        deadlines = {n: start + timedelta(days=7 * (n - 1)) for n in range(1, gameweeks + 1)}
+        moved = []
+        for event_id in rng.sample(range(2, gameweeks + 1), min(postponements, gameweeks - 1)):
+            # Announced between 3 hours and 5 days ahead; pushed back by up to 3 days.
+            announced = deadlines[event_id] - timedelta(hours=rng.uniform(3, 120))
+            moved.append(Postponement(event_id, announced, timedelta(hours=rng.choice((24, 48, 72)))))
+        span = (deadlines[gameweeks] - start).total_seconds()
+        down = []
+        for _ in range(outages):
+            outage_start = start + timedelta(seconds=rng.uniform(0, span))
+            down.append(Outage(outage_start, outage_start + timedelta(hours=rng.uniform(0.25, 12))))
+        return cls(deadlines, tuple(moved), tuple(sorted(down, key=lambda outage: outage.start)))
+
+    @classmethod
+    def from_events(
+        cls,
+        events: Sequence[dict],
+        *,
+        postponements: Iterable[Postponement] = (),
+        outages: Iterable[Outage] = (),
+    ) -> "Season":
+        """Build a season from the ``events`` of a recorded ``bootstrap-static`` payload."""
+
+        table = DeadlineTable(events)
+        return cls(
+            {gameweek.event_id: gameweek.deadline for gameweek in table},
+            tuple(postponements),
+            tuple(outages),
+            {gameweek.event_id: gameweek.name for gameweek in table},
+        )
+
+    @property
+    def start(self) -> datetime:
+        return min(self.deadlines.values())
+
+    @property
+    def end(self) -> datetime:
+        return max(self.final_deadlines().values())
+
+    def deadlines_at(self, now: datetime) -> Dict[int, datetime]:
+        """Every gameweek's deadline as announced at ``now``."""
+
+        deadlines = dict(self.deadlines)
+        for change in self.postponements:
+            if now >= change.announced:
+                deadlines[change.event_id] += change.shift
+        return deadlines
+
+    def final_deadlines(self) -> Dict[int, datetime]:
+        return self.deadlines_at(datetime.max.replace(tzinfo=timezone.utc))
+
+    def is_down(self, now: datetime) -> bool:
+        return any(outage.start <= now < outage.end for outage in self.outages)
+
+
+class SeasonAPI:
+    """A fetcher serving ``season`` as of the ``now`` it is called with."""
+
+    def __init__(self, season: Season) -> None:
+        self.season = season
+        self.requests = 0
+        self.failures = 0
+
+    def __call__(self, *, now: datetime) -> List[GameweekDeadline]:
+        self.requests += 1
+        if self.season.is_down(now):
+            self.failures += 1
+            raise ConnectionError("simulated API outage")
+        return sorted(
+            (
+                GameweekDeadline(event_id, self.season.names.get(event_id, f"Gameweek {event_id}"), deadline)
+                for event_id, deadline in self.season.deadlines_at(now).items()
+                if deadline > now
+            ),
+            key=lambda gameweek: gameweek.deadline,
+        )
+
+
+@dataclass(frozen=True)
+class Delivery:
+    key: ReminderKey
+    deadline: datetime
+    sent_at: datetime
+
+
+class _RecordingNotifier:
+    def __init__(self, subscriber_id: str, clock: VirtualClock, deliveries: List[Delivery]) -> None:
+        self.subscriber_id = subscriber_id
+        self._clock = clock
+        self._deliveries = deliveries
+
+    def send(self, gameweek: GameweekDeadline, lead_time: timedelta) -> None:
+        key = (self.subscriber_id, gameweek.event_id, int(lead_time.total_seconds()))
+        self._deliveries.append(Delivery(key, gameweek.deadline, self._clock.current))
+
+
+@dataclass(frozen=True)
+class SimulationReport:
+    expected: int
+    on_time: int
+    late: int
+    early: int
+    missed: int
+    # The same reminder sent again although its deadline had not moved.
+    duplicates: int
+    # Reminders sent for a deadline that was later postponed.
+    superseded: int
+    upstream_requests: int
+    upstream_failures: int
+    simulated_days: float
+    cpu_seconds: float
+    max_lateness: timedelta = timedelta(0)
+
+    @property
+    def cpu_per_day(self) -> float:
+        return self.cpu_seconds / self.simulated_days if self.simulated_days else 0.0
+
+
+def _evaluate(
+    season: Season,
+    subscribers: Sequence[Subscriber],
+    deliveries: Sequence[Delivery],
+    *,
+    start: datetime,
+    tolerance: timedelta,
+) -> dict:
+    final = season.final_deadlines()
+    expected: Dict[ReminderKey, datetime] = {}
+    for subscriber in subscribers:
+        for event_id, deadline in final.items():
+            for lead in subscriber.lead_times:
+                if deadline - lead > start:
+                    expected[(subscriber.subscriber_id, event_id, int(lead.total_seconds()))] = deadline - lead
+
+    seen = Counter((delivery.key, delivery.deadline) for delivery in deliveries)
+    counts = {"on_time": 0, "late": 0, "early": 0, "superseded": 0}
+    delivered = set()
+    max_lateness = timedelta(0)
+    for delivery in deliveries:
+        due = expected.get(delivery.key)
+        if due is None or delivery.deadline != final[delivery.key[1]]:
+            counts["superseded"] += 1
+            continue
+        if delivery.key in delivered:
+            continue
+        delivered.add(delivery.key)
+        if delivery.sent_at < due - tolerance:
+            counts["early"] += 1
+        elif delivery.sent_at > due + tolerance:
+            counts["late"] += 1
+            max_lateness = max(max_lateness, delivery.sent_at - due)
+        else:
+            counts["on_time"] += 1
+    return {
+        "expected": len(expected),
+        "missed": len(expected.keys() - delivered),
+        "duplicates": sum(count - 1 for count in seen.values()),
+        "max_lateness": max_lateness,
+        **counts,
+    }
+
+
+def _replay(loop, clock: VirtualClock) -> float:
+    # Logging every reminder would dominate the CPU time being measured.
+    previous = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    started = time.process_time()
+    try:
+        loop()
+    except SimulationFinished:
+        pass
+    finally:
+        logging.disable(previous)
+    return time.process_time() - started
+
+
+def _report(
+    season: Season,
+    api: SeasonAPI,
+    subscribers: Sequence[Subscriber],
+    deliveries: Sequence[Delivery],
+    *,
+    start: datetime,
+    end: datetime,
+    cpu_seconds: float,
+    tolerance: timedelta,
+) -> SimulationReport:
+    return SimulationReport(
+        **_evaluate(season, subscribers, deliveries, start=start, tolerance=tolerance),
+        upstream_requests=api.requests,
+        upstream_failures=api.failures,
+        simulated_days=(end - start) / timedelta(days=1),
+        cpu_seconds=cpu_seconds,
+    )
+
+
+def _bounds(season: Season, lead: timedelta) -> Tuple[datetime, datetime]:
+    return season.start - lead - timedelta(days=1), season.end + timedelta(days=1)
+
+
+def simulate_service(
+    season: Season,
+    *,
+    lead_time: LeadTimes = timedelta(hours=2),
+    poll_interval: timedelta = timedelta(minutes=30),
+    poll_policy: Optional[PollPolicy] = None,
+    tolerance: timedelta = timedelta(minutes=1),
+) -> SimulationReport:
+    """Run :meth:`DeadlineNotificationService.run` over ``season``."""
+
+    lead_times = normalise_lead_times(lead_time)
+    start, end = _bounds(season, lead_times[0])
+    clock = VirtualClock(start, end)
+    api = SeasonAPI(season)
+    deliveries: List[Delivery] = []
+    service = DeadlineNotificationService(
+        _RecordingNotifier("default", clock, deliveries),
+        lead_time=lead_times,
+        poll_interval=poll_interval,
+        fetcher=api,
+        sleep_func=clock.sleep,
+        poll_policy=poll_policy,
+    )
+    service._get_now = clock.now
+    cpu_seconds = _replay(service.run, clock)
+    return _report(
+        season,
+        api,
+        [Subscriber("default", lead_times)],
+        deliveries,
+        start=start,
+        end=end,
+        cpu_seconds=cpu_seconds,
+        tolerance=tolerance,
+    )
+
+
+def simulate_subscribers(
+    season: Season,
+    subscribers: Sequence[Subscriber],
+    *,
+    poll_interval: timedelta = timedelta(minutes=30),
+    retry_interval: timedelta = timedelta(minutes=5),
+    tolerance: timedelta = timedelta(minutes=1),
+) -> SimulationReport:
+    """Run :meth:`SubscriberScheduler.run` for ``subscribers`` over ``season``."""
+
+    longest = max((lead for subscriber in subscribers for lead in subscriber.lead_times), default=timedelta(0))
+    start, end = _bounds(season, longest)
+    clock = VirtualClock(start, end)
+    api = SeasonAPI(season)
+    deliveries: List[Delivery] = []
+    notifiers: Dict[str, _RecordingNotifier] = {}
+
+    def notifier_factory(subscriber: Subscriber) -> _RecordingNotifier:
+        notifier = notifiers.get(subscriber.subscriber_id)
+        if notifier is None:
+            notifier = notifiers[subscriber.subscriber_id] = _RecordingNotifier(
+                subscriber.subscriber_id, clock, deliveries
+            )
+        return notifier
+
+    scheduler = SubscriberScheduler(
+        subscribers,
+        notifier_factory=notifier_factory,
+        poll_interval=poll_interval,
+        retry_interval=retry_interval,
+        fetcher=api,
+        sleep_func=clock.sleep,
+    )
+    scheduler._get_now = clock.now
+    cpu_seconds = _replay(scheduler.run, clock)
+    return _report(
+        season,
+        api,
+        subscribers,
+        deliveries,
+        start=start,
+        end=end,
+        cpu_seconds=cpu_seconds,
+        tolerance=tolerance,
+    )
@@ -0,0 +1,258 @@
+"""Local stand-ins for the FPL API and Pushover, for end-to-end load tests.
+
+:class:`FPLStandIn` serves ``bootstrap-static`` (and empty ``fixtures``)
+with an ``ETag``, answering conditional requests with ``304``.
+:class:`PushoverStandIn` accepts ``messages.json`` posts, reports an app
+rate limit in ``X-Limit-App-*`` headers and answers ``429`` once it is used
+up. Both can add latency and fail a share of requests.
+
+Point the real code paths at them with ``api_url`` arguments, or, for a
+whole process, with the ``FPL_API_URL`` and ``PUSHOVER_API_URL``
+environment variables::
+
+    with FPLStandIn(size=2_000_000) as fpl, PushoverStandIn(latency=0.05) as pushover:
+        env = {"FPL_API_URL": fpl.url, "PUSHOVER_API_URL": pushover.url}
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+def make_bootstrap(*, events: int = 38, start: Optional[datetime] = None, size: int = 0) -> bytes:
+    """A ``bootstrap-static`` body with weekly deadlines from ``start``.
+
+    ``size`` pads the document with player-like ``elements`` to about that
+    many bytes, after ``events`` as in the real response.
+    """
+
+    start = start or datetime.now(timezone.utc) + timedelta(days=1)
+    document: Dict[str, object] = {
+        "events": [
+            {
+                "id": n,
+                "name": f"Gameweek {n}",
+                "deadline_time": (start + timedelta(days=7 * (n - 1))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "finished": False,
+            }
+            for n in range(1, events + 1)
+        ],
+        "elements": [],
+    }
+    body = json.dumps(document).encode("utf-8")
+    element = json.dumps({"id": 1000, "web_name": "Player 1000", "stats": list(range(40))}).encode("utf-8")
+    count = max(size - len(body), 0) // (len(element) + 1)
+    document["elements"] = [{"id": n, "web_name": f"Player {n}", "stats": list(range(40))} for n in range(count)]
+    return json.dumps(document).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, keep-alive
+    # clients stall on Nagle's algorithm interacting with delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def reply(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for many load-test clients connecting at once. Read by listen()
+    # in the constructor, so it must be set on the class.
+    request_queue_size = 128
+
+
+class _StandIn:
+    """A threaded HTTP server on an ephemeral localhost port."""
+
+    path = "/"
+
+    def __init__(self, *, latency: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _should_fail(self) -> bool:
+        # Called with the lock held.
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    def _handler(self) -> type:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("stand-in is not running")
+        return f"http://127.0.0.1:{self._server.server_address[1]}{self.path}"
+
+    def start(self) -> "_StandIn":
+        server = _Server(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._server = server
+        return self
+
+    def stop(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class FPLStandIn(_StandIn):
+    """Serve ``bootstrap-static`` at :attr:`url`, with ``ETag`` revalidation.
+
+    ``payload`` is the response body (by default :func:`make_bootstrap` with
+    ``size`` bytes); replace it with :meth:`set_payload`. Failed requests
+    answer ``error_status``.
+    """
+
+    path = "/api/bootstrap-static/"
+
+    def __init__(
+        self,
+        payload: Optional[bytes] = None,
+        *,
+        size: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(latency=latency, error_rate=error_rate, seed=seed)
+        self.error_status = error_status
+        self.not_modified = 0
+        self.set_payload(payload if payload is not None else make_bootstrap(size=size))
+
+    def set_payload(self, payload: bytes) -> None:
+        etag = '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+        with self._lock:
+            self.payload, self.etag = payload, etag
+
+    def _handler(self) -> type:
+        stand_in = self
+
+        class Handler(_Handler):
+            def do_GET(self) -> None:
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    failed = stand_in._should_fail()
+                    payload, etag = stand_in.payload, stand_in.etag
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                path = urlsplit(self.path).path
+                if failed:
+                    self.reply(stand_in.error_status, b'{"error":"stand-in failure"}')
+                elif path == "/api/fixtures/":
+                    self.reply(200, b"[]", {"Content-Type": "application/json"})
+                elif path != stand_in.path:
+                    self.reply(404, b"")
+                elif self.headers.get("If-None-Match") == etag:
+                    with stand_in._lock:
+                        stand_in.not_modified += 1
+                    self.reply(304, b"", {"ETag": etag})
+                else:
+                    self.reply(200, payload, {"Content-Type": "application/json", "ETag": etag})
+
+        return Handler
+
+
+class PushoverStandIn(_StandIn):
+    """Accept Pushover ``messages.json`` posts at :attr:`url`.
+
+    With ``rate_limit``, at most that many messages are accepted per
+    ``window`` seconds; later ones get ``429``. Failed requests answer
+    ``500``. Accepted messages (their form fields) are kept in
+    :attr:`messages`.
+    """
+
+    path = "/1/messages.json"
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        window: float = 60.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(latency=latency, error_rate=error_rate, seed=seed)
+        self.rate_limit = rate_limit
+        self.window = window
+        self.rate_limited = 0
+        self.messages: List[Dict[str, str]] = []
+        self._window_start = time.time()
+        self._window_count = 0
+
+    def _admit(self) -> Optional[Dict[str, str]]:
+        # Called with the lock held; returns the rate limit headers, or
+        # ``None`` when the limit is used up.
+        if self.rate_limit is None:
+            return {}
+        now = time.time()
+        if now - self._window_start >= self.window:
+            self._window_start, self._window_count = now, 0
+        reset = f"{self._window_start + self.window:.0f}"
+        if self._window_count >= self.rate_limit:
+            self.rate_limited += 1
+            return None
+        self._window_count += 1
+        return {"X-Limit-App-Remaining": str(self.rate_limit - self._window_count), "X-Limit-App-Reset": reset}
+
+    def _handler(self) -> type:
+        stand_in = self
+
+        class Handler(_Handler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                fields = {key: values[-1] for key, values in parse_qs(body.decode("utf-8")).items()}
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    failed = stand_in._should_fail()
+                    limits = None if failed else stand_in._admit()
+                    if limits is not None:
+                        stand_in.messages.append(fields)
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                json_type = {"Content-Type": "application/json"}
+                if failed:
+                    self.reply(500, b'{"status":0,"errors":["stand-in failure"]}', json_type)
+                elif limits is None:
+                    self.reply(429, b'{"status":0,"errors":["application over quota"]}', json_type)
+                else:
+                    self.reply(200, b'{"status":1,"request":"stand-in"}', {**json_type, **limits})
+
+        return Handler
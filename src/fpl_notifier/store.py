@@ -0,0 +1,217 @@
+"""Persistence for sent notifications and the last known deadlines."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from .deadlines import GameweekDeadline
+
+LOGGER = logging.getLogger(__name__)
+
+SentKey = Tuple[int, int]
+
+
+def _from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+class StateStore(Protocol):
+    """Storage used by :class:`~fpl_notifier.service.DeadlineNotificationService`.
+
+    Sent notifications are keyed by ``(event_id, lead_seconds)`` and carry an
+    expiry after which they are pruned. ``clear_sent`` forgets one reminder,
+    or every reminder for the event when ``lead_seconds`` is ``None``.
+    ``touch_deadlines`` records a fetch that returned the saved deadlines
+    unchanged, so ``fetched_at`` always reflects the last successful fetch.
+    """
+
+    def is_sent(self, event_id: int, lead_seconds: int) -> bool: ...
+
+    def mark_sent(self, event_id: int, lead_seconds: int, expires_at: datetime) -> None: ...
+
+    def prune_sent(self, now: datetime) -> int: ...
+
+    def clear_sent(self, event_id: int, lead_seconds: Optional[int] = None) -> int: ...
+
+    def sent_count(self) -> int: ...
+
+    def load_deadlines(self) -> Tuple[List[GameweekDeadline], Optional[datetime]]: ...
+
+    def save_deadlines(self, deadlines: Sequence[GameweekDeadline], fetched_at: datetime) -> None: ...
+
+    def touch_deadlines(self, fetched_at: datetime) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class MemoryStateStore:
+    """In-process store; state is lost when the process exits."""
+
+    def __init__(self) -> None:
+        self._sent: Dict[SentKey, float] = {}
+        # (expires_at, key) pairs; an expiry heap turns pruning into pops
+        # from the front instead of a scan over every entry.
+        self._expiries: List[Tuple[float, SentKey]] = []
+        self._deadlines: List[GameweekDeadline] = []
+        self._fetched_at: Optional[datetime] = None
+
+    def is_sent(self, event_id: int, lead_seconds: int) -> bool:
+        return (event_id, lead_seconds) in self._sent
+
+    def mark_sent(self, event_id: int, lead_seconds: int, expires_at: datetime) -> None:
+        key = (event_id, lead_seconds)
+        expiry = expires_at.timestamp()
+        self._sent[key] = expiry
+        heapq.heappush(self._expiries, (expiry, key))
+
+    def prune_sent(self, now: datetime) -> int:
+        now_epoch = now.timestamp()
+        removed = 0
+        while self._expiries and self._expiries[0][0] <= now_epoch:
+            expiry, key = heapq.heappop(self._expiries)
+            # Entries re-marked with a later expiry leave stale heap items.
+            if self._sent.get(key) == expiry:
+                del self._sent[key]
+                removed += 1
+        return removed
+
+    def clear_sent(self, event_id: int, lead_seconds: Optional[int] = None) -> int:
+        if lead_seconds is not None:
+            return int(self._sent.pop((event_id, lead_seconds), None) is not None)
+        keys = [key for key in self._sent if key[0] == event_id]
+        for key in keys:
+            del self._sent[key]
+        return len(keys)
+
+    def sent_count(self) -> int:
+        return len(self._sent)
+
+    def load_deadlines(self) -> Tuple[List[GameweekDeadline], Optional[datetime]]:
+        return list(self._deadlines), self._fetched_at
+
+    def save_deadlines(self, deadlines: Sequence[GameweekDeadline], fetched_at: datetime) -> None:
+        self._deadlines = list(deadlines)
+        self._fetched_at = fetched_at
+
+    def touch_deadlines(self, fetched_at: datetime) -> None:
+        self._fetched_at = fetched_at
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteStateStore:
+    """Durable store backed by an SQLite database in WAL mode."""
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS sent (
+            event_id INTEGER NOT NULL,
+            lead_seconds INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (event_id, lead_seconds)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS sent_expires_at ON sent (expires_at)",
+        """
+        CREATE TABLE IF NOT EXISTS deadlines (
+            event_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            deadline REAL NOT NULL
+        )
+        """,
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)",
+    )
+
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+
+    def is_sent(self, event_id: int, lead_seconds: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sent WHERE event_id = ? AND lead_seconds = ?",
+                (event_id, lead_seconds),
+            ).fetchone()
+        return row is not None
+
+    def mark_sent(self, event_id: int, lead_seconds: int, expires_at: datetime) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sent (event_id, lead_seconds, expires_at) VALUES (?, ?, ?)",
+                (event_id, lead_seconds, expires_at.timestamp()),
+            )
+
+    def prune_sent(self, now: datetime) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sent WHERE expires_at <= ?", (now.timestamp(),))
+        return cursor.rowcount
+
+    def clear_sent(self, event_id: int, lead_seconds: Optional[int] = None) -> int:
+        with self._lock:
+            if lead_seconds is None:
+                cursor = self._conn.execute("DELETE FROM sent WHERE event_id = ?", (event_id,))
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM sent WHERE event_id = ? AND lead_seconds = ?", (event_id, lead_seconds)
+                )
+        return cursor.rowcount
+
+    def sent_count(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sent").fetchone()
+        return count
+
+    def load_deadlines(self) -> Tuple[List[GameweekDeadline], Optional[datetime]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT event_id, name, deadline FROM deadlines ORDER BY deadline"
+            ).fetchall()
+            fetched = self._conn.execute("SELECT value FROM meta WHERE key = 'fetched_at'").fetchone()
+        deadlines = [
+            GameweekDeadline(event_id=event_id, name=name, deadline=_from_epoch(deadline))
+            for event_id, name, deadline in rows
+        ]
+        return deadlines, _from_epoch(fetched[0]) if fetched else None
+
+    def save_deadlines(self, deadlines: Sequence[GameweekDeadline], fetched_at: datetime) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM deadlines")
+                self._conn.executemany(
+                    "INSERT INTO deadlines (event_id, name, deadline) VALUES (?, ?, ?)",
+                    [(gw.event_id, gw.name, gw.deadline.timestamp()) for gw in deadlines],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched_at', ?)",
+                    (fetched_at.timestamp(),),
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def touch_deadlines(self, fetched_at: datetime) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched_at', ?)", (fetched_at.timestamp(),)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
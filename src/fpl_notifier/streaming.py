@@ -0,0 +1,131 @@
+"""Incremental extraction of the ``events`` array from ``bootstrap-static``.
+
+The ``bootstrap-static`` document is several megabytes, almost all of it
+player data that the notifier never looks at. Instead of building Python
+objects for the whole document with :func:`json.load`, the scanner below walks
+the raw bytes chunk by chunk, tracking only bracket depth and string
+boundaries, and decodes nothing but the ``events`` value. Reading stops as
+soon as that value is complete.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import BinaryIO, List, Optional
+
+# A flat object or array (no nested containers) is matched whole so that the
+# thousands of player records are skipped inside the regex engine. Otherwise a
+# token is either a JSON string (the closing quote is captured so truncated
+# strings at the end of a chunk can be told apart) or a structural character.
+# Numbers and literals never contain structural characters and are skipped.
+_STRING = rb'"(?:[^"\\]++|\\.)*+"'
+_FLAT = rb'(?:[^"{}\[\]]++|' + _STRING + rb')*+'
+_TOKEN = re.compile(
+    rb"(?P<flat>\{" + _FLAT + rb"\}|\[" + _FLAT + rb"\])"
+    + rb'|"(?:[^"\\]|\\.)*(")?|[\[\]{}:,]'
+)
+
+_EVENTS_KEY = b'"events"'
+_EVENT_FIELDS = ("id", "name", "event", "deadline_time")
+
+_OPEN_OBJECT = ord("{")
+_OPEN_ARRAY = ord("[")
+_CLOSE_OBJECT = ord("}")
+_CLOSE_ARRAY = ord("]")
+_COMMA = ord(",")
+_COLON = ord(":")
+_QUOTE = ord('"')
+
+
+def extract_events(stream: BinaryIO, *, chunk_size: int = 64 * 1024) -> List[dict]:
+    """Return the top-level ``events`` array of a JSON document.
+
+    Only the fields used for scheduling (``id``, ``name``, ``event`` and
+    ``deadline_time``) are kept for each event. An empty list is returned when
+    the document has no ``events`` key.
+    """
+
+    buffer = bytearray()
+    pos = 0
+    depth = 0
+    expect_key = False
+    events_key = False
+    capture_start: Optional[int] = None
+    end: Optional[int] = None
+    eof = False
+
+    while end is None and not eof:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+
+        pos_after = len(buffer)
+        for match in _TOKEN.finditer(buffer, pos):
+            if match.group("flat") is not None:
+                # A complete value; it cannot change depth or hold the key.
+                continue
+            first = buffer[match.start()]
+            if first == _QUOTE:
+                if match.group(2) is None:
+                    if eof:
+                        raise ValueError("unterminated string in JSON document")
+                    pos_after = match.start()
+                    break
+                if depth == 1 and expect_key:
+                    events_key = match.group() == _EVENTS_KEY
+                    expect_key = False
+            elif first == _COLON:
+                if events_key:
+                    capture_start = match.end()
+                    events_key = False
+            elif first == _COMMA:
+                if depth == 1:
+                    if capture_start is not None:
+                        end = match.start()
+                        break
+                    expect_key = True
+            elif first == _OPEN_OBJECT or first == _OPEN_ARRAY:
+                depth += 1
+                if depth == 1:
+                    expect_key = first == _OPEN_OBJECT
+            else:
+                if depth == 1 and capture_start is not None:
+                    end = match.start()
+                    break
+                depth -= 1
+                if depth < 0:
+                    raise ValueError("unbalanced brackets in JSON document")
+
+        if end is not None:
+            break
+        # Drop bytes that can no longer be part of the captured value.
+        keep_from = pos_after if capture_start is None else capture_start
+        if keep_from:
+            del buffer[:keep_from]
+            pos_after -= keep_from
+            if capture_start is not None:
+                capture_start = 0
+        pos = pos_after
+
+    if capture_start is None or end is None:
+        if depth != 0:
+            raise ValueError("truncated JSON document")
+        return []
+
+    events = json.loads(bytes(buffer[capture_start:end]))
+    if not isinstance(events, list):
+        return []
+    return [
+        {field: event[field] for field in _EVENT_FIELDS if field in event}
+        for event in events
+        if isinstance(event, dict)
+    ]
+
+
+def load_events_payload(stream: BinaryIO) -> dict:
+    """Drop-in for :func:`json.load` that only materialises ``events``."""
+
+    return {"events": extract_events(stream)}
@@ -0,0 +1,253 @@
+"""Subscribers loaded from a JSON Lines file and reloaded while running.
+
+Each line holds one compact record::
+
+    {"id": "alice", "user_key": "u123", "timezone": "Europe/London", "lead_hours": [24, 2]}
+
+``id`` is required. ``timezone`` and ``lead_hours`` fall back to the
+registry's defaults; every other key (``user_key``, ``device``, ``sound``,
+``priority``, ``locale``, ``channels``...) ends up in
+:attr:`~fpl_notifier.scheduler.Subscriber.options`. Blank lines and lines
+starting with ``#`` are ignored.
+
+The file is read line by line, and a line identical to one already loaded
+is not parsed again: its :class:`~fpl_notifier.scheduler.Subscriber` is
+reused. :meth:`SubscriberRegistry.reload` only reads the file when its
+size, modification time or inode changed, and reports which subscribers
+were added, changed or removed so a scheduler only re-arms those.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from zoneinfo import ZoneInfo
+
+from .reminders import normalise_lead_times
+from .scheduler import Subscriber
+
+if TYPE_CHECKING:  # pragma: no cover - only needed when notifying
+    from .channels import ChannelRegistry
+    from .rendering import MessageRenderer
+    from .scheduler import SubscriberScheduler
+
+LOGGER = logging.getLogger(__name__)
+
+_RESERVED = frozenset({"id", "timezone", "lead_hours"})
+_DECODER = json.JSONDecoder()
+
+
+@dataclass
+class SubscriberChanges:
+    added: List[Subscriber] = field(default_factory=list)
+    updated: List[Subscriber] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def apply(self, scheduler: SubscriberScheduler) -> None:
+        for subscriber in (*self.added, *self.updated):
+            scheduler.add_subscriber(subscriber)
+        for subscriber_id in self.removed:
+            scheduler.remove_subscriber(subscriber_id)
+
+
+class SubscriberRegistry:
+    """The subscribers in a JSON Lines file, kept in sync by :meth:`reload`."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        timezone: ZoneInfo = ZoneInfo("UTC"),
+        lead_times: Sequence[timedelta] = (timedelta(hours=2),),
+    ) -> None:
+        self.path = path
+        self.timezone = timezone
+        self.lead_times = normalise_lead_times(lead_times)
+        self.loads = 0
+        # Few distinct plans and zones are shared by many subscribers.
+        self._lead_plans: Dict[object, Tuple[timedelta, ...]] = {}
+        self._zones: Dict[str, ZoneInfo] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        # Raw line -> subscriber parsed from it.
+        self._lines: Dict[str, Subscriber] = {}
+        self._subscribers: Dict[str, Subscriber] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def __iter__(self):
+        return iter(self._subscribers.values())
+
+    def get(self, subscriber_id: str) -> Optional[Subscriber]:
+        return self._subscribers.get(subscriber_id)
+
+    def parse(self, record: dict) -> Subscriber:
+        """Build a subscriber from one record, using the defaults for missing fields."""
+
+        if not isinstance(record, dict):
+            raise ValueError("a subscriber record must be a JSON object")
+        lead_times = self.lead_times
+        lead_hours = record.get("lead_hours")
+        if lead_hours is not None:
+            key = tuple(lead_hours) if isinstance(lead_hours, list) else lead_hours
+            lead_times = self._lead_plans.get(key)
+            if lead_times is None:
+                hours = key if isinstance(key, tuple) else (key,)
+                lead_times = normalise_lead_times([timedelta(hours=float(value)) for value in hours])
+                self._lead_plans[key] = lead_times
+        timezone = self.timezone
+        zone = record.get("timezone")
+        if zone:
+            timezone = self._zones.get(zone)
+            if timezone is None:
+                timezone = self._zones[zone] = ZoneInfo(zone)
+        return Subscriber(
+            str(record.get("id") or ""),
+            lead_times=lead_times,
+            timezone=timezone,
+            options={key: value for key, value in record.items() if key not in _RESERVED},
+        )
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read(self) -> Tuple[Dict[str, Subscriber], Dict[str, Subscriber]]:
+        lines: Dict[str, Subscriber] = {}
+        subscribers: Dict[str, Subscriber] = {}
+        previous = self._lines
+        with open(self.path, "r", encoding="utf-8") as handle:
+            for number, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                subscriber = previous.get(line)
+                if subscriber is None:
+                    try:
+                        subscriber = self.parse(_DECODER.decode(line))
+                    except Exception as exc:
+                        LOGGER.warning("Skipping invalid subscriber on %s line %d: %s", self.path, number, exc)
+                        continue
+                if subscriber.subscriber_id in subscribers:
+                    LOGGER.warning(
+                        "Duplicate subscriber %r on %s line %d", subscriber.subscriber_id, self.path, number
+                    )
+                lines[line] = subscriber
+                subscribers[subscriber.subscriber_id] = subscriber
+        return lines, subscribers
+
+    def reload(self, *, force: bool = False) -> SubscriberChanges:
+        """Re-read the file if it changed and return what changed since the last load.
+
+        A file that disappears or cannot be read leaves the subscribers as
+        they were.
+        """
+
+        signature = self._stat()
+        if signature is None or (signature == self._signature and not force):
+            return SubscriberChanges()
+        try:
+            lines, subscribers = self._read()
+        except OSError as exc:
+            LOGGER.error("Failed to read subscribers from %s: %s", self.path, exc)
+            return SubscriberChanges()
+        self.loads += 1
+        self._signature = signature
+
+        changes = SubscriberChanges()
+        previous = self._subscribers
+        for subscriber_id, subscriber in subscribers.items():
+            old = previous.get(subscriber_id)
+            if old is None:
+                changes.added.append(subscriber)
+            elif old is not subscriber:
+                changes.updated.append(subscriber)
+        changes.removed = [subscriber_id for subscriber_id in previous if subscriber_id not in subscribers]
+        self._lines = lines
+        self._subscribers = subscribers
+        if changes:
+            LOGGER.info(
+                "Subscribers from %s: %d added, %d changed, %d removed",
+                self.path,
+                len(changes.added),
+                len(changes.updated),
+                len(changes.removed),
+            )
+        return changes
+
+
+class SubscriberNotifiers:
+    """A ``notifier_factory`` building each subscriber's notifier once.
+
+    Subscribers with a ``user_key`` are notified through Pushover with the
+    shared application ``token`` and their own ``device``, ``sound``,
+    ``priority`` and ``locale``; ``channels`` add further channels through
+    ``channels`` (see :mod:`fpl_notifier.channels`). A notifier is rebuilt
+    only when its subscriber's record changed, and dropped by :meth:`forget`
+    when the subscriber is removed.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str],
+        *,
+        renderer: Optional[MessageRenderer] = None,
+        channels: Optional[ChannelRegistry] = None,
+    ) -> None:
+        self.token = token
+        self.renderer = renderer
+        self.channels = channels
+        self._notifiers: Dict[str, Tuple[Subscriber, object]] = {}
+
+    def _build(self, subscriber: Subscriber):
+        options = subscriber.options
+        specs = list(options.get("channels") or ())
+        if options.get("user_key"):
+            if not self.token:
+                raise ValueError("PUSHOVER_TOKEN is required for subscribers with a user_key")
+            pushover = {
+                "type": "pushover",
+                "token": self.token,
+                "user_key": str(options["user_key"]),
+                **{key: options[key] for key in ("sound", "device", "priority", "locale") if key in options},
+            }
+            if not specs:
+                from .notifier import PushoverNotifier
+
+                del pushover["type"]
+                return PushoverNotifier(timezone=subscriber.timezone, renderer=self.renderer, **pushover)
+            specs.insert(0, pushover)
+        if not specs:
+            raise ValueError(f"subscriber {subscriber.subscriber_id!r} has neither a user_key nor channels")
+        if self.channels is None:
+            from .channels import ChannelRegistry
+
+            self.channels = ChannelRegistry()
+        registry = self.channels
+        return registry.notifier(
+            [registry.create(spec, timezone=subscriber.timezone, renderer=self.renderer) for spec in specs]
+        )
+
+    def __call__(self, subscriber: Subscriber):
+        cached = self._notifiers.get(subscriber.subscriber_id)
+        if cached is not None and cached[0] is subscriber:
+            return cached[1]
+        notifier = self._build(subscriber)
+        self._notifiers[subscriber.subscriber_id] = (subscriber, notifier)
+        return notifier
+
+    def forget(self, subscriber_id: str) -> None:
+        """Drop the cached notifier of a removed subscriber."""
+
+        self._notifiers.pop(subscriber_id, None)
@@ -0,0 +1,241 @@
+"""Keep-alive HTTP connection pooling for notification backends."""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+import http.client
+import io
+import logging
+import queue
+import select
+import selectors
+import ssl
+import threading
+from typing import Dict, Mapping, Optional, Tuple
+from urllib import error, parse, request
+
+LOGGER = logging.getLogger(__name__)
+
+# (scheme, host, port, proxy URL or "" for a direct connection)
+_PoolKey = Tuple[str, str, int, str]
+
+# Failures that mean a reused keep-alive connection was closed by the server
+# between requests. The request is retried once on a fresh connection if it
+# failed while being written, or, for idempotent methods, while awaiting the
+# response: by then the server may have acted on it, and a repeated POST
+# would be a duplicate notification.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _is_dropped(conn: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket only becomes readable when the server closed
+    # it (or sent something unsolicited); either way it cannot be reused.
+    # ``select.select`` cannot watch descriptors above FD_SETSIZE (1024), so a
+    # busy process would see every pooled connection as dropped.
+    if conn.sock is None:
+        return False
+    try:
+        if hasattr(select, "poll"):
+            poller = select.poll()
+            poller.register(conn.sock, select.POLLIN)
+            return bool(poller.poll(0))
+        with selectors.DefaultSelector() as selector:
+            selector.register(conn.sock, selectors.EVENT_READ)
+            return bool(selector.select(0))
+    except (OSError, ValueError):
+        return True
+
+
+def _split_proxy(proxy: str) -> parse.SplitResult:
+    # Proxy settings are often given as a bare "host:port".
+    return parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+
+def _proxy_headers(proxy: parse.SplitResult) -> Dict[str, str]:
+    if proxy.username is None:
+        return {}
+    credentials = f"{parse.unquote(proxy.username)}:{parse.unquote(proxy.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode()).decode("ascii")}
+
+
+@dataclass(frozen=True)
+class HTTPResponse:
+    """A fully read response; ``headers`` lookups are case-insensitive."""
+
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+
+
+class HTTPConnectionPool:
+    """A thread-safe pool of persistent ``http.client`` connections.
+
+    Idle connections are kept per ``(scheme, host, port)`` and proxy and reused by later
+    requests, so a burst of notifications pays for one TCP and TLS handshake
+    per connection rather than one per message. At most ``max_idle``
+    connections are kept open per host; extra ones are closed after use.
+
+    Like ``urllib``, requests go through the proxy configured for their
+    scheme (``proxies`` defaults to ``HTTP_PROXY``/``HTTPS_PROXY`` from the
+    environment) unless ``NO_PROXY`` exempts the host. HTTPS is tunnelled
+    with ``CONNECT``, so TLS still runs end to end.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_idle: int = 16,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        if max_idle <= 0:
+            raise ValueError("max_idle must be positive")
+        self.max_idle = max_idle
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.proxies = dict(request.getproxies() if proxies is None else proxies)
+        self._idle: Dict[_PoolKey, "queue.LifoQueue[http.client.HTTPConnection]"] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _queue(self, key: _PoolKey) -> "queue.LifoQueue[http.client.HTTPConnection]":
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle is None:
+                idle = self._idle[key] = queue.LifoQueue(self.max_idle)
+            return idle
+
+    def _proxy_for(self, scheme: str, host: str) -> str:
+        proxy = self.proxies.get(scheme, "")
+        if proxy and request.proxy_bypass_environment(host, self.proxies):
+            return ""
+        return proxy
+
+    def _connect(self, key: _PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port, proxy = key
+        with self._lock:
+            self.connections_opened += 1
+        if not proxy:
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+            return http.client.HTTPConnection(host, port, timeout=timeout)
+        proxy_parts = _split_proxy(proxy)
+        proxy_host, proxy_port = proxy_parts.hostname or "", proxy_parts.port or 80
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=timeout, context=self.ssl_context)
+            conn.set_tunnel(host, port, headers=_proxy_headers(proxy_parts))
+            return conn
+        return http.client.HTTPConnection(proxy_host, proxy_port, timeout=timeout)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: float = 10,
+    ) -> HTTPResponse:
+        """Send a request and return the full response.
+
+        Transport failures raise :class:`urllib.error.URLError` and error
+        statuses raise :class:`urllib.error.HTTPError`, matching ``urllib``.
+        """
+
+        parts = parse.urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or ""
+        proxy = self._proxy_for(scheme, host)
+        key = (scheme, host, parts.port or (443 if scheme == "https" else 80), proxy)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = dict(headers or {})
+        if proxy and scheme != "https":
+            # A plain HTTP proxy takes the absolute URL in the request line.
+            target = f"{scheme}://{parts.netloc.rpartition('@')[2]}{target}"
+            headers.update(_proxy_headers(_split_proxy(proxy)))
+        idle = self._queue(key)
+
+        for attempt in range(2):
+            try:
+                conn = idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                conn = self._connect(key, timeout)
+                reused = False
+            if reused and _is_dropped(conn):
+                LOGGER.debug("Pooled connection to %s was closed by the server; reconnecting", key[1])
+                conn.close()
+                conn = self._connect(key, timeout)
+                reused = False
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+            except _STALE_CONNECTION_ERRORS as exc:
+                conn.close()
+                if reused and attempt == 0:
+                    LOGGER.debug("Pooled connection to %s went stale; reconnecting", key[1])
+                    continue
+                raise error.URLError(exc) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise error.URLError(exc) from exc
+            try:
+                response = conn.getresponse()
+                data = response.read()
+            except _STALE_CONNECTION_ERRORS as exc:
+                conn.close()
+                if reused and attempt == 0 and method.upper() in _IDEMPOTENT_METHODS:
+                    LOGGER.debug("Pooled connection to %s went stale; retrying %s", key[1], method)
+                    continue
+                raise error.URLError(exc) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise error.URLError(exc) from exc
+
+            if response.will_close:
+                conn.close()
+            else:
+                try:
+                    idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+
+            if response.status >= 400:
+                raise error.HTTPError(
+                    url, response.status, response.reason, response.msg, io.BytesIO(data)
+                )
+            return HTTPResponse(response.status, response.msg, data)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def close(self) -> None:
+        with self._lock:
+            queues = list(self._idle.values())
+            self._idle.clear()
+        for idle in queues:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+_DEFAULT_POOL: Optional[HTTPConnectionPool] = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+
+def default_pool() -> HTTPConnectionPool:
+    """Return the process-wide pool shared by notifiers that do not bring one."""
+
+    global _DEFAULT_POOL
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = HTTPConnectionPool()
+        return _DEFAULT_POOL
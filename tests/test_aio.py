@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from urllib import parse
+
+import pytest
+
+from fpl_notifier.aio import AsyncDeadlineNotificationService, AsyncPushoverNotifier, deliver_all
+from fpl_notifier.deadlines import GameweekDeadline
+
+NOW = datetime(2024, 7, 1, 14, 30, tzinfo=timezone.utc)
+GAMEWEEK = GameweekDeadline(event_id=3, name="GW3", deadline=datetime(2024, 7, 1, 16, 0, tzinfo=timezone.utc))
+
+
+class SlowNotifier:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def send(self, gameweek, lead_time):
+        await asyncio.sleep(self.delay)
+        self.sent.append(gameweek.event_id)
+
+
+def test_step_does_not_wait_for_delivery():
+    async def scenario():
+        notifier = SlowNotifier(delay=0.05)
+        service = AsyncDeadlineNotificationService(notifier, fetcher=lambda now=None: [GAMEWEEK])
+
+        sleep = await service.step(now=NOW)
+        assert sleep == pytest.approx(timedelta(hours=6).total_seconds())
+        assert notifier.sent == []
+
+        # A second step while the send is in flight must not start another one.
+        await service.step(now=NOW)
+        await service.drain()
+        assert notifier.sent == [3]
+
+        await service.step(now=NOW + timedelta(minutes=1))
+        await service.drain()
+        assert notifier.sent == [3]
+
+    asyncio.run(scenario())
+
+
+def test_deliver_all_bounds_concurrency_and_reports_timeouts():
+    async def scenario():
+        active = 0
+        peak = 0
+
+        class Counting:
+            async def send(self, gameweek, lead_time):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        notifiers = [Counting() for _ in range(50)] + [SlowNotifier(delay=1.0)]
+        results = await deliver_all(notifiers, GAMEWEEK, timedelta(hours=2), max_concurrency=10, timeout=0.2)
+        assert peak <= 10
+        assert results[:50] == [None] * 50
+        assert isinstance(results[50], asyncio.TimeoutError)
+
+    asyncio.run(scenario())
+
+
+def test_async_pushover_notifier_posts_payload():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received.append(parse.parse_qs(self.rfile.read(length).decode()))
+            body = b'{"status":1}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/1/messages.json"
+        notifier = AsyncPushoverNotifier("token", "user", api_url=url)
+        asyncio.run(notifier.send(GAMEWEEK, timedelta(hours=2)))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert received[0]["token"] == ["token"]
+    assert received[0]["title"] == ["FPL deadline in 2 hours"]
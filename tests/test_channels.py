@@ -0,0 +1,229 @@
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import socketserver
+import threading
+import time
+
+import pytest
+
+from fpl_notifier.channels import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    ChannelRegistry,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeliveryError,
+)
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.scheduler import Subscriber
+
+GAMEWEEK = GameweekDeadline(5, "Gameweek 5", datetime(2024, 9, 14, 10, 0, tzinfo=timezone.utc))
+LEAD = timedelta(hours=2)
+
+
+class _HTTPStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, status=200, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.requests = []
+        super().__init__(("127.0.0.1", 0), _Handler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/topic"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.server.delay)
+        self.server.requests.append((dict(self.headers), body))
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.reply("220 localhost ready")
+        while True:
+            line = self.rfile.readline().decode("ascii").strip()
+            command = line[:4].upper()
+            if command in ("EHLO", "HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                self.server.messages.append(b"".join(data).decode("utf-8"))
+                self.reply("250 queued")
+            else:
+                self.reply("221 bye")
+                return
+
+
+class _SMTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        self.messages = []
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_composite_delivers_to_every_channel_of_a_subscriber(serve):
+    webhook = serve(_HTTPStandIn())
+    ntfy = serve(_HTTPStandIn())
+    smtp = serve(_SMTPStandIn())
+    registry = ChannelRegistry()
+    subscriber = Subscriber(
+        "alice",
+        options={
+            "channels": [
+                {"type": "webhook", "url": webhook.url},
+                {"type": "ntfy", "url": ntfy.url, "tags": ["soccer"]},
+                {"type": "smtp", "to": "alice@example.com", "host": "127.0.0.1", "port": smtp.server_address[1]},
+            ]
+        },
+    )
+
+    registry.notifier_for(subscriber).send(GAMEWEEK, LEAD)
+    registry.close()
+
+    (_, body), = webhook.requests
+    assert json.loads(body)["title"] == "FPL deadline in 2 hours"
+    (headers, body), = ntfy.requests
+    assert headers["Title"] == "FPL deadline in 2 hours"
+    assert headers["Tags"] == "soccer"
+    assert body.decode() == "Gameweek 5 (GW 5) deadline at 2024-09-14 10:00 UTC"
+    (message,) = smtp.messages
+    assert "Subject: FPL deadline in 2 hours" in message
+    assert "To: alice@example.com" in message
+
+
+def test_broken_channel_trips_its_breaker_without_blocking_the_others(serve):
+    healthy = serve(_HTTPStandIn())
+    broken = serve(_HTTPStandIn(status=500))
+    registry = ChannelRegistry()
+    specs = [
+        {"type": "webhook", "name": "healthy", "url": healthy.url},
+        {"type": "webhook", "name": "broken", "url": broken.url, "failure_threshold": 2, "reset_seconds": 3600},
+    ]
+    notifier = registry.notifier([registry.create(spec) for spec in specs])
+
+    for _ in range(4):
+        notifier.send(GAMEWEEK, LEAD)
+    registry.close()
+
+    assert len(healthy.requests) == 4
+    assert len(broken.requests) == 2
+    assert registry.guard("broken").breaker.state == OPEN
+
+
+def test_slow_channel_times_out_while_others_deliver(serve):
+    fast = serve(_HTTPStandIn())
+    slow = serve(_HTTPStandIn(delay=2.0))
+    registry = ChannelRegistry()
+    notifier = registry.notifier(
+        [
+            registry.create({"type": "ntfy", "name": "fast", "url": fast.url}),
+            registry.create({"type": "ntfy", "name": "slow", "url": slow.url, "timeout": 0.2}),
+        ]
+    )
+
+    started = time.monotonic()
+    notifier.send(GAMEWEEK, LEAD)
+    elapsed = time.monotonic() - started
+    registry.close()
+
+    assert elapsed < 1.5
+    assert len(fast.requests) == 1
+
+
+def test_busy_slow_channel_does_not_hold_up_the_others_under_load(serve):
+    fast = serve(_HTTPStandIn())
+    slow = serve(_HTTPStandIn(delay=2.0))
+    registry = ChannelRegistry()
+    notifier = registry.notifier(
+        [
+            registry.create({"type": "ntfy", "name": "slow", "url": slow.url, "timeout": 0.5, "max_concurrency": 2}),
+            registry.create({"type": "ntfy", "name": "fast", "url": fast.url, "max_concurrency": 40}),
+        ]
+    )
+    errors = []
+
+    def send():
+        try:
+            notifier.send(GAMEWEEK, LEAD)
+        except Exception as exc:
+            errors.append(exc)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=send) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    registry.close()
+
+    # Sends finding the slow channel busy skip it at once, rather than
+    # waiting for its slots on threads the fast channel needs.
+    assert errors == []
+    assert len(fast.requests) == 40
+    assert elapsed < 1.2
+
+
+def test_delivery_error_when_every_channel_fails(serve):
+    broken = serve(_HTTPStandIn(status=503))
+    registry = ChannelRegistry()
+    notifier = registry.notifier([registry.create({"type": "webhook", "url": broken.url})])
+
+    with pytest.raises(DeliveryError) as info:
+        notifier.send(GAMEWEEK, LEAD)
+    registry.close()
+
+    assert list(info.value.failures) == ["webhook"]
+
+
+def test_breaker_half_opens_after_reset_timeout():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=timedelta(seconds=30), clock=lambda: now[0])
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 31.0
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
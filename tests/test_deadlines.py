@@ -1,6 +1,19 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import gzip
+import io
+import json
+from urllib import error
 
-from fpl_notifier.deadlines import GameweekDeadline, fetch_gameweek_deadlines, get_next_gameweek_deadline, parse_deadline
+from fpl_notifier.deadlines import (
+    CachedFetch,
+    DeadlineTable,
+    GameweekDeadline,
+    diff_deadlines,
+    fetch_gameweek_deadlines,
+    get_next_gameweek_deadline,
+    parse_deadline,
+)
+from fpl_notifier.streaming import extract_events
 
 
 class DummyFetcher:
@@ -70,3 +83,130 @@ def test_get_next_gameweek_deadline_returns_first_upcoming():
     next_deadline = get_next_gameweek_deadline(fetch_json=fetcher, now=now)
     assert isinstance(next_deadline, GameweekDeadline)
     assert next_deadline.event_id == 1
+
+
+class FakeHeaders(dict):
+    def get(self, key, default=None):
+        for name, value in self.items():
+            if name.lower() == key.lower():
+                return value
+        return default
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+
+class FakeResponse:
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = FakeHeaders(headers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def read(self):
+        return self.body
+
+
+class ConditionalOpener:
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def open(self, request_obj, timeout=0):
+        self.requests.append(request_obj)
+        if request_obj.get_header("If-none-match") == self.etag:
+            raise error.HTTPError(request_obj.full_url, 304, "Not Modified", {}, None)
+        return FakeResponse(gzip.compress(self.body), {"ETag": self.etag, "Content-Encoding": "gzip"})
+
+
+def test_cached_fetch_revalidates_and_reuses_payload(tmp_path):
+    body = json.dumps({"events": [{"id": 3, "name": "Gameweek 3", "deadline_time": "2024-09-01T10:00:00Z"}]})
+    opener = ConditionalOpener(body.encode(), '"v1"')
+    fetcher = CachedFetch(str(tmp_path), opener=opener)
+
+    first = fetcher("https://example.test/bootstrap", 10)
+    second = fetcher("https://example.test/bootstrap", 10)
+    assert first["events"][0]["id"] == 3
+    assert second is first
+    assert opener.requests[0].get_header("Accept-encoding") == "gzip"
+    assert opener.requests[1].get_header("If-none-match") == '"v1"'
+
+    # A fresh instance picks the validators and body up from disk.
+    restarted = CachedFetch(str(tmp_path), opener=opener)
+    assert restarted("https://example.test/bootstrap", 10) == first
+    assert opener.requests[2].get_header("If-none-match") == '"v1"'
+
+
+def test_extract_events_skips_other_keys_across_chunk_boundaries():
+    document = {
+        "chips": [{"name": "wildcard", "note": 'tricky "quoted" ] } \\ text'}],
+        "events": [
+            {"id": 1, "name": "Gameweek 1", "deadline_time": "2024-08-16T17:30:00Z", "chip_plays": [{"n": 1}]},
+            {"id": 2, "name": "Gameweek 2", "deadline_time": "2024-08-24T10:00:00Z", "top_element": None},
+        ],
+        "elements": [{"id": n, "web_name": "Player {n}"} for n in range(500)],
+    }
+    data = json.dumps(document).encode()
+
+    events = extract_events(io.BytesIO(data), chunk_size=7)
+    assert events == [
+        {"id": 1, "name": "Gameweek 1", "deadline_time": "2024-08-16T17:30:00Z"},
+        {"id": 2, "name": "Gameweek 2", "deadline_time": "2024-08-24T10:00:00Z"},
+    ]
+
+
+def test_extract_events_handles_events_as_last_key_and_missing_key():
+    data = json.dumps({"teams": [], "events": [{"id": 9, "deadline_time": "2024-09-01T10:00:00Z"}]})
+    assert extract_events(io.BytesIO(data.encode()), chunk_size=5) == [
+        {"id": 9, "deadline_time": "2024-09-01T10:00:00Z"}
+    ]
+    assert extract_events(io.BytesIO(b'{"teams": [{"events": [1]}]}')) == []
+
+
+def test_diff_deadlines_reports_added_removed_and_changed():
+    now = datetime(2024, 8, 1, tzinfo=timezone.utc)
+    passed = GameweekDeadline(event_id=1, name="GW1", deadline=datetime(2024, 7, 30, tzinfo=timezone.utc))
+    kept = GameweekDeadline(event_id=2, name="GW2", deadline=datetime(2024, 8, 10, tzinfo=timezone.utc))
+    moved = GameweekDeadline(event_id=3, name="GW3", deadline=datetime(2024, 8, 17, tzinfo=timezone.utc))
+    dropped = GameweekDeadline(event_id=4, name="GW4", deadline=datetime(2024, 8, 24, tzinfo=timezone.utc))
+    postponed = GameweekDeadline(event_id=3, name="GW3", deadline=datetime(2024, 8, 18, tzinfo=timezone.utc))
+    added = GameweekDeadline(event_id=5, name="GW5", deadline=datetime(2024, 8, 31, tzinfo=timezone.utc))
+
+    changes = diff_deadlines([passed, kept, moved, dropped], [kept, postponed, added], now=now)
+    assert changes.added == (added,)
+    assert changes.removed == (dropped,)
+    assert changes.changed == ((moved, postponed),)
+    assert not diff_deadlines([kept], [kept], now=now)
+
+
+def test_deadline_table_updates_incrementally_and_bisects():
+    events = [
+        {"id": 2, "name": "Gameweek 2", "deadline_time": "2024-08-24T10:00:00Z"},
+        {"id": 1, "name": "Gameweek 1", "deadline_time": "2024-08-16T17:30:00Z"},
+        {"id": 3, "name": "Gameweek 3", "deadline_time": "2024-08-31T10:00:00Z"},
+        {"id": 4, "name": "Broken", "deadline_time": None},
+    ]
+    table = DeadlineTable(events)
+    first, second, third = table.upcoming(datetime(2024, 8, 1, tzinfo=timezone.utc))
+    assert [gw.event_id for gw in (first, second, third)] == [1, 2, 3]
+
+    assert table.next_after(first.deadline) is second
+    assert table.next_after(third.deadline) is None
+    assert table.window(first.deadline - timedelta(seconds=1), second.deadline) == [first, second]
+
+    moved = [dict(event) for event in events]
+    moved[0]["deadline_time"] = "2024-09-07T10:00:00Z"
+    assert table.update(moved)
+    assert [gw.event_id for gw in table] == [1, 3, 2]
+    assert table.next_after(datetime(2024, 8, 20, tzinfo=timezone.utc)) is third
+    assert not table.update([dict(event) for event in moved])
+
+    # The same list object, mutated in place, is still re-read.
+    moved[1]["deadline_time"] = "2024-09-14T10:00:00Z"
+    assert table.update(moved)
+    assert table.next_after(datetime(2024, 9, 8, tzinfo=timezone.utc)).event_id == 1
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.dispatcher import ShardedDispatcher, shard_for
+from fpl_notifier.scheduler import Subscriber
+
+
+class NullNotifier:
+    def send(self, gameweek, lead_time):
+        pass
+
+
+def null_notifier_factory(subscriber):
+    return NullNotifier()
+
+
+def test_shard_for_is_stable_and_spreads_subscribers():
+    assert shard_for("alice", 4) == shard_for("alice", 4)
+    counts = [0] * 4
+    for n in range(1000):
+        counts[shard_for(f"user-{n}", 4)] += 1
+    assert min(counts) > 200
+
+
+def test_workers_deliver_broadcast_deadlines():
+    subscribers = [Subscriber(f"user-{n}") for n in range(60)]
+    gameweek = GameweekDeadline(
+        event_id=7, name="Gameweek 7", deadline=datetime.now(timezone.utc) + timedelta(hours=1)
+    )
+    fetches = []
+
+    def fetcher(*, now):
+        fetches.append(now)
+        return [gameweek]
+
+    with ShardedDispatcher(
+        subscribers, notifier_factory=null_notifier_factory, shards=3, fetcher=fetcher
+    ) as dispatcher:
+        assert sum(dispatcher.partition_sizes()) == 60
+        dispatcher.refresh()
+        deadline = time.monotonic() + 20
+        while sum(stats.delivered for stats in dispatcher.stats()) < 60 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        stats = dispatcher.stats()
+
+    assert len(fetches) == 1
+    assert [s.shard for s in stats] == [0, 1, 2]
+    assert sum(s.delivered for s in stats) == 60
+    assert all(s.delivered == s.subscribers for s in stats)
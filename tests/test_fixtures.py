@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta, timezone
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.fixtures import (
+    DOUBLE_GAMEWEEK,
+    FIRST_KICKOFF,
+    KICKOFF,
+    FixtureReminders,
+    FixtureSource,
+    parse_fixtures,
+    reminder_id,
+)
+from fpl_notifier.notifier import PushoverNotifier
+from fpl_notifier.refresher import DeadlineRefresher
+from fpl_notifier.service import DeadlineNotificationService
+
+DEADLINE = datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc)
+
+
+def _fixture(fixture_id, event, kickoff, team_h, team_a):
+    return {
+        "id": fixture_id,
+        "event": event,
+        "kickoff_time": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ") if kickoff else None,
+        "team_h": team_h,
+        "team_a": team_a,
+        "finished": False,
+    }
+
+
+class FakeFixturesAPI:
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.urls = []
+        self._payloads = {}
+
+    def __call__(self, url, timeout):
+        self.urls.append(url)
+        event = int(url.rsplit("=", 1)[1])
+        payload = [item for item in self.fixtures if item["event"] == event]
+        # Like CachedFetch, an unchanged response is the same object.
+        if self._payloads.get(event) != payload:
+            self._payloads[event] = payload
+        return self._payloads[event]
+
+
+def _gameweeks(count):
+    return [
+        GameweekDeadline(n, f"Gameweek {n}", DEADLINE + timedelta(days=7 * (n - 1))) for n in range(1, count + 1)
+    ]
+
+
+class FakeNotifier:
+    def send(self, gameweek, lead_time):
+        pass
+
+
+def test_parse_fixtures_orders_by_kickoff_and_skips_unscheduled():
+    payload = [
+        _fixture(2, 1, DEADLINE + timedelta(hours=4), 3, 4),
+        _fixture(1, 1, DEADLINE + timedelta(hours=2), 1, 2),
+        _fixture(3, None, None, 5, 6),
+    ]
+
+    fixtures = parse_fixtures(payload)
+
+    assert [fixture.fixture_id for fixture in fixtures] == [1, 2]
+
+
+def test_source_fetches_upcoming_gameweeks_once_per_refresh_interval():
+    api = FakeFixturesAPI(
+        [_fixture(n, n, DEADLINE + timedelta(days=7 * (n - 1), hours=2), 1, 2) for n in range(1, 6)]
+    )
+    source = FixtureSource(fetch_json=api, gameweeks=2, refresh_interval=timedelta(hours=6))
+    now = DEADLINE - timedelta(days=1)
+
+    source.update(_gameweeks(5), now=now)
+    source.update(_gameweeks(5), now=now + timedelta(hours=1))
+
+    assert [url.rsplit("=", 1)[1] for url in api.urls] == ["1", "2"]
+
+    # After GW1's deadline it is no longer upcoming, but its match is still to come.
+    after_deadline = DEADLINE + timedelta(hours=1)
+    by_event = source.update(_gameweeks(5)[1:], now=after_deadline)
+    assert sorted(by_event) == [1, 2, 3]
+
+    by_event = source.update(_gameweeks(5)[1:], now=DEADLINE + timedelta(days=1))
+    assert sorted(by_event) == [2, 3]
+
+
+def test_cold_start_after_a_deadline_keeps_the_current_gameweeks_kickoffs():
+    api = FakeFixturesAPI(
+        [_fixture(n, n, DEADLINE + timedelta(days=7 * (n - 1), hours=2), 1, 2) for n in range(1, 4)]
+    )
+    reminders = FixtureReminders(first_kickoff=True, source=FixtureSource(fetch_json=api, gameweeks=2))
+    now = DEADLINE + timedelta(minutes=10)
+
+    targets = reminders.targets(_gameweeks(3)[1:], now=now)
+
+    assert [target.gameweek for target in targets] == [1, 2, 3]
+    # Once its matches have all kicked off, the current gameweek is not fetched again.
+    later = DEADLINE + timedelta(days=1)
+    assert [target.gameweek for target in reminders.targets(_gameweeks(3)[1:], now=later)] == [2, 3]
+    api.urls.clear()
+    reminders.targets(_gameweeks(3)[1:], now=later + timedelta(days=1))
+    assert sorted(url.rsplit("=", 1)[1] for url in api.urls) == ["2", "3"]
+
+
+def test_targets_cover_first_kickoff_team_matches_and_doubles():
+    api = FakeFixturesAPI(
+        [
+            _fixture(10, 1, DEADLINE + timedelta(hours=2), 1, 2),
+            _fixture(11, 1, DEADLINE + timedelta(hours=5), 3, 4),
+            _fixture(12, 1, DEADLINE + timedelta(days=3), 1, 3),
+        ]
+    )
+    reminders = FixtureReminders(
+        first_kickoff=True,
+        teams=[4],
+        double_gameweeks=True,
+        team_names={1: "Arsenal", 2: "Chelsea", 3: "Spurs", 4: "Wolves"},
+        source=FixtureSource(fetch_json=api),
+    )
+
+    targets = reminders.targets(_gameweeks(1), now=DEADLINE - timedelta(days=1))
+
+    assert [(target.kind, target.event_id) for target in targets] == [
+        (DOUBLE_GAMEWEEK, reminder_id(DOUBLE_GAMEWEEK, 1)),
+        (FIRST_KICKOFF, reminder_id(FIRST_KICKOFF, 1)),
+        (KICKOFF, reminder_id(KICKOFF, 11)),
+    ]
+    assert targets[0].name == "Gameweek 1 doubles: Arsenal, Spurs"
+    assert targets[1].name == "Arsenal v Chelsea"
+
+
+def test_service_sends_kickoff_reminders_and_rearms_moved_kickoffs():
+    fixtures = [_fixture(10, 1, DEADLINE + timedelta(hours=2), 1, 2)]
+    api = FakeFixturesAPI(fixtures)
+    sent = []
+
+    class Notifier:
+        def send(self, gameweek, lead_time):
+            sent.append((gameweek.kind if hasattr(gameweek, "kind") else "deadline", gameweek.deadline))
+
+    service = DeadlineNotificationService(
+        Notifier(),
+        lead_time=timedelta(hours=2),
+        fetcher=lambda now=None: [gw for gw in _gameweeks(2) if gw.deadline > now],
+        fixtures=FixtureReminders(
+            first_kickoff=True,
+            lead_times=timedelta(minutes=30),
+            source=FixtureSource(fetch_json=api, refresh_interval=timedelta(minutes=1)),
+        ),
+    )
+
+    service.step(now=DEADLINE - timedelta(hours=2))
+    service.step(now=DEADLINE + timedelta(minutes=90))
+    assert sent == [("deadline", DEADLINE), (FIRST_KICKOFF, DEADLINE + timedelta(hours=2))]
+
+    # Kickoff pushed back an hour: the reminder is due again for the new time.
+    fixtures[0] = _fixture(10, 1, DEADLINE + timedelta(hours=3), 1, 2)
+    service.step(now=DEADLINE + timedelta(minutes=100))
+    service.step(now=DEADLINE + timedelta(minutes=150))
+    assert sent[-1] == (FIRST_KICKOFF, DEADLINE + timedelta(hours=3))
+    assert len(sent) == 3
+
+
+def test_with_a_refresher_fixtures_are_fetched_by_it_not_by_the_step():
+    api = FakeFixturesAPI([_fixture(10, 1, DEADLINE + timedelta(hours=2), 1, 2)])
+    now = DEADLINE - timedelta(hours=3)
+    refresher = DeadlineRefresher(fetcher=lambda now=None: _gameweeks(2), hedge_percentile=None)
+    service = DeadlineNotificationService(
+        FakeNotifier(),
+        fixtures=FixtureReminders(first_kickoff=True, source=FixtureSource(fetch_json=api)),
+        refresher=refresher,
+    )
+    woken = []
+    refresher.subscribe(lambda: woken.append(True))
+
+    service.step(now=now)
+    assert api.urls == []
+
+    refresher.refresh(now=now)
+    assert [url.rsplit("=", 1)[1] for url in api.urls] == ["1", "2"]
+    assert woken == [True]
+    service.step(now=now)
+    assert [target.kind for target in service._targets] == [FIRST_KICKOFF]
+    assert len(api.urls) == 2
+    refresher.stop()
+
+
+def test_kickoff_notification_text():
+    api = FakeFixturesAPI([_fixture(10, 1, DEADLINE + timedelta(hours=2), 1, 2)])
+    reminders = FixtureReminders(
+        teams=[1], team_names={1: "Arsenal", 2: "Chelsea"}, source=FixtureSource(fetch_json=api)
+    )
+    (target,) = reminders.targets(_gameweeks(1), now=DEADLINE)
+    notifier = PushoverNotifier("token", "user")
+
+    payload = notifier._build_payload(target, timedelta(minutes=30))
+
+    assert payload["title"] == "Kickoff in 30 minutes"
+    assert payload["message"] == "Arsenal v Chelsea (GW 1) kicks off at 2024-08-16 19:30 UTC"
@@ -0,0 +1,222 @@
+from datetime import datetime, timedelta, timezone
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.lease import SQLiteLease
+from fpl_notifier.refresher import DeadlineRefresher
+from fpl_notifier.service import DeadlineNotificationService
+from fpl_notifier.simulation import SimulationFinished, VirtualClock
+from fpl_notifier.store import SQLiteStateStore
+
+TTL = timedelta(seconds=10)
+
+REPLICA = """
+import sys, time
+from datetime import timedelta
+from fpl_notifier.lease import SQLiteLease
+
+path, holder, log = sys.argv[1:]
+lease = SQLiteLease(path, holder=holder, ttl=timedelta(seconds=0.6), renew_interval=timedelta(seconds=0.1))
+with open(log, "a") as handle:
+    while True:
+        if lease.acquire():
+            handle.write(f"{holder} {lease.token} {time.time()}\\n")
+            handle.flush()
+        time.sleep(lease.renew_interval.total_seconds())
+"""
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_only_one_replica_holds_the_lease_until_it_expires(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "lease.sqlite3")
+    first = SQLiteLease(path, holder="a", ttl=TTL, clock=clock)
+    second = SQLiteLease(path, holder="b", ttl=TTL, clock=clock)
+
+    assert first.acquire()
+    assert not second.acquire()
+    clock.now += 5
+    assert first.acquire()  # renewed
+    clock.now += 9
+    assert not second.acquire()
+
+    clock.now += 2
+    assert second.acquire()
+    assert (first.token, second.token) == (1, 2)
+    assert second.last_failover == 11
+    assert not first.acquire()
+    assert not first.held
+
+
+def test_leader_keeps_the_lease_while_the_database_is_busy_until_it_expires(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "lease.sqlite3")
+    # The busy timeout is the ttl in real seconds; keep it short.
+    lease = SQLiteLease(path, holder="a", ttl=timedelta(seconds=0.3), clock=clock)
+    assert lease.acquire()
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    clock.now += 0.1
+    assert lease.acquire()
+    assert lease.token == 1
+    clock.now += 0.3
+    assert not lease.acquire()
+
+    blocker.execute("ROLLBACK")
+    blocker.close()
+    assert lease.acquire()
+    assert lease.token == 1
+
+
+def test_released_lease_is_taken_over_immediately(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "lease.sqlite3")
+    first = SQLiteLease(path, holder="a", ttl=TTL, clock=clock)
+    second = SQLiteLease(path, holder="b", ttl=TTL, clock=clock)
+    first.acquire()
+
+    first.close()
+
+    assert second.acquire()
+    assert second.token == 2
+
+
+def test_standby_replica_neither_fetches_nor_sends(tmp_path):
+    path = str(tmp_path / "lease.sqlite3")
+    SQLiteLease(path, holder="leader", ttl=TTL).acquire()
+    lease = SQLiteLease(path, holder="standby", ttl=TTL)
+    start = datetime.now(timezone.utc)
+    gameweek = GameweekDeadline(1, "Gameweek 1", start + timedelta(minutes=30))
+    clock = VirtualClock(start, start + 3 * lease.renew_interval)
+    fetched = []
+    sleeps = []
+
+    class Notifier:
+        def send(self, gameweek, lead_time):
+            raise AssertionError("a standby must not send")
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.sleep(seconds)
+
+    def fetcher(now=None):
+        fetched.append(now)
+        return [gameweek]
+
+    service = DeadlineNotificationService(
+        Notifier(),
+        fetcher=fetcher,
+        sleep_func=sleep,
+        store=SQLiteStateStore(str(tmp_path / "state.sqlite3")),
+        refresher=DeadlineRefresher(fetcher=fetcher, hedge_percentile=None),
+        lease=lease,
+    )
+    service._get_now = clock.now
+    with pytest.raises(SimulationFinished):
+        service.run()
+
+    assert fetched == []
+    assert sleeps == [lease.renew_interval.total_seconds()] * 3
+
+
+def test_leader_renews_on_its_own_timer_and_fetches_only_when_due(tmp_path):
+    lease = SQLiteLease(str(tmp_path / "lease.sqlite3"), holder="leader", ttl=TTL)
+    renewals = []
+    acquire = lease.acquire
+    lease.acquire = lambda: renewals.append(True) or acquire()
+    start = datetime.now(timezone.utc)
+    gameweek = GameweekDeadline(1, "Gameweek 1", start + timedelta(days=2))
+    clock = VirtualClock(start, start + 18 * lease.renew_interval)
+    fetched = []
+
+    class Notifier:
+        def send(self, gameweek, lead_time):
+            pass
+
+    service = DeadlineNotificationService(
+        Notifier(),
+        fetcher=lambda now=None: fetched.append(now) or [gameweek],
+        poll_interval=timedelta(hours=6),
+        sleep_func=clock.sleep,
+        store=SQLiteStateStore(str(tmp_path / "state.sqlite3")),
+        lease=lease,
+    )
+    service._get_now = clock.now
+    with pytest.raises(SimulationFinished):
+        service.run()
+
+    assert fetched == [start]
+    assert len(renewals) == 18
+
+
+def test_leader_does_not_send_once_its_lease_was_taken_over(tmp_path):
+    path = str(tmp_path / "lease.sqlite3")
+    lease = SQLiteLease(path, holder="old", ttl=TTL)
+    assert lease.acquire()
+    # A replica whose clock is past the old leader's expiry takes over.
+    SQLiteLease(path, holder="new", ttl=TTL, clock=lambda: time.time() + 60).acquire()
+    now = datetime.now(timezone.utc)
+    gameweek = GameweekDeadline(1, "Gameweek 1", now + timedelta(hours=1))
+    sent = []
+
+    class Notifier:
+        def send(self, gameweek, lead_time):
+            sent.append(gameweek)
+
+    store = SQLiteStateStore(str(tmp_path / "state.sqlite3"))
+    service = DeadlineNotificationService(Notifier(), fetcher=lambda now=None: [gameweek], store=store, lease=lease)
+    service.step(now=now)
+
+    assert lease.held and not lease.verify()
+    assert sent == []
+    assert not store.is_sent(1, 7200)
+
+
+def test_replica_processes_fail_over_after_the_leader_is_killed(tmp_path):
+    path = str(tmp_path / "lease.sqlite3")
+    log = tmp_path / "leaders.log"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    replicas = {
+        name: subprocess.Popen([sys.executable, "-c", REPLICA, path, name, str(log)], env=env)
+        for name in ("r1", "r2", "r3")
+    }
+    try:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not (log.exists() and log.read_text().count("\n") >= 5):
+            time.sleep(0.05)
+        leader = log.read_text().split()[0]
+        replicas.pop(leader).kill()
+        killed_at = time.time()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and log.read_text().split()[-3] == leader:
+            time.sleep(0.05)
+    finally:
+        for process in replicas.values():
+            process.kill()
+            process.wait()
+
+    entries = [line.split() for line in log.read_text().splitlines()]
+    holders = [holder for holder, _, _ in entries]
+    # One leader, then exactly one successor with a higher fencing token.
+    successors = [holder for holder in dict.fromkeys(holders) if holder != leader]
+    assert holders[0] == leader and len(successors) == 1
+    assert holders == [leader] * holders.index(successors[0]) + [successors[0]] * (
+        len(holders) - holders.index(successors[0])
+    )
+    first_takeover = next(entry for entry in entries if entry[0] == successors[0])
+    assert int(first_takeover[1]) == int(entries[0][1]) + 1
+    assert float(first_takeover[2]) - killed_at < 2.0
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import os
+import pickle
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from fpl_notifier import __main__ as cli
+from fpl_notifier import deadlines, dispatcher, notifier
+from fpl_notifier.deadlines import GameweekDeadline
+
+
+def test_cli_import_does_not_load_heavy_modules():
+    code = (
+        "import sys, fpl_notifier.__main__\n"
+        "heavy = {'asyncio', 'http.server', 'ssl', 'sqlite3', 'concurrent.futures', 'urllib.request'}\n"
+        "print(sorted(heavy & set(sys.modules)))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_once_sends_due_reminder_and_writes_wakeup(monkeypatch, tmp_path, capsys):
+    gameweek = GameweekDeadline(1, "Gameweek 1", datetime.now(timezone.utc) + timedelta(hours=1))
+    sent = []
+    monkeypatch.setenv("PUSHOVER_TOKEN", "token")
+    monkeypatch.setenv("PUSHOVER_USER_KEY", "user")
+    monkeypatch.setattr(deadlines, "fetch_gameweek_deadlines", lambda **kwargs: [gameweek])
+    monkeypatch.setattr(notifier.PushoverNotifier, "_post", lambda self, payload: sent.append(payload))
+    wakeup = tmp_path / "next-wakeup"
+    state = str(tmp_path / "state.sqlite3")
+
+    for _ in range(2):
+        cli.main(["--once", "--state", state, "--next-wakeup-file", str(wakeup)])
+
+    assert len(sent) == 1
+    printed = capsys.readouterr().out.split()
+    assert printed[-1] == wakeup.read_text().strip()
+    assert datetime.fromisoformat(printed[-1]) > datetime.now(timezone.utc)
+
+
+def test_once_notifies_channels_from_file_without_pushover(monkeypatch, tmp_path):
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    gameweek = GameweekDeadline(1, "Gameweek 1", datetime.now(timezone.utc) + timedelta(hours=1))
+    monkeypatch.delenv("PUSHOVER_TOKEN", raising=False)
+    monkeypatch.delenv("PUSHOVER_USER_KEY", raising=False)
+    monkeypatch.setattr(deadlines, "fetch_gameweek_deadlines", lambda **kwargs: [gameweek])
+    channels = tmp_path / "channels.json"
+    channels.write_text(json.dumps([{"type": "webhook", "url": f"http://127.0.0.1:{server.server_address[1]}/"}]))
+
+    try:
+        cli.main(["--once", "--channels", str(channels)])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [payload["event_id"] for payload in received] == [1]
+
+
+def test_subscribers_rejects_options_it_does_not_support(tmp_path):
+    subscribers = tmp_path / "subscribers.jsonl"
+    subscribers.write_text('{"id": "alice", "user_key": "u123"}\n')
+
+    with pytest.raises(SystemExit) as info:
+        cli.main(["--subscribers", str(subscribers), "--once", "--state", str(tmp_path / "state.sqlite3")])
+
+    assert str(info.value) == "--subscribers cannot be combined with --once, --state"
+
+
+def test_shards_run_subscribers_through_the_sharded_dispatcher(monkeypatch, tmp_path):
+    subscribers = tmp_path / "subscribers.jsonl"
+    subscribers.write_text("".join(f'{{"id": "user-{n}", "user_key": "u{n}"}}\n' for n in range(20)))
+    monkeypatch.setenv("PUSHOVER_TOKEN", "token")
+    started = []
+    monkeypatch.setattr(dispatcher.ShardedDispatcher, "run", lambda self: started.append(self))
+
+    cli.main(["--subscribers", str(subscribers), "--shards", "3", "--title-template", "GW {gameweek} in {lead}"])
+
+    (sharded,) = started
+    assert sharded.shards == 3
+    assert sum(sharded.partition_sizes()) == 20
+    # Workers started with "spawn" receive the factory pickled.
+    assert pickle.loads(pickle.dumps(sharded.notifier_factory)).renderer is not None
+    with pytest.raises(SystemExit, match="--shards needs --subscribers"):
+        cli.main(["--shards", "3"])
+
+
+def test_once_with_profile_writes_spans_and_a_capture(monkeypatch, tmp_path):
+    gameweek = GameweekDeadline(1, "Gameweek 1", datetime.now(timezone.utc) + timedelta(hours=1))
+    monkeypatch.setenv("PUSHOVER_TOKEN", "token")
+    monkeypatch.setenv("PUSHOVER_USER_KEY", "user")
+    monkeypatch.setattr(deadlines, "fetch_gameweek_deadlines", lambda **kwargs: [gameweek])
+    monkeypatch.setattr(notifier.PushoverNotifier, "_post", lambda self, payload: None)
+    profile = tmp_path / "profile"
+
+    cli.main(["--once", "--profile", str(profile), "--profile-threshold-ms", "0"])
+
+    spans = json.loads((profile / "spans.json").read_text())["spans"]
+    assert {name: span["count"] for name, span in spans.items()} == {"fetch": 1, "send": 1, "step": 1}
+    assert len(list(profile.glob("profile-*.pstats"))) == 1
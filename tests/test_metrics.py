@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+import urllib.request
+
+import pytest
+
+from fpl_notifier import metrics
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.service import DeadlineNotificationService
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.enable()
+    yield
+    metrics.disable()
+
+
+def test_recording_is_a_no_op_until_enabled():
+    registry = metrics.Registry()
+    counter = metrics.Counter("demo_total", "Demo.", registry=registry)
+    histogram = metrics.Histogram("demo_seconds", "Demo.", buckets=(0.1, 1.0), registry=registry)
+
+    counter.inc()
+    histogram.observe(0.5)
+    assert counter.value == 0
+    assert histogram.count == 0
+
+    registry.enabled = True
+    counter.inc(2)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    text = registry.render()
+
+    assert "# TYPE demo_total counter\ndemo_total 2\n" in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text
+
+
+def test_labelled_metrics_render_one_series_per_label():
+    registry = metrics.Registry()
+    registry.enabled = True
+    failures = metrics.Counter("sends_failed_total", "Demo.", ("notifier",), registry=registry)
+    failures.labels("Pushover").inc()
+    failures.labels("Webhook").inc(3)
+
+    text = registry.render()
+    assert 'sends_failed_total{notifier="Pushover"} 1' in text
+    assert 'sends_failed_total{notifier="Webhook"} 3' in text
+    with pytest.raises(ValueError):
+        failures.labels()
+
+
+def test_service_step_is_instrumented_and_exposed(enabled_metrics):
+    now = datetime(2024, 9, 1, 12, 0, tzinfo=timezone.utc)
+    gameweek = GameweekDeadline(event_id=3, name="Gameweek 3", deadline=now + timedelta(hours=1))
+
+    class RecordingNotifier:
+        def send(self, gameweek, lead_time):
+            pass
+
+    steps_before = metrics.STEP_SECONDS.count
+    sends = metrics.SEND_SECONDS.labels("RecordingNotifier")
+    sends_before = sends.count
+    service = DeadlineNotificationService(
+        RecordingNotifier(), fetcher=lambda *, now: [gameweek], sleep_func=lambda _: None
+    )
+    metrics.SENT_ENTRIES.set_function(service.store.sent_count)
+    service.step(now=now)
+
+    assert metrics.STEP_SECONDS.count == steps_before + 1
+    assert sends.count == sends_before + 1
+
+    server = metrics.start_http_server(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "fpl_sent_entries 1" in body
+    assert 'fpl_notification_send_seconds_count{notifier="RecordingNotifier"}' in body
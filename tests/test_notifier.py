@@ -1,13 +1,25 @@
 from datetime import datetime, timedelta, timezone
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import resource
+import socket
+import threading
+import time
+from urllib import error, parse
+
+import pytest
 
 from fpl_notifier.deadlines import GameweekDeadline
-from fpl_notifier.notifier import PushoverNotifier, _format_timedelta
+from fpl_notifier.notifier import PushoverNotifier, RateLimitedError
+from fpl_notifier.rendering import format_timedelta
+from fpl_notifier.transport import HTTPConnectionPool, _is_dropped
 
 
 def test_format_timedelta_human_readable():
-    assert _format_timedelta(timedelta(seconds=45)) == "45 seconds"
-    assert _format_timedelta(timedelta(minutes=1, seconds=30)) == "1 minute and 30 seconds"
-    assert _format_timedelta(timedelta(hours=2, minutes=15)) == "2 hours and 15 minutes"
+    assert format_timedelta(timedelta(seconds=45)) == "45 seconds"
+    assert format_timedelta(timedelta(minutes=1, seconds=30)) == "1 minute and 30 seconds"
+    assert format_timedelta(timedelta(hours=2, minutes=15)) == "2 hours and 15 minutes"
 
 
 class DummyResponse:
@@ -55,3 +67,166 @@ def test_pushover_notifier_builds_payload_and_posts():
     assert "user=user" in sent_payload
     assert "Gameweek+5" in sent_payload
     assert "FPL+deadline+in+2+hours" in sent_payload
+
+
+@pytest.fixture
+def pushover_server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        received = []
+        paths = []
+        status = 200
+        extra_headers = {}
+
+        def do_POST(self):
+            self.paths.append(self.path)
+            length = int(self.headers["Content-Length"])
+            self.received.append(parse.parse_qs(self.rfile.read(length).decode()))
+            body = b'{"status":1}'
+            self.send_response(self.status)
+            for name, value in self.extra_headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield Handler, f"http://127.0.0.1:{server.server_address[1]}/1/messages.json"
+    server.shutdown()
+    server.server_close()
+
+
+GAMEWEEK = GameweekDeadline(
+    event_id=7,
+    name="Gameweek 7",
+    deadline=datetime(2024, 9, 28, 10, 0, tzinfo=timezone.utc),
+)
+
+
+def test_pooled_transport_reuses_connection_for_send_many(pushover_server):
+    handler, url = pushover_server
+    pool = HTTPConnectionPool()
+    notifier = PushoverNotifier("token", "owner", transport=pool, api_url=url, device="phone")
+
+    notifier.send(GAMEWEEK, timedelta(hours=1))
+    results = notifier.send_many(
+        GAMEWEEK,
+        timedelta(hours=1),
+        [f"user{n}" for n in range(19)] + [{"user": "tablet-user", "device": "tablet"}],
+        max_workers=4,
+    )
+
+    assert results == [None] * 20
+    assert len(handler.received) == 21
+    assert {r["user"][0] for r in handler.received[1:]} >= {"user0", "user18", "tablet-user"}
+    assert [r["device"][0] for r in handler.received if r["user"] == ["tablet-user"]] == ["tablet"]
+    assert pool.connections_opened <= 4
+
+
+def test_rate_limit_headers_stop_further_sends(pushover_server):
+    handler, url = pushover_server
+    handler.status = 429
+    handler.extra_headers = {
+        "X-Limit-App-Remaining": "0",
+        "X-Limit-App-Reset": str(int(time.time()) + 3600),
+    }
+    notifier = PushoverNotifier("token", "owner", transport=HTTPConnectionPool(), api_url=url)
+
+    with pytest.raises(error.HTTPError):
+        notifier.send(GAMEWEEK, timedelta(hours=1))
+    results = notifier.send_many(GAMEWEEK, timedelta(hours=1), ["a", "b"])
+
+    assert all(isinstance(result, RateLimitedError) for result in results)
+    assert len(handler.received) == 1
+
+
+@pytest.fixture
+def flaky_server():
+    """Answers the first request on each connection, then drops the second unanswered."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        received = []
+
+        def setup(self):
+            super().setup()
+            self.handled = 0
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            self.received.append(self.command)
+            self.handled += 1
+            if self.handled == 2:
+                self.close_connection = True
+                return
+            body = b'{"status":1}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _handle
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield Handler, f"http://127.0.0.1:{server.server_address[1]}/1/messages.json"
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_does_not_resend_a_post_the_server_may_have_processed(flaky_server):
+    handler, url = flaky_server
+    pool = HTTPConnectionPool()
+
+    pool.request("POST", url, body=b"a=1")
+    with pytest.raises(error.URLError):
+        pool.request("POST", url, body=b"a=2")
+    assert handler.received == ["POST", "POST"]
+
+    pool.request("GET", url)
+    assert pool.request("GET", url).status == 200
+    assert handler.received[2:] == ["GET", "GET", "GET"]
+
+
+def test_pool_sends_through_the_environment_proxy(pushover_server, monkeypatch):
+    handler, url = pushover_server
+    proxy = url.rsplit("/1/", 1)[0]
+    monkeypatch.setenv("HTTP_PROXY", proxy)
+    monkeypatch.setenv("NO_PROXY", "direct.example")
+    notifier = PushoverNotifier(
+        "token", "owner", transport=HTTPConnectionPool(), api_url="http://api.pushover.example/1/messages.json"
+    )
+
+    notifier.send(GAMEWEEK, timedelta(hours=1))
+
+    assert handler.paths == ["http://api.pushover.example/1/messages.json"]
+    with pytest.raises(error.URLError):
+        HTTPConnectionPool().request("POST", "http://direct.example/1/messages.json", body=b"a=1", timeout=1)
+    assert len(handler.paths) == 1
+
+
+def test_idle_connection_check_handles_high_descriptors():
+    if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= 1100:
+        pytest.skip("needs more than 1100 file descriptors")
+    left, right = socket.socketpair()
+    high = socket.socket(fileno=os.dup2(left.fileno(), 1100))
+    conn = http.client.HTTPConnection("127.0.0.1")
+    conn.sock = high
+    try:
+        assert not _is_dropped(conn)
+        right.close()
+        assert _is_dropped(conn)
+    finally:
+        high.close()
+        left.close()
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+import pytest
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.outbox import EXPIRED, SENT, Outbox
+from fpl_notifier.service import DeadlineNotificationService
+from fpl_notifier.simulation import SimulationFinished, VirtualClock
+
+NOW = datetime(2024, 9, 1, 12, 0, tzinfo=timezone.utc)
+GAMEWEEK = GameweekDeadline(event_id=3, name="Gameweek 3", deadline=NOW + timedelta(minutes=2))
+LEAD = timedelta(hours=2)
+
+
+@pytest.fixture(params=["memory", "file"])
+def outbox(request, tmp_path):
+    path = ":memory:" if request.param == "memory" else str(tmp_path / "outbox.db")
+    box = Outbox(path, backoff_base=timedelta(seconds=10), backoff_max=timedelta(seconds=40))
+    yield box
+    box.close()
+
+
+def test_enqueue_dedupes_unless_the_deadline_moved(outbox):
+    assert outbox.enqueue("alice", GAMEWEEK, LEAD, now=NOW)
+    assert not outbox.enqueue("alice", GAMEWEEK, LEAD, now=NOW)
+    assert outbox.enqueue("bob", GAMEWEEK, LEAD, now=NOW)
+    assert outbox.drain(lambda entry: None, now=NOW) == 2
+    assert not outbox.enqueue("alice", GAMEWEEK, LEAD, now=NOW)
+
+    moved = GameweekDeadline(event_id=3, name="Gameweek 3", deadline=GAMEWEEK.deadline + timedelta(days=1))
+    assert outbox.enqueue("alice", moved, LEAD, now=NOW)
+    assert [entry.subscriber_id for entry in outbox.due(NOW)] == ["alice"]
+
+
+def test_failed_sends_back_off_until_the_deadline(outbox):
+    outbox.enqueue("alice", GAMEWEEK, LEAD, now=NOW)
+    attempts = []
+
+    def failing(entry):
+        attempts.append(entry.attempts)
+        raise OSError("unreachable")
+
+    now = NOW
+    while outbox.next_attempt_at() is not None:
+        now = max(now, outbox.next_attempt_at())
+        outbox.drain(failing, now=now)
+
+    # Retries 10s, 20s, 40s, 40s after each failure; the next would pass the deadline.
+    assert attempts == [0, 1, 2, 3, 4]
+    (entry,) = outbox.entries()
+    assert entry.status == EXPIRED
+    assert "unreachable" in entry.last_error
+    assert outbox.stats().retries == 4
+
+
+def test_service_retries_failed_send_from_outbox():
+    class FlakyNotifier:
+        def __init__(self):
+            self.calls = 0
+
+        def send(self, gameweek, lead_time):
+            self.calls += 1
+            if self.calls == 1:
+                raise OSError("temporary")
+
+    notifier = FlakyNotifier()
+    outbox = Outbox(backoff_base=timedelta(seconds=5))
+    service = DeadlineNotificationService(
+        notifier, fetcher=lambda now=None: [GAMEWEEK], outbox=outbox, poll_interval=timedelta(hours=6)
+    )
+
+    sleep = service.step(now=NOW)
+    assert notifier.calls == 1
+    assert sleep == pytest.approx(5)
+
+    service.step(now=NOW + timedelta(seconds=5))
+    assert notifier.calls == 2
+    (entry,) = outbox.entries(SENT)
+    assert entry.attempts == 2
+    stats = outbox.stats()
+    assert (stats.sent, stats.retries) == (1, 1)
+    assert stats.latency_max == pytest.approx((entry.sent_at - entry.scheduled_at).total_seconds())
+
+
+def test_retry_wakeups_drain_the_outbox_without_fetching():
+    class DownNotifier:
+        def __init__(self):
+            self.calls = 0
+
+        def send(self, gameweek, lead_time):
+            self.calls += 1
+            raise OSError("down")
+
+    gameweek = GameweekDeadline(event_id=3, name="Gameweek 3", deadline=NOW + timedelta(hours=1))
+    fetches = []
+    clock = VirtualClock(NOW, NOW + timedelta(minutes=30))
+    notifier = DownNotifier()
+    service = DeadlineNotificationService(
+        notifier,
+        fetcher=lambda now=None: fetches.append(now) or [gameweek],
+        outbox=Outbox(backoff_base=timedelta(seconds=5), backoff_max=timedelta(minutes=1)),
+        poll_interval=timedelta(hours=6),
+        sleep_func=clock.sleep,
+    )
+    service._get_now = clock.now
+
+    with pytest.raises(SimulationFinished):
+        service.run()
+
+    assert notifier.calls > 10
+    assert fetches == [NOW]
+
+
+def test_sent_latency_includes_the_send(outbox):
+    outbox.enqueue("alice", GAMEWEEK, LEAD, now=NOW)
+
+    outbox.drain(lambda entry: time.sleep(0.05), now=NOW)
+
+    (entry,) = outbox.entries(SENT)
+    assert entry.latency >= timedelta(seconds=0.05)
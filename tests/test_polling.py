@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+import random
+
+import pytest
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.polling import AdaptivePollPolicy, FixedPollPolicy
+from fpl_notifier.service import DeadlineNotificationService
+
+NOW = datetime(2024, 8, 1, tzinfo=timezone.utc)
+
+
+def test_adaptive_policy_tightens_as_deadline_approaches():
+    policy = AdaptivePollPolicy(min_interval=timedelta(minutes=15), max_interval=timedelta(hours=24))
+
+    def poll(until_deadline):
+        return policy.next_poll(now=NOW, next_deadline=NOW + until_deadline, failures=0)
+
+    assert poll(timedelta(days=7)) == timedelta(hours=24)
+    assert poll(timedelta(hours=8)) == timedelta(hours=2)
+    assert poll(timedelta(minutes=20)) == timedelta(minutes=15)
+    assert policy.next_poll(now=NOW, next_deadline=None, failures=0) == timedelta(hours=24)
+
+
+def test_adaptive_policy_backs_off_with_jitter():
+    policy = AdaptivePollPolicy(
+        backoff_base=timedelta(seconds=30), backoff_max=timedelta(minutes=10), rng=random.Random(1)
+    )
+    deadline = NOW + timedelta(days=3)
+
+    delays = [policy.next_poll(now=NOW, next_deadline=deadline, failures=n) for n in range(1, 10)]
+    for failures, delay in enumerate(delays, start=1):
+        expected = min(timedelta(seconds=30) * 2 ** (failures - 1), timedelta(minutes=10))
+        assert expected / 2 <= delay <= expected
+
+
+def test_service_uses_policy_and_backs_off_after_failures():
+    deadline = GameweekDeadline(event_id=1, name="GW1", deadline=NOW + timedelta(days=4))
+    responses = [RuntimeError("down"), RuntimeError("still down"), [deadline]]
+
+    def fetcher(now=None):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    class Policy(FixedPollPolicy):
+        def next_poll(self, *, now, next_deadline, failures):
+            return timedelta(minutes=1 + 10 * failures)
+
+    class Notifier:
+        def send(self, gameweek, lead_time):
+            raise AssertionError("nothing is due")
+
+    service = DeadlineNotificationService(Notifier(), fetcher=fetcher, poll_policy=Policy(timedelta(hours=1)))
+    assert service.step(now=NOW) == pytest.approx(11 * 60)
+    assert service.step(now=NOW) == pytest.approx(21 * 60)
+    assert service.step(now=NOW) == pytest.approx(60)
@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+import json
+import pstats
+import time
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.profiling import Profiler
+from fpl_notifier.scheduler import Subscriber, SubscriberScheduler
+from fpl_notifier.service import DeadlineNotificationService
+
+NOW = datetime(2024, 8, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, gameweek, lead_time):
+        self.sent.append(gameweek.event_id)
+
+
+def slow_step(now=None):
+    time.sleep(0.005)
+    return 1.0
+
+
+def test_instrumented_service_records_step_fetch_and_send_spans(tmp_path):
+    notifier = FakeNotifier()
+    gameweek = GameweekDeadline(1, "Gameweek 1", NOW + timedelta(hours=1))
+    service = DeadlineNotificationService(notifier, fetcher=lambda now=None: [gameweek])
+    profiler = Profiler(str(tmp_path), threshold=timedelta(seconds=10))
+
+    profiler.instrument(service)
+    service.step(now=NOW)
+    service.step(now=NOW + timedelta(minutes=1))
+    profiler.close()
+
+    assert notifier.sent == [1]
+    spans = json.loads((tmp_path / "spans.json").read_text())["spans"]
+    assert {name: span["count"] for name, span in spans.items()} == {"fetch": 2, "send": 1, "step": 2}
+    assert list(tmp_path.glob("profile-*")) == []
+
+
+def test_instrumented_scheduler_times_sends_of_factory_notifiers(tmp_path):
+    notifier = FakeNotifier()
+    gameweek = GameweekDeadline(1, "Gameweek 1", NOW + timedelta(hours=1))
+    scheduler = SubscriberScheduler(
+        [Subscriber("alice", lead_times=(timedelta(hours=2),)), Subscriber("bob", lead_times=(timedelta(hours=2),))],
+        notifier_factory=lambda subscriber: notifier,
+        fetcher=lambda now=None: [gameweek],
+    )
+    profiler = Profiler(str(tmp_path), threshold=timedelta(seconds=10))
+
+    profiler.instrument(scheduler)
+    scheduler.step(now=NOW)
+
+    assert notifier.sent == [1, 1]
+    # The shared notifier is wrapped once, so each send is counted once.
+    assert profiler.spans()["send"]["count"] == 2
+
+
+def test_slow_step_triggers_one_capture_per_interval(tmp_path):
+    profiler = Profiler(str(tmp_path), threshold=timedelta(milliseconds=1), interval=timedelta(minutes=5))
+    step = profiler.wrap_step(slow_step)
+
+    for _ in range(4):
+        assert step() == 1.0
+
+    (profile,) = tmp_path.glob("profile-*.pstats")
+    (allocations,) = tmp_path.glob("alloc-*.txt")
+    assert "slow_step" in str(pstats.Stats(str(profile)).stats)
+    assert allocations.read_text().startswith("# step took")
+    assert profiler.captures == 1
+
+
+def test_captures_are_capped_by_count(tmp_path):
+    profiler = Profiler(str(tmp_path), threshold=timedelta(0), interval=timedelta(0), max_files=4)
+    step = profiler.wrap_step(slow_step)
+
+    for _ in range(8):
+        step()
+
+    assert profiler.captures == 4
+    assert len(list(tmp_path.glob("profile-*"))) == 2
+    assert len(list(tmp_path.glob("alloc-*"))) == 2
+
+
+def test_fast_steps_after_a_slow_one_are_not_kept(tmp_path):
+    delays = [0.03, 0.0, 0.0, 0.03]
+
+    def step(now=None):
+        time.sleep(delays.pop(0))
+        return 1.0
+
+    profiler = Profiler(str(tmp_path), threshold=timedelta(milliseconds=20))
+    profiled = profiler.wrap_step(step)
+
+    for _ in range(3):
+        profiled()
+    assert profiler.captures == 0
+    profiled()
+
+    assert profiler.captures == 1
+    (allocations,) = tmp_path.glob("alloc-*.txt")
+    assert float(allocations.read_text().split()[3]) > 20
+
+
+def test_armed_profiler_gives_up_after_max_armed_steps(tmp_path):
+    delays = [0.03, 0.0, 0.0, 0.03, 0.03]
+
+    def step(now=None):
+        time.sleep(delays.pop(0))
+        return 1.0
+
+    profiler = Profiler(str(tmp_path), threshold=timedelta(milliseconds=20), max_armed_steps=2)
+    profiled = profiler.wrap_step(step)
+
+    for _ in range(5):
+        profiled()
+
+    # Disarmed after two fast steps; the later slow ones fall in the cool-down.
+    assert profiler.captures == 0
+    assert list(tmp_path.glob("profile-*")) == []
+
+
+def test_profiler_overhead_does_not_make_a_step_slow(tmp_path):
+    def noop():
+        pass
+
+    def busy_step(now=None):
+        for _ in range(2000):
+            noop()
+        time.sleep(0.03)
+        return 1.0
+
+    profiler = Profiler(str(tmp_path), threshold=timedelta(milliseconds=25))
+    # Pin the calibrated per-call cost so the test does not depend on machine noise.
+    profiler._call_overhead_ns = 10_000
+    profiled = profiler.wrap_step(busy_step)
+
+    profiler.arm()
+    profiled()
+
+    # 30 ms of sleep, less 2000 calls' worth of (pinned) profiler overhead.
+    assert profiler.captures == 0
+    assert profiler.spans()["step"]["max_ms"] < 25
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+from fpl_notifier.deadlines import CachedFetch, GameweekDeadline, fetch_gameweek_deadlines
+from fpl_notifier.refresher import DeadlineRefresher
+from fpl_notifier.service import DeadlineNotificationService
+from fpl_notifier.standins import make_bootstrap
+
+NOW = datetime(2024, 8, 16, 12, 0, tzinfo=timezone.utc)
+GW1 = GameweekDeadline(1, "Gameweek 1", NOW + timedelta(hours=1))
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, gameweek, lead_time):
+        self.sent.append((gameweek.event_id, lead_time))
+
+
+def test_slow_fetch_is_hedged_and_first_answer_wins():
+    calls = []
+    release = threading.Event()
+
+    def fetcher(now=None):
+        calls.append(now)
+        if len(calls) == 1:
+            release.wait(5)  # the first request hangs
+        return [GW1]
+
+    refresher = DeadlineRefresher(fetcher=fetcher, hedge_after=0.05)
+    started = time.monotonic()
+    refresher.refresh(now=NOW)
+    elapsed = time.monotonic() - started
+    release.set()
+    refresher.stop()
+
+    assert elapsed < 1.0
+    assert len(calls) == 2
+    assert refresher.hedges == 1
+    assert refresher.snapshot().deadlines == (GW1,)
+
+
+def test_hedged_request_through_cached_fetch_is_not_serialised():
+    body = make_bootstrap(events=1, start=GW1.deadline)
+    release = threading.Event()
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            requests.append(self.path)
+            if len(requests) == 1:
+                release.wait(5)  # the first request hangs
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/bootstrap-static/"
+    fetcher = partial(fetch_gameweek_deadlines, fetch_json=CachedFetch(None), api_url=url)
+    refresher = DeadlineRefresher(fetcher=fetcher, hedge_after=0.05)
+
+    started = time.monotonic()
+    refresher.refresh(now=NOW)
+    elapsed = time.monotonic() - started
+    release.set()
+    refresher.stop()
+    server.shutdown()
+    server.server_close()
+
+    assert elapsed < 1.0
+    assert len(requests) == 2
+    assert [gameweek.event_id for gameweek in refresher.snapshot().deadlines] == [1]
+
+
+def test_hedge_delay_follows_recent_latencies():
+    refresher = DeadlineRefresher(hedge_percentile=0.9, hedge_after=3.0, min_hedge_delay=0.1)
+    assert refresher.hedge_delay() == 3.0
+    refresher._latencies.extend([0.2] * 9 + [4.0])
+    assert refresher.hedge_delay() == 0.2
+    refresher.stop()
+
+
+def test_failed_refresh_keeps_serving_the_last_snapshot():
+    results = [[GW1], RuntimeError("upstream down")]
+
+    def fetcher(now=None):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    refresher = DeadlineRefresher(fetcher=fetcher, hedge_percentile=None, poll_interval=timedelta(minutes=10))
+    woken = []
+    refresher.subscribe(lambda: woken.append(True))
+
+    assert refresher.refresh(now=NOW) == 600
+    refresher.refresh(now=NOW + timedelta(minutes=10))
+    refresher.stop()
+
+    snapshot = refresher.snapshot()
+    assert snapshot.deadlines == (GW1,)
+    assert snapshot.fetched_at == NOW
+    assert refresher.failures == 1
+    assert woken == [True]
+
+
+def test_service_steps_from_the_snapshot_without_fetching():
+    refresher = DeadlineRefresher(fetcher=lambda now=None: [GW1], hedge_percentile=None)
+    refresher.refresh(now=NOW)
+
+    def fetcher(now=None):
+        raise AssertionError("step must not fetch")
+
+    notifier = FakeNotifier()
+    service = DeadlineNotificationService(
+        notifier, lead_time=timedelta(hours=2), fetcher=fetcher, refresher=refresher
+    )
+    service.step(now=NOW)
+    service.step(now=NOW + timedelta(minutes=1))
+    refresher.stop()
+
+    assert notifier.sent == [(1, timedelta(hours=2))]
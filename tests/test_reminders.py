@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.reminders import ReminderSchedule, normalise_lead_times
+
+START = datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc)
+
+
+def _season(weeks=38):
+    return [
+        GameweekDeadline(event_id=n, name=f"GW{n}", deadline=START + timedelta(days=7 * (n - 1)))
+        for n in range(1, weeks + 1)
+    ]
+
+
+def test_normalise_lead_times_sorts_and_validates():
+    assert normalise_lead_times(timedelta(hours=2)) == (timedelta(hours=2),)
+    assert normalise_lead_times([timedelta(minutes=15), timedelta(hours=24), timedelta(minutes=15)]) == (
+        timedelta(hours=24),
+        timedelta(minutes=15),
+    )
+    with pytest.raises(ValueError):
+        normalise_lead_times([])
+    with pytest.raises(ValueError):
+        normalise_lead_times([timedelta(hours=1), timedelta(0)])
+
+
+def test_schedule_orders_season_and_advances_cursor():
+    schedule = ReminderSchedule([timedelta(hours=24), timedelta(hours=2)])
+    assert schedule.update(_season())
+    assert not schedule.update(_season())
+    assert len(schedule) == 76
+
+    first = schedule.next_after(START - timedelta(days=2))
+    assert (first.gameweek.event_id, first.lead_seconds) == (1, 86400)
+
+    due = schedule.due(START - timedelta(hours=1))
+    assert [reminder.key for reminder in due] == [(1, 86400), (1, 7200)]
+    for reminder in due:
+        schedule.resolve(reminder)
+    assert len(schedule) == 74
+    assert schedule.due(START - timedelta(hours=1)) == []
+    assert schedule.next_after(START).key == (2, 86400)
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from zoneinfo import ZoneInfo
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.notifier import PushoverNotifier
+from fpl_notifier.rendering import DEADLINE, MessageRenderer, RenderedMessage, Template
+
+GAMEWEEK = GameweekDeadline(3, "Gameweek 3", datetime(2024, 8, 31, 10, 0, tzinfo=timezone.utc))
+
+
+def test_notifiers_sharing_a_renderer_format_each_combination_once():
+    renderer = MessageRenderer()
+    london = ZoneInfo("Europe/London")
+    notifiers = [
+        PushoverNotifier("token", f"user-{n}", timezone=london if n % 2 else None, renderer=renderer)
+        for n in range(100)
+    ]
+
+    payloads = [notifier._build_payload(GAMEWEEK, timedelta(hours=2)) for notifier in notifiers]
+
+    info = renderer.cache_info()
+    assert (info.misses, info.hits) == (2, 98)
+    assert payloads[0]["message"] == "Gameweek 3 (GW 3) deadline at 2024-08-31 10:00 UTC"
+    assert payloads[1]["message"] == "Gameweek 3 (GW 3) deadline at 2024-08-31 11:00 BST"
+    assert payloads[1]["user"] == "user-1"
+
+
+def test_locales_use_their_own_templates():
+    german = Template("FPL-Deadline in {lead}", "Spieltag {gameweek} endet um {time}", time_format="%H:%M")
+    renderer = MessageRenderer({"de": {DEADLINE: german}})
+
+    rendered = renderer.render(GAMEWEEK, timedelta(hours=2), ZoneInfo("Europe/Berlin"), "de")
+
+    assert rendered == RenderedMessage("FPL-Deadline in 2 hours", "Spieltag 3 endet um 12:00")
+
+
+def test_unknown_template_fields_are_rejected_up_front():
+    with pytest.raises(ValueError):
+        Template("{lead}", "{deadline_time}")
+
+
+def test_bounded_cache_evicts_old_entries():
+    renderer = MessageRenderer(maxsize=2)
+    for hours in (1, 2, 3):
+        renderer.render(GAMEWEEK, timedelta(hours=hours), ZoneInfo("UTC"))
+
+    assert renderer.cache_info().currsize == 2
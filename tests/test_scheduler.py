@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.scheduler import Subscriber, SubscriberScheduler
+
+
+class RecordingNotifier:
+    def __init__(self, subscriber_id, log):
+        self.subscriber_id = subscriber_id
+        self.log = log
+
+    def send(self, gameweek, lead_time):
+        self.log.append((self.subscriber_id, gameweek.event_id, lead_time))
+
+
+class CountingFetcher:
+    def __init__(self, deadlines):
+        self.deadlines = deadlines
+        self.calls = 0
+
+    def __call__(self, now=None):
+        self.calls += 1
+        return [d for d in self.deadlines if d.deadline > now]
+
+
+def make_scheduler(subscribers, deadlines, **kwargs):
+    log = []
+    fetcher = CountingFetcher(deadlines)
+    scheduler = SubscriberScheduler(
+        subscribers,
+        notifier_factory=lambda sub: RecordingNotifier(sub.subscriber_id, log),
+        fetcher=fetcher,
+        **kwargs,
+    )
+    return scheduler, fetcher, log
+
+
+DEADLINE = datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc)
+
+
+def test_sleeps_until_earliest_reminder_across_subscribers():
+    subscribers = [
+        Subscriber("alice", lead_times=(timedelta(hours=2),)),
+        Subscriber("bob", lead_times=(timedelta(hours=3), timedelta(minutes=30))),
+    ]
+    deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE)]
+    scheduler, fetcher, log = make_scheduler(subscribers, deadlines)
+
+    now = DEADLINE - timedelta(hours=4)
+    assert scheduler.step(now=now) == pytest.approx(3600)
+    assert scheduler.pending == 3
+
+    assert scheduler.step(now=now + timedelta(hours=1)) == pytest.approx(3600)
+    assert log == [("bob", 1, timedelta(hours=3))]
+    assert fetcher.calls == 1
+
+    scheduler.step(now=DEADLINE - timedelta(minutes=30))
+    assert sorted(log[1:]) == [("alice", 1, timedelta(hours=2)), ("bob", 1, timedelta(minutes=30))]
+    assert fetcher.calls == 1
+
+
+def test_moved_deadline_rearms_and_drops_stale_entries():
+    subscribers = [Subscriber("alice")]
+    deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE)]
+    scheduler, fetcher, log = make_scheduler(subscribers, deadlines, poll_interval=timedelta(minutes=30))
+
+    now = DEADLINE - timedelta(hours=3)
+    scheduler.step(now=now)
+    fetcher.deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE + timedelta(days=1))]
+
+    scheduler.step(now=now + timedelta(minutes=30))
+    scheduler.step(now=DEADLINE - timedelta(hours=1))
+    assert log == []
+
+    scheduler.step(now=DEADLINE + timedelta(days=1) - timedelta(hours=2))
+    assert log == [("alice", 1, timedelta(hours=2))]
+
+
+def test_cold_start_sends_only_the_shortest_overdue_lead():
+    subscribers = [Subscriber("alice", lead_times=(timedelta(hours=24), timedelta(hours=2)))]
+    deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE)]
+    scheduler, _, log = make_scheduler(subscribers, deadlines)
+
+    scheduler.step(now=DEADLINE - timedelta(hours=1))
+    scheduler.step(now=DEADLINE - timedelta(minutes=30))
+
+    assert log == [("alice", 1, timedelta(hours=2))]
+
+
+def test_moved_deadline_only_rearms_reminders_still_ahead():
+    subscribers = [Subscriber("alice", lead_times=(timedelta(hours=24), timedelta(hours=2)))]
+    deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE)]
+    scheduler, fetcher, log = make_scheduler(subscribers, deadlines, poll_interval=timedelta(minutes=30))
+
+    scheduler.step(now=DEADLINE - timedelta(hours=24))
+    scheduler.step(now=DEADLINE - timedelta(hours=2))
+    assert [lead for _, _, lead in log] == [timedelta(hours=24), timedelta(hours=2)]
+
+    # Moved an hour later with 90 minutes to go: the 2 hour reminder is due
+    # again, but the 24 hour one would no longer be true.
+    fetcher.deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE + timedelta(hours=1))]
+    scheduler.step(now=DEADLINE - timedelta(minutes=90))
+    scheduler.step(now=DEADLINE - timedelta(hours=1))
+    assert [lead for _, _, lead in log[2:]] == [timedelta(hours=2)]
+
+
+def test_removed_subscriber_is_not_notified_and_new_one_is_armed():
+    deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE)]
+    scheduler, _, log = make_scheduler([Subscriber("alice")], deadlines)
+
+    scheduler.step(now=DEADLINE - timedelta(hours=5))
+    scheduler.remove_subscriber("alice")
+    scheduler.add_subscriber(Subscriber("carol", lead_times=(timedelta(hours=1),)))
+
+    scheduler.step(now=DEADLINE - timedelta(hours=1))
+    assert log == [("carol", 1, timedelta(hours=1))]
+
+
+def test_each_reminder_is_delivered_once():
+    deadlines = [GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE)]
+    scheduler, _, log = make_scheduler([Subscriber("alice")], deadlines)
+
+    scheduler.step(now=DEADLINE - timedelta(hours=1))
+    scheduler.add_subscriber(Subscriber("alice"))
+    scheduler.step(now=DEADLINE - timedelta(minutes=30))
+    assert log == [("alice", 1, timedelta(hours=2))]
+
+
+def test_events_beyond_horizon_are_not_armed():
+    deadlines = [
+        GameweekDeadline(event_id=1, name="GW1", deadline=DEADLINE),
+        GameweekDeadline(event_id=2, name="GW2", deadline=DEADLINE + timedelta(days=30)),
+    ]
+    scheduler, _, _ = make_scheduler([Subscriber("alice")], deadlines, horizon=timedelta(days=7))
+
+    scheduler.step(now=DEADLINE - timedelta(days=1))
+    assert scheduler.pending == 1
@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta, timezone
+import gzip
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.server import DeadlineCache, DeadlineServer
+
+NOW = datetime(2024, 9, 1, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _deadlines(count=3):
+    return [
+        GameweekDeadline(event_id=i, name=f"Gameweek {i}", deadline=NOW + timedelta(days=i))
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture
+def running_server():
+    servers = []
+
+    def start(cache):
+        server = DeadlineServer(("127.0.0.1", 0), cache)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(conn, path, headers=None):
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_conditional_requests_do_not_refetch(running_server):
+    calls = []
+
+    def fetcher(*, now):
+        calls.append(now)
+        return _deadlines()
+
+    clock = FakeClock(NOW)
+    conn = running_server(DeadlineCache(fetcher=fetcher, refresh_interval=timedelta(minutes=15), clock=clock))
+
+    response, body = _get(conn, "/deadlines/next")
+    assert response.status == 200
+    assert json.loads(body)["deadline"]["event_id"] == 1
+    assert response.getheader("Cache-Control") == "public, max-age=900"
+    etag = response.getheader("ETag")
+
+    for _ in range(5):
+        response, body = _get(conn, "/deadlines/next", {"If-None-Match": etag})
+        assert response.status == 304
+        assert body == b""
+    assert len(calls) == 1
+
+    clock.now += timedelta(minutes=16)
+    response, _ = _get(conn, "/deadlines/next", {"If-None-Match": etag})
+    assert response.status == 304
+    assert len(calls) == 2
+
+
+def test_gzip_variant_and_bootstrap_shape(running_server):
+    conn = running_server(DeadlineCache(fetcher=lambda *, now: _deadlines(20), clock=FakeClock(NOW)))
+
+    plain, plain_body = _get(conn, "/api/bootstrap-static/")
+    zipped, zipped_body = _get(conn, "/api/bootstrap-static/", {"Accept-Encoding": "gzip"})
+
+    assert zipped.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(zipped_body) == plain_body
+    assert zipped.getheader("ETag") != plain.getheader("ETag")
+    events = json.loads(plain_body)["events"]
+    assert events[0] == {"id": 1, "name": "Gameweek 1", "deadline_time": "2024-09-02T00:00:00Z"}
+
+
+def test_passed_deadline_rebuilds_without_fetching():
+    calls = []
+
+    def fetcher(*, now):
+        calls.append(now)
+        return _deadlines()
+
+    clock = FakeClock(NOW)
+    cache = DeadlineCache(fetcher=fetcher, refresh_interval=timedelta(days=30), clock=clock)
+    first = cache.snapshot()
+    clock.now = NOW + timedelta(days=1, seconds=1)
+    second = cache.snapshot()
+
+    assert len(calls) == 1
+    assert first.resources["/deadlines/next"].etag != second.resources["/deadlines/next"].etag
+    assert json.loads(second.resources["/deadlines/next"].body)["deadline"]["event_id"] == 2
+
+
+def test_upstream_failure_serves_stale_data(running_server):
+    responses = [_deadlines(), RuntimeError("boom")]
+
+    def fetcher(*, now):
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    clock = FakeClock(NOW)
+    conn = running_server(DeadlineCache(fetcher=fetcher, refresh_interval=timedelta(minutes=5), clock=clock))
+    _get(conn, "/deadlines")
+    clock.now += timedelta(minutes=6)
+
+    response, body = _get(conn, "/deadlines")
+    assert response.status == 200
+    assert len(json.loads(body)["deadlines"]) == 3
+    assert response.getheader("Cache-Control") == "public, max-age=60"
+
+
+def test_failure_before_first_snapshot_backs_off():
+    calls = []
+
+    def fetcher(*, now):
+        calls.append(now)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return _deadlines()
+
+    clock = FakeClock(NOW)
+    cache = DeadlineCache(fetcher=fetcher, clock=clock)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            cache.snapshot()
+    assert len(calls) == 1
+
+    clock.now += timedelta(minutes=1)
+    assert json.loads(cache.snapshot().resources["/deadlines"].body)["deadlines"]
+    assert len(calls) == 2
+
+
+def test_slow_refresh_does_not_hold_up_other_requests():
+    release = threading.Event()
+    calls = []
+
+    def fetcher(*, now):
+        calls.append(now)
+        if len(calls) == 2:
+            release.wait(5)  # the refresh hangs
+        return _deadlines()
+
+    clock = FakeClock(NOW)
+    cache = DeadlineCache(fetcher=fetcher, refresh_interval=timedelta(minutes=5), clock=clock)
+    first = cache.snapshot()
+    clock.now += timedelta(minutes=6)
+    refreshing = threading.Thread(target=cache.snapshot)
+    refreshing.start()
+    while len(calls) < 2:
+        time.sleep(0.001)
+
+    started = time.monotonic()
+    stale = cache.snapshot()
+    elapsed = time.monotonic() - started
+    release.set()
+    refreshing.join()
+
+    assert elapsed < 1.0
+    assert stale is first
+    assert len(calls) == 2
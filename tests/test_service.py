@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta, timezone
+import threading
+import time
 
 import pytest
 
 from fpl_notifier.deadlines import GameweekDeadline
 from fpl_notifier.service import DeadlineNotificationService
+from fpl_notifier.store import SQLiteStateStore
 
 
 class FakeNotifier:
@@ -130,3 +133,142 @@ def test_sent_cache_is_cleared_after_deadline():
     next_sleep = service.step(now=datetime(2024, 7, 1, 17, 0, tzinfo=timezone.utc))
     assert next_sleep == pytest.approx(timedelta(hours=6).total_seconds())
     assert len(notifier.sent) == 1  # no new send until fetcher provides future deadline
+
+
+def test_moved_deadline_rearms_reminder_and_records_drift():
+    notifier = FakeNotifier()
+    original = datetime(2024, 7, 1, 16, 0, tzinfo=timezone.utc)
+    postponed = original + timedelta(days=1)
+    deadlines = [GameweekDeadline(event_id=6, name="GW6", deadline=original)]
+
+    def fetcher(now=None):
+        return deadlines
+
+    service = DeadlineNotificationService(
+        notifier,
+        lead_time=timedelta(hours=2),
+        poll_interval=timedelta(hours=6),
+        fetcher=fetcher,
+    )
+
+    assert service.step(now=datetime(2024, 7, 1, 13, 0, tzinfo=timezone.utc)) == pytest.approx(3600)
+    service.step(now=datetime(2024, 7, 1, 14, 0, 2, tzinfo=timezone.utc))
+    assert len(notifier.sent) == 1
+    assert service.last_drift == pytest.approx(2.0)
+
+    deadlines = [GameweekDeadline(event_id=6, name="GW6", deadline=postponed)]
+    changes = service.refresh(now=datetime(2024, 7, 1, 15, 0, tzinfo=timezone.utc))
+    assert [(old.deadline, new.deadline) for old, new in changes.changed] == [(original, postponed)]
+
+    service.step(now=postponed - timedelta(hours=2))
+    assert [gw.deadline for gw, _ in notifier.sent] == [original, postponed]
+
+
+def test_refresh_wakes_running_loop():
+    notifier = FakeNotifier()
+    now = datetime.now(timezone.utc)
+    deadlines = [GameweekDeadline(event_id=7, name="GW7", deadline=now + timedelta(days=3))]
+    fetches = []
+
+    def fetcher(now=None):
+        fetches.append(now)
+        return deadlines
+
+    service = DeadlineNotificationService(notifier, poll_interval=timedelta(hours=6), fetcher=fetcher)
+    thread = threading.Thread(target=service.run, daemon=True)
+    thread.start()
+    while not fetches:
+        time.sleep(0.01)
+
+    # The deadline moves forward so the reminder is due right away.
+    deadlines = [GameweekDeadline(event_id=7, name="GW7", deadline=now + timedelta(hours=1))]
+    assert service.refresh()
+    for _ in range(200):
+        if notifier.sent:
+            break
+        time.sleep(0.01)
+    service.stop()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert [gw.event_id for gw, _ in notifier.sent] == [7]
+    assert len(fetches) == 2
+
+
+def test_reminder_plan_sends_each_lead_once():
+    notifier = FakeNotifier()
+    deadline = datetime(2024, 7, 2, 12, 0, tzinfo=timezone.utc)
+    gameweek = GameweekDeadline(event_id=4, name="GW4", deadline=deadline)
+    leads = [timedelta(minutes=15), timedelta(hours=24), timedelta(hours=2)]
+    service = DeadlineNotificationService(
+        notifier, lead_time=leads, poll_interval=timedelta(hours=30), fetcher=lambda now=None: [gameweek]
+    )
+    assert service.lead_times == (timedelta(hours=24), timedelta(hours=2), timedelta(minutes=15))
+
+    now = deadline - timedelta(hours=30)
+    while now < deadline:
+        now += timedelta(seconds=max(service.step(now=now), 1))
+
+    assert [lead for _, lead in notifier.sent] == [timedelta(hours=24), timedelta(hours=2), timedelta(minutes=15)]
+    assert service.store.sent_count() == 3
+
+
+def test_overdue_reminders_collapse_into_the_latest():
+    notifier = FakeNotifier()
+    deadline = datetime(2024, 7, 2, 12, 0, tzinfo=timezone.utc)
+    gameweek = GameweekDeadline(event_id=4, name="GW4", deadline=deadline)
+    service = DeadlineNotificationService(
+        notifier,
+        lead_time=[timedelta(hours=24), timedelta(hours=2), timedelta(minutes=15)],
+        fetcher=lambda now=None: [gameweek],
+    )
+
+    sleep = service.step(now=deadline - timedelta(hours=1))
+
+    assert notifier.sent == [(gameweek, timedelta(hours=2))]
+    assert service.store.is_sent(4, 86400)
+    assert sleep == pytest.approx(timedelta(minutes=45).total_seconds())
+
+
+def test_run_once_resumes_from_persisted_state(tmp_path):
+    now = datetime(2024, 7, 1, 12, 0, tzinfo=timezone.utc)
+    deadline = datetime(2024, 7, 1, 13, 0, tzinfo=timezone.utc)
+    deadlines = [GameweekDeadline(event_id=2, name="GW2", deadline=deadline)]
+    path = str(tmp_path / "state.sqlite3")
+    notifier = FakeNotifier()
+
+    wake_times = []
+    for _ in range(2):
+        service = DeadlineNotificationService(
+            notifier,
+            lead_time=timedelta(hours=2),
+            poll_interval=timedelta(hours=6),
+            fetcher=lambda now=None: deadlines,
+            store=SQLiteStateStore(path),
+        )
+        wake_times.append(service.run_once(now=now))
+
+    assert len(notifier.sent) == 1
+    assert now < wake_times[1] <= now + timedelta(hours=6)
+
+
+def test_run_once_refetches_stale_deadlines_across_invocations(tmp_path):
+    start = datetime(2024, 7, 1, 12, 0, tzinfo=timezone.utc)
+    path = str(tmp_path / "state.sqlite3")
+    deadline = GameweekDeadline(event_id=2, name="GW2", deadline=start + timedelta(days=3))
+    moved = GameweekDeadline(event_id=2, name="GW2", deadline=start + timedelta(days=4))
+    fetches = []
+
+    def fetcher(now=None):
+        fetches.append(now)
+        return [moved if len(fetches) > 2 else deadline]
+
+    for run in range(5):
+        now = start + timedelta(hours=7 * run)
+        service = DeadlineNotificationService(
+            FakeNotifier(), poll_interval=timedelta(hours=6), fetcher=fetcher, store=SQLiteStateStore(path)
+        )
+        assert service.run_once(now=now) > now
+
+    assert len(fetches) == 5
+    assert service.store.load_deadlines() == ([moved], start + timedelta(hours=28))
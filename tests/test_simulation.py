@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fpl_notifier.scheduler import Subscriber
+from fpl_notifier.simulation import (
+    Outage,
+    Postponement,
+    Season,
+    SimulationFinished,
+    VirtualClock,
+    simulate_service,
+    simulate_subscribers,
+)
+
+START = datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc)
+
+
+def test_synthetic_season_replays_without_missed_or_duplicate_reminders():
+    season = Season.synthetic(seed=3, postponements=4, outages=6)
+
+    report = simulate_service(season, lead_time=[timedelta(hours=24), timedelta(hours=2)])
+
+    assert report.expected == 76
+    assert report.on_time == report.expected
+    assert report.missed == report.duplicates == 0
+    assert report.upstream_failures > 0
+    assert report.simulated_days > 250
+    assert report.cpu_per_day > 0
+
+
+def test_subscribers_are_reminded_again_after_a_postponement():
+    deadlines = {1: START, 2: START + timedelta(days=7)}
+    # Announced after the 24 hour reminder for GW2 has gone out.
+    moved = Postponement(2, START + timedelta(days=6, hours=12), timedelta(days=2))
+    season = Season(deadlines, postponements=(moved,))
+    subscribers = [Subscriber(f"user-{n}", (timedelta(hours=24),)) for n in range(50)]
+
+    report = simulate_subscribers(season, subscribers)
+
+    assert report.expected == 100
+    assert report.on_time == 100
+    assert report.superseded == 50
+    assert report.missed == report.duplicates == 0
+
+
+def test_outage_until_after_reminder_time_is_reported_missed():
+    deadlines = {1: START}
+    outage = Outage(START - timedelta(days=3), START - timedelta(hours=1))
+    season = Season(deadlines, outages=(outage,))
+
+    report = simulate_service(season, poll_interval=timedelta(hours=6))
+
+    assert report.upstream_failures > 0
+    assert report.expected == report.missed == 1
+
+
+def test_season_from_recorded_events():
+    events = [
+        {"id": 1, "name": "Gameweek 1", "deadline_time": "2024-08-16T17:30:00Z"},
+        {"id": 2, "name": "Gameweek 2", "deadline_time": "2024-08-24T10:00:00Z"},
+    ]
+
+    season = Season.from_events(events)
+
+    assert season.start == START
+    assert season.names[2] == "Gameweek 2"
+
+
+def test_virtual_clock_detects_a_loop_that_never_sleeps():
+    clock = VirtualClock(START, START + timedelta(hours=1), max_idle_reads=3)
+    for _ in range(3):
+        clock.now()
+    with pytest.raises(RuntimeError):
+        clock.now()
+    with pytest.raises(SimulationFinished):
+        clock.sleep(3600)
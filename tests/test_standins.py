@@ -0,0 +1,73 @@
+from datetime import timedelta
+import os
+import subprocess
+import sys
+from urllib import error
+
+import pytest
+
+from fpl_notifier.deadlines import CachedFetch, fetch_gameweek_deadlines
+from fpl_notifier.notifier import PushoverNotifier, RateLimitedError
+from fpl_notifier.standins import FPLStandIn, PushoverStandIn, make_bootstrap
+from fpl_notifier.transport import HTTPConnectionPool
+
+LEAD = timedelta(hours=2)
+
+
+def test_fetch_revalidates_against_the_fpl_stand_in():
+    with FPLStandIn(size=200_000) as fpl:
+        fetch = CachedFetch(None)
+        first = fetch_gameweek_deadlines(fetch_json=fetch, api_url=fpl.url)
+        second = fetch_gameweek_deadlines(fetch_json=fetch, api_url=fpl.url)
+
+    assert len(fpl.payload) >= 190_000
+    assert [gameweek.event_id for gameweek in first] == list(range(1, 39))
+    assert second == first
+    assert (fpl.requests, fpl.not_modified) == (2, 1)
+
+
+def test_fpl_stand_in_injects_errors():
+    with FPLStandIn(make_bootstrap(events=2), error_rate=1.0, error_status=502) as fpl:
+        with pytest.raises(error.HTTPError) as excinfo:
+            fetch_gameweek_deadlines(api_url=fpl.url)
+
+    assert excinfo.value.code == 502
+    assert fpl.errors == 1
+
+
+def test_pushover_stand_in_enforces_its_rate_limit():
+    with FPLStandIn(make_bootstrap(events=1)) as fpl, PushoverStandIn(rate_limit=2) as pushover:
+        (gameweek,) = fetch_gameweek_deadlines(api_url=fpl.url)
+        notifier = PushoverNotifier("token", "user", transport=HTTPConnectionPool(), api_url=pushover.url)
+        notifier.send(gameweek, LEAD)
+        notifier.send(gameweek, LEAD)
+        # The headers reported the limit as used up, so this fails locally.
+        with pytest.raises(RateLimitedError):
+            notifier.send(gameweek, LEAD)
+        fresh = PushoverNotifier("token", "user", transport=HTTPConnectionPool(), api_url=pushover.url)
+        with pytest.raises(error.HTTPError) as excinfo:
+            fresh.send(gameweek, LEAD)
+
+    assert excinfo.value.code == 429
+    assert [message["user"] for message in pushover.messages] == ["user", "user"]
+    assert "Gameweek 1" in pushover.messages[0]["message"]
+    assert pushover.rate_limited == 1
+
+
+def test_cli_send_test_runs_end_to_end_against_the_stand_ins(tmp_path):
+    with FPLStandIn() as fpl, PushoverStandIn() as pushover:
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join(sys.path),
+            FPL_API_URL=fpl.url,
+            PUSHOVER_API_URL=pushover.url,
+            PUSHOVER_TOKEN="token",
+            PUSHOVER_USER_KEY="user-key",
+        )
+        subprocess.run(
+            [sys.executable, "-m", "fpl_notifier", "--send-test"], cwd=tmp_path, env=env, check=True, timeout=60
+        )
+
+    assert fpl.requests == 1
+    assert [message["user"] for message in pushover.messages] == ["user-key"]
+    assert pushover.messages[0]["token"] == "token"
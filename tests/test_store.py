@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.service import DeadlineNotificationService
+from fpl_notifier.store import MemoryStateStore, SQLiteStateStore
+
+NOW = datetime(2024, 7, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStateStore()
+    return SQLiteStateStore(str(tmp_path / "state.db"))
+
+
+def test_sent_entries_are_pruned_by_expiry(store):
+    store.mark_sent(1, 7200, NOW + timedelta(hours=1))
+    store.mark_sent(2, 7200, NOW + timedelta(hours=3))
+
+    assert store.prune_sent(NOW + timedelta(hours=2)) == 1
+    assert not store.is_sent(1, 7200)
+    assert store.is_sent(2, 7200)
+    assert not store.is_sent(2, 3600)
+    assert store.sent_count() == 1
+
+
+def test_clear_sent_for_one_lead_or_whole_event(store):
+    for lead in (86400, 7200, 900):
+        store.mark_sent(1, lead, NOW + timedelta(days=1))
+    store.mark_sent(2, 7200, NOW + timedelta(days=1))
+
+    assert store.clear_sent(1, 7200) == 1
+    assert store.clear_sent(1, 7200) == 0
+    assert store.is_sent(1, 86400)
+    assert store.clear_sent(1) == 2
+    assert store.sent_count() == 1
+
+
+def test_deadlines_round_trip(store):
+    deadlines = [GameweekDeadline(event_id=3, name="GW3", deadline=NOW + timedelta(days=2))]
+    store.save_deadlines(deadlines, NOW)
+
+    assert store.load_deadlines() == (deadlines, NOW)
+
+
+def test_unchanged_fetch_still_refreshes_stored_fetched_at(store):
+    deadline = GameweekDeadline(event_id=3, name="GW3", deadline=NOW + timedelta(days=2))
+    service = DeadlineNotificationService(FakeNotifier(), fetcher=lambda now=None: [deadline], store=store)
+
+    service.refresh(now=NOW)
+    service.refresh(now=NOW + timedelta(hours=7))
+
+    assert store.load_deadlines() == ([deadline], NOW + timedelta(hours=7))
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, gameweek, lead_time):
+        self.sent.append(gameweek.event_id)
+
+
+def test_restart_does_not_resend_and_starts_from_stored_deadlines(tmp_path):
+    path = str(tmp_path / "state.db")
+    deadline = GameweekDeadline(event_id=4, name="GW4", deadline=NOW + timedelta(hours=1))
+    calls = []
+
+    def fetcher(now=None):
+        calls.append(now)
+        return [deadline]
+
+    first = FakeNotifier()
+    DeadlineNotificationService(first, fetcher=fetcher, store=SQLiteStateStore(path)).step(now=NOW)
+    assert first.sent == [4]
+
+    def unavailable(now=None):
+        raise AssertionError("stored deadlines should be used first")
+
+    second = FakeNotifier()
+    restarted = DeadlineNotificationService(second, fetcher=unavailable, store=SQLiteStateStore(path))
+    sleep = restarted.step(now=NOW + timedelta(minutes=5))
+    assert second.sent == []
+    assert sleep == pytest.approx(timedelta(hours=6).total_seconds() - 300)
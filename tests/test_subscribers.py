@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+import json
+import os
+
+from zoneinfo import ZoneInfo
+
+from fpl_notifier.deadlines import GameweekDeadline
+from fpl_notifier.notifier import PushoverNotifier
+from fpl_notifier.scheduler import SubscriberScheduler
+from fpl_notifier.subscribers import SubscriberNotifiers, SubscriberRegistry
+
+NOW = datetime(2024, 8, 16, 12, 0, tzinfo=timezone.utc)
+GW1 = GameweekDeadline(1, "Gameweek 1", NOW + timedelta(hours=3))
+
+
+def write_records(path, records, *lines):
+    text = "\n".join([json.dumps(record) for record in records] + list(lines)) + "\n"
+    path.write_text(text)
+    # Make sure the change is visible even on filesystems with coarse mtimes.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_loads_records_with_defaults_and_skips_invalid_lines(tmp_path):
+    path = tmp_path / "subscribers.jsonl"
+    write_records(
+        path,
+        [
+            {"id": "alice", "user_key": "ua", "sound": "magic", "timezone": "Europe/London", "lead_hours": [24, 2]},
+            {"id": "bob", "user_key": "ub"},
+        ],
+        "# comment",
+        "{not json",
+        json.dumps({"user_key": "no id"}),
+    )
+    registry = SubscriberRegistry(str(path), lead_times=[timedelta(hours=1)])
+
+    changes = registry.reload()
+
+    assert [subscriber.subscriber_id for subscriber in changes.added] == ["alice", "bob"]
+    alice, bob = changes.added
+    assert alice.lead_times == (timedelta(hours=24), timedelta(hours=2))
+    assert alice.timezone == ZoneInfo("Europe/London")
+    assert alice.options == {"user_key": "ua", "sound": "magic"}
+    assert bob.lead_times == (timedelta(hours=1),)
+    assert bob.timezone == ZoneInfo("UTC")
+
+
+def test_reload_reports_only_what_changed(tmp_path):
+    path = tmp_path / "subscribers.jsonl"
+    records = [{"id": "alice", "user_key": "ua"}, {"id": "bob", "user_key": "ub"}, {"id": "carol", "user_key": "uc"}]
+    write_records(path, records)
+    registry = SubscriberRegistry(str(path))
+    registry.reload()
+    alice = registry.get("alice")
+
+    assert not registry.reload()
+    assert registry.loads == 1
+
+    write_records(path, [records[0], {"id": "bob", "user_key": "ub", "device": "phone"}, {"id": "dave"}])
+    changes = registry.reload()
+
+    assert registry.get("alice") is alice
+    assert [subscriber.subscriber_id for subscriber in changes.added] == ["dave"]
+    assert [subscriber.subscriber_id for subscriber in changes.updated] == ["bob"]
+    assert changes.removed == ["carol"]
+
+
+def test_scheduler_picks_up_new_subscribers_without_rearming_others(tmp_path):
+    path = tmp_path / "subscribers.jsonl"
+    write_records(path, [{"id": "alice"}])
+    sent = []
+
+    class Notifier:
+        def __init__(self, subscriber):
+            self.subscriber = subscriber
+
+        def send(self, gameweek, lead_time):
+            sent.append((self.subscriber.subscriber_id, lead_time))
+
+    scheduler = SubscriberScheduler(
+        notifier_factory=Notifier,
+        fetcher=lambda now=None: [GW1],
+        registry=SubscriberRegistry(str(path)),
+        reload_interval=timedelta(seconds=30),
+    )
+    scheduler.step(now=NOW)
+    assert len(scheduler) == 1
+    pending = scheduler.pending
+
+    write_records(path, [{"id": "alice", "device": "phone"}, {"id": "bob", "lead_hours": 1}])
+    scheduler.step(now=NOW + timedelta(seconds=30))
+    assert scheduler.pending == pending + 1
+
+    scheduler.step(now=NOW + timedelta(hours=2))
+    assert sorted(sent) == [("alice", timedelta(hours=2)), ("bob", timedelta(hours=1))]
+
+
+def test_notifiers_are_built_once_per_subscriber_record(tmp_path):
+    path = tmp_path / "subscribers.jsonl"
+    write_records(path, [{"id": "alice", "user_key": "ua", "device": "phone", "priority": 1}])
+    registry = SubscriberRegistry(str(path))
+    registry.reload()
+    notifiers = SubscriberNotifiers("token")
+
+    notifier = notifiers(registry.get("alice"))
+
+    assert isinstance(notifier, PushoverNotifier)
+    assert (notifier.user_key, notifier.device, notifier.priority) == ("ua", "phone", 1)
+    assert notifiers(registry.get("alice")) is notifier
+
+
+def test_removed_subscribers_notifiers_are_dropped(tmp_path):
+    path = tmp_path / "subscribers.jsonl"
+    write_records(path, [{"id": "alice", "user_key": "ua"}, {"id": "bob", "user_key": "ub"}])
+    registry = SubscriberRegistry(str(path))
+    notifiers = SubscriberNotifiers("token")
+    scheduler = SubscriberScheduler(
+        notifier_factory=notifiers,
+        fetcher=lambda now=None: [],
+        registry=registry,
+        reload_interval=timedelta(seconds=30),
+    )
+    scheduler.step(now=NOW)
+    for subscriber in registry:
+        notifiers(subscriber)
+
+    write_records(path, [{"id": "bob", "user_key": "ub"}])
+    scheduler.step(now=NOW + timedelta(seconds=30))
+
+    assert list(notifiers._notifiers) == ["bob"]